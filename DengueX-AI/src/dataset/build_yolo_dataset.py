@@ -1,6 +1,11 @@
 import os
 import random
 import shutil
+import sys
+
+from label_store import (
+    export_yolo_txt, image_boxes, load_annotation_boxes, remove_yolo_txt, store_path, write_store,
+)
 
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
 
@@ -14,10 +19,35 @@ YOLO_BASE = os.path.join(PROJECT_ROOT, "data", "yolo")
 YOLO_IMG = os.path.join(YOLO_BASE, "images")
 YOLO_LBL = os.path.join(YOLO_BASE, "labels")
 
+# Annotation class names -> YOLO class ids (see dengue.yaml)
+DENGUE_CLASSES = {
+    "aedes",
+    "aedes aegypti",
+    "aedes_aegypti",
+    "aedes albopictus",
+    "aedes-albopictus"
+}
+
+NON_DENGUE_CLASSES = {
+    "culex",
+    "anopheles"
+}
+
+# Pass --export-txt to also write labels/<split>/<name>.txt for tools
+# that cannot read the label store.
+EXPORT_TXT = "--export-txt" in sys.argv[1:]
+
 # 🔒 ENSURE ALL REQUIRED DIRECTORIES EXIST
 for split in ["train", "val", "test"]:
     os.makedirs(os.path.join(YOLO_IMG, split), exist_ok=True)
-    os.makedirs(os.path.join(YOLO_LBL, split), exist_ok=True)
+os.makedirs(YOLO_LBL, exist_ok=True)
+
+def annotation_class(label):
+    if label in DENGUE_CLASSES:
+        return 0
+    if label in NON_DENGUE_CLASSES:
+        return 1
+    return None
 
 random.seed(42)
 
@@ -30,6 +60,16 @@ def split_files(files):
         "test": files[int(0.9*n):]
     }
 
+# Real boxes from the Roboflow _annotations.csv rows, keyed by filename
+annotations, collisions = load_annotation_boxes(annotation_class)
+print(f"[INFO] Annotated boxes for {len(annotations)} images")
+if collisions:
+    print(f"[WARN] {len(collisions)} file names appear in several annotation CSVs; "
+          f"they get full-frame boxes (e.g. {collisions[:3]})")
+
+# One columnar label store per split instead of a .txt per image
+records = {"train": [], "val": [], "test": []}
+
 total_copied = 0
 
 for class_id, src_dir in SRC.items():
@@ -43,18 +83,28 @@ for class_id, src_dir in SRC.items():
         for f in split_files_list:
             src_img = os.path.join(src_dir, f)
             dst_img = os.path.join(YOLO_IMG, split, f)
-            dst_lbl = os.path.join(YOLO_LBL, split, os.path.splitext(f)[0] + ".txt")
 
             shutil.copy2(src_img, dst_img)
-
-            with open(dst_lbl, "w") as out:
-                out.write(f"{class_id} 0.5 0.5 1.0 1.0\n")
+            records[split].append((f, class_id, image_boxes(f, class_id, annotations)))
 
             total_copied += 1
             if total_copied % 500 == 0:
                 print(f"[INFO] Copied {total_copied} images...")
 
+for split, split_records in records.items():
+    write_store(store_path(split, YOLO_LBL), split_records)
+    if EXPORT_TXT:
+        export_yolo_txt(split, YOLO_LBL)
+    else:
+        # Text labels from an earlier build would contradict the new store.
+        removed = remove_yolo_txt(split, YOLO_LBL)
+        if removed:
+            print(f"[INFO] Removed {removed} stale {split} .txt labels")
+
 print("===================================")
 print("YOLOv8 DATASET BUILD COMPLETE")
 print(f"Total images processed: {total_copied}")
+print(f"Label stores          : {YOLO_LBL}/<split>.npz")
+if not EXPORT_TXT:
+    print("YOLO .txt labels      : not written (run label_store.py export)")
 print("===================================")
@@ -0,0 +1,352 @@
+import argparse
+import csv
+import hashlib
+import json
+import os
+import time
+import zipfile
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime, timezone
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+DATA_ROOT = os.path.join(PROJECT_ROOT, "data")
+
+ROOTS = ["raw", "processed", "yolo"]
+
+CACHE_PATH = os.path.join(DATA_ROOT, "cache", "file_facts.json")
+OUTPUT_PATH = os.path.join(DATA_ROOT, "dataset_stats.json")
+
+IMAGE_EXTS = (".jpg", ".jpeg", ".png")
+SPLITS = {"train", "valid", "val", "test"}
+CACHE_VERSION = 1
+
+# --------------------------------------------------
+# WHERE A FILE CAME FROM
+# --------------------------------------------------
+
+def raw_source(parts):
+    """
+    Source dataset for a path under data/raw, given its path components.
+    Roboflow exports sit directly in data/raw/<split>/.
+    """
+    if parts[0] in SPLITS:
+        return "roboflow"
+    if parts[0] == "aedes_kaggle":
+        if "AMID V1" in parts:
+            return "AMID"
+        if "Mosquito_dataset" in parts:
+            return "mosquito_cnn"
+    return parts[0]
+
+def split_of(parts):
+    for p in parts[:-1]:
+        if p in SPLITS:
+            return "val" if p == "valid" else p
+    return None
+
+def yolo_class_names():
+    """
+    names: block of data/yolo/dengue.yaml (no YAML dependency needed).
+    """
+    names = {}
+    path = os.path.join(DATA_ROOT, "yolo", "dengue.yaml")
+    if not os.path.exists(path):
+        return names
+    in_names = False
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.startswith("names:"):
+                in_names = True
+            elif in_names and ":" in line and line[:1].isspace():
+                key, value = line.split(":", 1)
+                names[int(key.strip())] = value.strip()
+            elif in_names and line.strip():
+                in_names = False
+    return names
+
+# --------------------------------------------------
+# PARALLEL SCAN
+# --------------------------------------------------
+
+def scan_dir(path):
+    files, subdirs = [], []
+    with os.scandir(path) as it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.append(entry.path)
+            elif entry.is_file(follow_symlinks=False):
+                st = entry.stat(follow_symlinks=False)
+                files.append((entry.path, st.st_size, st.st_mtime_ns))
+    return files, subdirs
+
+def scan_tree(roots, pool):
+    """
+    Breadth-first os.scandir over every root with one task per directory,
+    so wide trees (one folder per class/split) are listed concurrently.
+    """
+    files = []
+    pending = {pool.submit(scan_dir, r) for r in roots if os.path.isdir(r)}
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            found, subdirs = future.result()
+            files.extend(found)
+            pending |= {pool.submit(scan_dir, d) for d in subdirs}
+    return files
+
+# --------------------------------------------------
+# PER-FILE FACTS (CACHED BY PATH, SIZE, MTIME)
+# --------------------------------------------------
+
+def load_cache(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return data.get("files", {}) if data.get("version") == CACHE_VERSION else {}
+
+def save_cache(path, facts):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"version": CACHE_VERSION, "files": facts}, f)
+    os.replace(tmp, path)
+
+def image_dims(path):
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+    try:
+        # Reads the header only.
+        with Image.open(path) as img:
+            return list(img.size)
+    except Exception:
+        return None
+
+def is_yolo_label(path):
+    parts = os.path.relpath(path, DATA_ROOT).split(os.sep)
+    return parts[:2] == ["yolo", "labels"]
+
+def compute_facts(item):
+    path, size, mtime_ns = item
+    facts = {"size": size, "mtime_ns": mtime_ns}
+    lower = path.lower()
+    try:
+        facts.update(parse_file(path, lower))
+    except (OSError, UnicodeDecodeError, ValueError, IndexError, zipfile.BadZipFile) as exc:
+        # One malformed, truncated or vanished file must not abort the scan.
+        facts["error"] = f"{type(exc).__name__}: {exc}"
+    return facts
+
+def parse_file(path, lower):
+    facts = {}
+
+    if lower.endswith(IMAGE_EXTS):
+        h = hashlib.blake2b(digest_size=16)
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        facts["hash"] = h.hexdigest()
+        facts["dims"] = image_dims(path)
+
+    elif lower.endswith(".csv"):
+        labels = defaultdict(set)
+        with open(path, newline="", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            if reader.fieldnames and {"filename", "class"} <= set(reader.fieldnames):
+                for row in reader:
+                    if row["filename"] and row["class"]:
+                        labels[row["filename"]].add(row["class"].strip().lower())
+        facts["labels"] = {k: sorted(v) for k, v in labels.items()}
+
+    elif lower.endswith(".npz") and os.path.basename(os.path.dirname(path)) == "labels":
+        # Label store from build_yolo_dataset.py: filename -> image class.
+        from label_store import LabelStore
+
+        store = LabelStore(path)
+        facts["yolo_classes"] = dict(zip(map(str, store.filenames), store.image_classes().tolist()))
+
+    elif lower.endswith(".txt") and is_yolo_label(path):
+        with open(path, "r", encoding="utf-8") as f:
+            first = f.readline().split()
+        facts["yolo_class"] = int(first[0]) if first else None
+
+    return facts
+
+def collect_facts(files, cache, pool):
+    """
+    Reuses cached facts when (path, size, mtime) is unchanged; hashes and
+    parses only new or modified files.
+    """
+    facts, misses = {}, []
+    for path, size, mtime_ns in files:
+        rel = os.path.relpath(path, DATA_ROOT)
+        cached = cache.get(rel)
+        if cached and cached["size"] == size and cached["mtime_ns"] == mtime_ns:
+            facts[rel] = cached
+        else:
+            misses.append((rel, (path, size, mtime_ns)))
+
+    for (rel, _), result in zip(misses, pool.map(compute_facts, [item for _, item in misses])):
+        facts[rel] = result
+    return facts, len(files) - len(misses), len(misses)
+
+# --------------------------------------------------
+# REPORT
+# --------------------------------------------------
+
+def size_bucket(size):
+    kb = max(1, size // 1024)
+    low = 1 << (kb.bit_length() - 1)
+    return f"{low}-{low * 2}KB"
+
+def dims_bucket(dims):
+    if not dims:
+        return "unknown"
+    side = max(dims)
+    for limit in (256, 512, 1024, 2048):
+        if side < limit:
+            return f"<{limit}px"
+    return ">=2048px"
+
+def sorted_hist(counter):
+    def key(label):
+        digits = "".join(ch for ch in label.split("-")[0] if ch.isdigit())
+        return (label.startswith(">="), int(digits) if digits else 1 << 30)
+    return {k: counter[k] for k in sorted(counter, key=key)}
+
+def build_report(facts):
+    names = yolo_class_names()
+
+    # Labels for raw images that come from an annotation CSV in the same folder.
+    csv_labels = {}
+    for rel, f in facts.items():
+        if "labels" in f:
+            folder = os.path.dirname(rel)
+            for fname, labels in f["labels"].items():
+                csv_labels[os.path.join(folder, fname)] = labels
+
+    # Raw content hash -> source, used to attribute copies downstream.
+    hash_source = {}
+    images = {}
+    for rel, f in sorted(facts.items()):
+        if "hash" not in f:
+            continue
+        parts = rel.split(os.sep)
+        root, inner = parts[0], parts[1:]
+        if root not in ROOTS or not inner:
+            continue
+
+        info = {"root": root, "split": split_of(inner), "hash": f["hash"],
+                "size": f["size"], "dims": f.get("dims")}
+        if root == "raw":
+            info["source"] = raw_source(inner)
+            labels = csv_labels.get(rel)
+            info["class"] = "+".join(labels) if labels else inner[-2] if len(inner) > 1 else "unlabeled"
+            hash_source.setdefault(f["hash"], info["source"])
+        elif root == "processed":
+            info["class"] = inner[1] if inner[0] == "mosquitov9" and len(inner) > 2 else inner[0]
+        else:
+            label_rel = os.path.join("yolo", "labels", *inner[1:-1], os.path.splitext(inner[-1])[0] + ".txt")
+            class_id = facts.get(label_rel, {}).get("yolo_class")
+            if class_id is None and len(inner) > 2:
+                store_rel = os.path.join("yolo", "labels", inner[1] + ".npz")
+                class_id = facts.get(store_rel, {}).get("yolo_classes", {}).get(inner[-1])
+            info["class"] = names.get(class_id, str(class_id)) if class_id is not None else "unlabeled"
+        images[rel] = info
+
+    for info in images.values():
+        if info["root"] != "raw":
+            info["source"] = hash_source.get(info["hash"], "unknown")
+
+    report = {"generated_at": datetime.now(timezone.utc).isoformat(), "roots": {}}
+    for root in ROOTS:
+        subset = [i for i in images.values() if i["root"] == root]
+        by_hash = defaultdict(list)
+        for rel, info in images.items():
+            if info["root"] == root:
+                by_hash[info["hash"]].append(rel)
+        dup_groups = [sorted(v) for v in by_hash.values() if len(v) > 1]
+
+        splits = Counter(i["split"] for i in subset if i["split"])
+        split_total = sum(splits.values())
+
+        report["roots"][root] = {
+            "images": len(subset),
+            "bytes": sum(i["size"] for i in subset),
+            "classes": dict(Counter(i["class"] for i in subset).most_common()),
+            "sources": dict(Counter(i["source"] for i in subset).most_common()),
+            "class_by_source": {
+                source: dict(Counter(i["class"] for i in subset if i["source"] == source).most_common())
+                for source in sorted({i["source"] for i in subset})
+            },
+            "splits": {
+                split: {"images": n, "ratio": round(n / split_total, 4)}
+                for split, n in sorted(splits.items())
+            },
+            "duplicates": {
+                "groups": len(dup_groups),
+                "extra_copies": sum(len(g) - 1 for g in dup_groups),
+                # Same image in two splits (leakage) or two classes (label conflict).
+                "cross_split": sum(1 for g in dup_groups if len({images[r]["split"] for r in g}) > 1),
+                "cross_class": sum(1 for g in dup_groups if len({images[r]["class"] for r in g}) > 1),
+                "examples": dup_groups[:20],
+            },
+            "file_size_histogram": sorted_hist(Counter(size_bucket(i["size"]) for i in subset)),
+            "dimension_histogram": sorted_hist(Counter(dims_bucket(i["dims"]) for i in subset)),
+        }
+    return report
+
+# --------------------------------------------------
+# MAIN
+# --------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Class, source and split statistics for data/raw, processed and yolo.")
+    parser.add_argument("--output", default=OUTPUT_PATH)
+    parser.add_argument("--cache", default=CACHE_PATH)
+    parser.add_argument("--workers", type=int, default=min(32, (os.cpu_count() or 1) * 4))
+    parser.add_argument("--no-cache", action="store_true", help="Recompute every file's facts")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    cache = {} if args.no_cache else load_cache(args.cache)
+
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        files = scan_tree([os.path.join(DATA_ROOT, r) for r in ROOTS], pool)
+        t_scan = time.perf_counter() - start
+        facts, hits, misses = collect_facts(files, cache, pool)
+
+    save_cache(args.cache, facts)
+    report = build_report(facts)
+    unreadable = sorted(rel for rel, f in facts.items() if "error" in f)
+    report["scan"] = {
+        "files": len(files),
+        "unreadable": {rel: facts[rel]["error"] for rel in unreadable},
+        "cache_hits": hits,
+        "cache_misses": misses,
+        "scan_seconds": round(t_scan, 3),
+        "total_seconds": round(time.perf_counter() - start, 3),
+    }
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    print("====================================")
+    print("DATASET STATISTICS")
+    for root, stats in report["roots"].items():
+        print(f"{root:10}: {stats['images']} images, "
+              f"{stats['duplicates']['extra_copies']} duplicate copies, "
+              f"classes {stats['classes']}")
+    print(f"Files scanned : {len(files)} ({hits} cached, {misses} new/changed)")
+    if unreadable:
+        print(f"[WARN] {len(unreadable)} files could not be parsed, e.g. {unreadable[:3]} (see report scan.unreadable)")
+    print(f"Time          : {report['scan']['total_seconds']}s")
+    print(f"Saved to      : {args.output}")
+    print("====================================")
+
+if __name__ == "__main__":
+    main()
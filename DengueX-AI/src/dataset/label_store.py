@@ -0,0 +1,222 @@
+import argparse
+import csv
+import os
+
+import numpy as np
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+RAW_ROOT = os.path.join(PROJECT_ROOT, "data", "raw")
+YOLO_LBL = os.path.join(PROJECT_ROOT, "data", "yolo", "labels")
+
+SPLITS = ["train", "val", "test"]
+
+# Full-frame box used when an image has no annotated boxes.
+FULL_FRAME = (0.5, 0.5, 1.0, 1.0)
+
+# --------------------------------------------------
+# STORE LAYOUT
+# --------------------------------------------------
+# One labels/<split>.npz per split, column arrays only:
+#   filenames   : (n_images,)      image file names
+#   image_class : (n_images,)      int16 class of the image (its source folder)
+#   offsets     : (n_images + 1,)  image i owns boxes offsets[i]:offsets[i+1]
+#   class_ids   : (n_boxes,)       int16
+#   boxes       : (n_boxes, 4)     float32 YOLO cx, cy, w, h (normalized)
+
+def store_path(split, labels_dir=YOLO_LBL):
+    return os.path.join(labels_dir, f"{split}.npz")
+
+def write_store(path, records):
+    """
+    records: [(filename, image_class, [(class_id, cx, cy, w, h), ...]), ...]
+    Written to a temp file and renamed, so readers never see half a store.
+    """
+    filenames = [name for name, _, _ in records]
+    image_class = np.array([c for _, c, _ in records], dtype=np.int16)
+    counts = [len(boxes) for _, _, boxes in records]
+    offsets = np.zeros(len(records) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+
+    flat = [box for _, _, boxes in records for box in boxes]
+    class_ids = np.array([b[0] for b in flat], dtype=np.int16)
+    boxes = np.array([b[1:] for b in flat], dtype=np.float32).reshape(-1, 4)
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp.npz"
+    np.savez(tmp, filenames=np.array(filenames, dtype=str), image_class=image_class,
+             offsets=offsets, class_ids=class_ids, boxes=boxes)
+    os.replace(tmp, path)
+
+class LabelStore:
+    """
+    Read-only view of one split's labels.
+    """
+
+    def __init__(self, path):
+        with np.load(path) as data:
+            self.filenames = data["filenames"]
+            self.offsets = data["offsets"]
+            self.class_ids = data["class_ids"]
+            self.boxes = data["boxes"]
+            self.image_class = data["image_class"] if "image_class" in data.files else None
+        self.index = {str(name): i for i, name in enumerate(self.filenames)}
+
+    def __len__(self):
+        return len(self.filenames)
+
+    def __getitem__(self, i):
+        """
+        (filename, class_ids, boxes) for image i.
+        """
+        lo, hi = self.offsets[i], self.offsets[i + 1]
+        return str(self.filenames[i]), self.class_ids[lo:hi], self.boxes[lo:hi]
+
+    def labels_for(self, filename):
+        return self[self.index[filename]][1:]
+
+    def image_classes(self):
+        """
+        Class of each image (the label for classification). An image's boxes
+        may carry other classes, so this is stored rather than derived; stores
+        written before the column existed fall back to the first box.
+        """
+        if self.image_class is not None:
+            return self.image_class
+        first = np.full(len(self), -1, dtype=np.int16)
+        has_box = self.offsets[1:] > self.offsets[:-1]
+        first[has_box] = self.class_ids[self.offsets[:-1][has_box]]
+        return first
+
+def load_split(split, labels_dir=YOLO_LBL):
+    return LabelStore(store_path(split, labels_dir))
+
+# --------------------------------------------------
+# ROBOFLOW ANNOTATIONS
+# --------------------------------------------------
+
+def find_annotation_csvs(base_dir=RAW_ROOT):
+    """
+    Roboflow TensorFlow CSV exports under data/raw
+    (filename, width, height, class, xmin, ymin, xmax, ymax).
+    """
+    found = []
+    for root, _, files in os.walk(base_dir):
+        for f in files:
+            if f.lower().endswith(".csv"):
+                found.append(os.path.join(root, f))
+    return sorted(found)
+
+def load_annotation_boxes(class_of, csv_paths=None):
+    """
+    (boxes, collisions): filename -> [(class_id, cx, cy, w, h)] from every
+    Roboflow CSV, and the filenames that appear in more than one CSV.
+    Processed images keep only their file name, so a colliding name cannot
+    be traced to one CSV; its boxes are left out rather than merged.
+    ``class_of(label)`` maps an annotation class name to a YOLO class id,
+    or None to fall back to the image's class.
+    """
+    boxes, owner, collisions = {}, {}, set()
+    for path in csv_paths if csv_paths is not None else find_annotation_csvs():
+        with open(path, newline="", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            needed = {"filename", "width", "height", "class", "xmin", "ymin", "xmax", "ymax"}
+            if not reader.fieldnames or not needed <= set(reader.fieldnames):
+                continue
+            for row in reader:
+                try:
+                    width, height = float(row["width"]), float(row["height"])
+                    x0, y0 = float(row["xmin"]), float(row["ymin"])
+                    x1, y1 = float(row["xmax"]), float(row["ymax"])
+                except ValueError:
+                    continue
+                if width <= 0 or height <= 0 or x1 <= x0 or y1 <= y0:
+                    continue
+                if owner.setdefault(row["filename"], path) != path:
+                    collisions.add(row["filename"])
+                    continue
+                boxes.setdefault(row["filename"], []).append((
+                    class_of(row["class"].strip().lower()),
+                    (x0 + x1) / 2 / width,
+                    (y0 + y1) / 2 / height,
+                    (x1 - x0) / width,
+                    (y1 - y0) / height,
+                ))
+    for name in collisions:
+        boxes.pop(name, None)
+    return boxes, sorted(collisions)
+
+def image_boxes(filename, class_id, annotations):
+    """
+    Annotated boxes for the image (unknown box classes take the image's
+    class), or a single full-frame box.
+    """
+    annotated = annotations.get(filename)
+    if not annotated:
+        return [(class_id, *FULL_FRAME)]
+    return [(class_id if c is None else c, *box) for c, *box in annotated]
+
+# --------------------------------------------------
+# YOLO TEXT EXPORT
+# --------------------------------------------------
+
+def remove_yolo_txt(split, labels_dir=YOLO_LBL, keep=()):
+    """
+    Deletes labels/<split>/*.txt except ``keep``, so text labels from an
+    earlier build never outlive the store they were exported from.
+    Returns the number of files removed.
+    """
+    out_dir = os.path.join(labels_dir, split)
+    if not os.path.isdir(out_dir):
+        return 0
+    keep = set(keep)
+    removed = 0
+    for name in os.listdir(out_dir):
+        if name.endswith(".txt") and name not in keep:
+            os.remove(os.path.join(out_dir, name))
+            removed += 1
+    return removed
+
+def export_yolo_txt(split, labels_dir=YOLO_LBL):
+    """
+    Materialize labels/<split>/<name>.txt for tools that only read YOLO
+    text labels, removing any left from an earlier store. Returns the
+    number of files written.
+    """
+    store = load_split(split, labels_dir)
+    out_dir = os.path.join(labels_dir, split)
+    os.makedirs(out_dir, exist_ok=True)
+    remove_yolo_txt(split, labels_dir,
+                    keep=(os.path.splitext(str(f))[0] + ".txt" for f in store.filenames))
+
+    for i in range(len(store)):
+        filename, class_ids, boxes = store[i]
+        lines = [
+            f"{int(c)} {b[0]:.6f} {b[1]:.6f} {b[2]:.6f} {b[3]:.6f}\n"
+            for c, b in zip(class_ids, boxes)
+        ]
+        with open(os.path.join(out_dir, os.path.splitext(filename)[0] + ".txt"), "w") as out:
+            out.writelines(lines)
+    return len(store)
+
+def main():
+    parser = argparse.ArgumentParser(description="Export or inspect the YOLO label stores.")
+    parser.add_argument("command", choices=["export", "info"])
+    parser.add_argument("--split", action="append", choices=SPLITS, help="Default: every split")
+    args = parser.parse_args()
+
+    print("====================================")
+    for split in args.split or SPLITS:
+        if not os.path.exists(store_path(split)):
+            print(f"[SKIP] No label store for {split}")
+            continue
+        if args.command == "export":
+            print(f"{split:5}: wrote {export_yolo_txt(split)} label files")
+        else:
+            store = load_split(split)
+            classes, counts = np.unique(store.image_classes(), return_counts=True)
+            print(f"{split:5}: {len(store)} images, {len(store.class_ids)} boxes, "
+                  f"images per class {dict(zip(classes.tolist(), counts.tolist()))}")
+    print("====================================")
+
+if __name__ == "__main__":
+    main()
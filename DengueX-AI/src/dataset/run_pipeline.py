@@ -0,0 +1,270 @@
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+STATE_PATH = os.path.join(PROJECT_ROOT, "data", "cache", "pipeline_state.json")
+LOG_DIR = os.path.join(PROJECT_ROOT, "data", "cache", "pipeline_logs")
+
+# --------------------------------------------------
+# STAGES (IN THE ORDER THEY USED TO BE RUN BY HAND)
+# --------------------------------------------------
+# Paths are relative to DengueX-AI/. A stage depends on every earlier
+# stage that writes one of its inputs or one of its outputs, so writers
+# of the same folder keep their original order and everything else may
+# run in parallel.
+
+STAGES = [
+    {
+        "name": "split_roboflow",
+        "script": "split_roboflow_tensorflow_csv.py",
+        "inputs": ["data/raw/train", "data/raw/valid", "data/raw/test"],
+        "outputs": ["data/processed/dengue_mosquito", "data/processed/non_dengue_mosquito",
+                    "data/processed/non_mosquito"],
+    },
+    {
+        "name": "split_mosquitov9",
+        "script": "split_mosquito_v9_csv.py",
+        "inputs": ["data/raw/mosquitov9"],
+        "outputs": ["data/processed/mosquitov9"],
+    },
+    {
+        "name": "add_aedes",
+        "script": "add_aedes_from_kaggle.py",
+        "inputs": ["data/raw/aedes_kaggle"],
+        "outputs": ["data/processed/dengue_mosquito"],
+    },
+    {
+        "name": "add_non_dengue",
+        "script": "add_non_dengue_from_kaggle.py",
+        "inputs": ["data/raw/aedes_kaggle"],
+        "outputs": ["data/processed/non_dengue_mosquito"],
+    },
+    {
+        "name": "add_non_mosquito",
+        "script": "add_non_mosquito_objects.py",
+        "inputs": ["data/raw/non_mosquito_kaggle"],
+        "outputs": ["data/processed/non_mosquito_object"],
+    },
+    {
+        "name": "build_final",
+        "script": "build_final_mosquito_dataset.py",
+        "inputs": ["data/raw"],
+        "outputs": ["data/processed/dengue_mosquito", "data/processed/non_dengue_mosquito"],
+    },
+    {
+        "name": "labels_2class",
+        "script": "create_classification_labels.py",
+        "inputs": ["data/processed/dengue_mosquito", "data/processed/non_dengue_mosquito"],
+        "outputs": ["data/annotations/classification_labels.csv"],
+    },
+    {
+        "name": "labels_3class",
+        "script": "update_classification_labels_3class.py",
+        "inputs": ["data/processed/dengue_mosquito", "data/processed/non_dengue_mosquito",
+                   "data/processed/non_mosquito_object"],
+        "outputs": ["data/annotations/classification_labels_3class.csv"],
+    },
+    {
+        "name": "build_yolo",
+        "script": "build_yolo_dataset.py",
+        "inputs": ["data/processed/dengue_mosquito", "data/processed/non_dengue_mosquito",
+                   "data/processed/non_mosquito_object", "data/raw"],
+        "outputs": ["data/yolo/images", "data/yolo/labels"],
+    },
+    {
+        "name": "stats",
+        "script": "dataset_stats.py",
+        "inputs": ["data/raw", "data/processed", "data/yolo"],
+        "outputs": ["data/dataset_stats.json"],
+    },
+]
+
+def overlaps(a, b):
+    return a == b or a.startswith(b + "/") or b.startswith(a + "/")
+
+def dependencies(stages):
+    deps = {}
+    for i, stage in enumerate(stages):
+        touched = stage["inputs"] + stage["outputs"]
+        deps[stage["name"]] = {
+            earlier["name"]
+            for earlier in stages[:i]
+            if any(overlaps(out, path) for out in earlier["outputs"] for path in touched)
+        }
+    return deps
+
+# --------------------------------------------------
+# FINGERPRINTS
+# --------------------------------------------------
+
+def fingerprint_paths(paths):
+    """
+    Hash of (relative path, size, mtime) for every file under ``paths``.
+    Stat-only, so a large unchanged tree costs a directory walk, not a read.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    stack = [os.path.join(PROJECT_ROOT, p) for p in sorted(paths)]
+    while stack:
+        path = stack.pop()
+        if os.path.isfile(path):
+            st = os.stat(path)
+            h.update(f"{os.path.relpath(path, PROJECT_ROOT)}|{st.st_size}|{st.st_mtime_ns}\n".encode())
+            continue
+        if not os.path.isdir(path):
+            continue
+        with os.scandir(path) as it:
+            entries = sorted(it, key=lambda e: e.name)
+        for entry in reversed(entries):
+            if entry.is_dir(follow_symlinks=False):
+                stack.append(entry.path)
+            elif entry.is_file(follow_symlinks=False):
+                st = entry.stat(follow_symlinks=False)
+                h.update(f"{os.path.relpath(entry.path, PROJECT_ROOT)}|{st.st_size}|{st.st_mtime_ns}\n".encode())
+    return h.hexdigest()
+
+def stage_key(stage):
+    """
+    What the stage's result depends on: its script and its inputs.
+    """
+    with open(os.path.join(SCRIPT_DIR, stage["script"]), "rb") as f:
+        script = hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+    return f"{script}:{fingerprint_paths(stage['inputs'])}"
+
+def load_state():
+    if not os.path.exists(STATE_PATH):
+        return {}
+    with open(STATE_PATH, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def save_state(state):
+    os.makedirs(os.path.dirname(STATE_PATH), exist_ok=True)
+    tmp = STATE_PATH + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp, STATE_PATH)
+
+# --------------------------------------------------
+# RUNNING
+# --------------------------------------------------
+
+def run_stage(stage):
+    os.makedirs(LOG_DIR, exist_ok=True)
+    log_path = os.path.join(LOG_DIR, f"{stage['name']}.log")
+    start = time.perf_counter()
+    with open(log_path, "w", encoding="utf-8") as log:
+        proc = subprocess.run(
+            [sys.executable, os.path.join(SCRIPT_DIR, stage["script"])],
+            cwd=PROJECT_ROOT, stdout=log, stderr=subprocess.STDOUT,
+        )
+    return proc.returncode, time.perf_counter() - start, log_path
+
+def plan(stages, state, deps, force):
+    """
+    Decide per stage: "no input", or stale with a reason, or up to date.
+    Stale stages also make every stage that depends on them stale.
+    """
+    decisions = {}
+    for stage in stages:
+        name = stage["name"]
+        prev = state.get(name, {})
+        if not any(os.path.exists(os.path.join(PROJECT_ROOT, p)) for p in stage["inputs"]):
+            decisions[name] = ("skip", "no input")
+        elif force:
+            decisions[name] = ("run", "forced")
+        elif any(decisions[d][0] == "run" for d in deps[name]):
+            decisions[name] = ("run", "upstream changed")
+        elif prev.get("key") != stage_key(stage):
+            decisions[name] = ("run", "inputs or script changed" if prev else "never run")
+        elif prev.get("outputs") != fingerprint_paths(stage["outputs"]):
+            decisions[name] = ("run", "outputs changed")
+        else:
+            decisions[name] = ("skip", "up to date")
+    return decisions
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the DengueX-AI dataset scripts in dependency order, "
+                                                 "skipping stages whose inputs have not changed.")
+    parser.add_argument("--jobs", type=int, default=3, help="Stages to run in parallel")
+    parser.add_argument("--force", action="store_true", help="Run every stage")
+    parser.add_argument("--dry-run", action="store_true", help="Show the plan without running")
+    args = parser.parse_args()
+
+    stages = {s["name"]: s for s in STAGES}
+    deps = dependencies(STAGES)
+    state = load_state()
+    decisions = plan(STAGES, state, deps, args.force)
+
+    print("[INFO] Plan:")
+    for stage in STAGES:
+        action, reason = decisions[stage["name"]]
+        after = f" after {', '.join(sorted(deps[stage['name']]))}" if deps[stage["name"]] else ""
+        print(f"  {stage['name']:18} {action:4} ({reason}){after}")
+    if args.dry_run:
+        return
+
+    results = {}
+    pipeline_start = time.perf_counter()
+    todo = [n for n in stages if decisions[n][0] == "run"]
+
+    with ThreadPoolExecutor(max_workers=args.jobs) as pool:
+        running = {}
+        while todo or running:
+            for name in list(todo):
+                waiting_on = [d for d in deps[name] if decisions[d][0] == "run"]
+                if any(results.get(d, ("",))[0] in ("failed", "blocked") for d in waiting_on):
+                    results[name] = ("blocked", 0.0, None)
+                    todo.remove(name)
+                elif all(d in results for d in waiting_on):
+                    print(f"[RUN ] {name}")
+                    running[pool.submit(run_stage, stages[name])] = name
+                    todo.remove(name)
+
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                code, seconds, log_path = future.result()
+                results[name] = ("ok" if code == 0 else "failed", seconds, log_path)
+                print(f"[{'DONE' if code == 0 else 'FAIL'}] {name} ({seconds:.1f}s)")
+                if code == 0:
+                    state[name] = {"key": stage_key(stages[name]), "seconds": round(seconds, 3)}
+                else:
+                    state.pop(name, None)
+
+    # Record outputs as the whole pipeline left them: several stages write
+    # the same folders, so a stage's own end state is not the final one.
+    for name, entry in state.items():
+        if name in stages and results.get(name, ("ok",))[0] == "ok":
+            entry["outputs"] = fingerprint_paths(stages[name]["outputs"])
+    save_state(state)
+    wall = time.perf_counter() - pipeline_start
+
+    print("====================================")
+    print("DATASET PIPELINE REPORT")
+    print(f"{'stage':18}{'status':>12}{'seconds':>10}")
+    for stage in STAGES:
+        name = stage["name"]
+        status, seconds, _ = results.get(name, (decisions[name][1], 0.0, None))
+        print(f"{name:18}{status:>12}{seconds:>10.1f}")
+    busy = sum(r[1] for r in results.values())
+    print(f"Stage time    : {busy:.1f}s")
+    print(f"Wall time     : {wall:.1f}s")
+    print("====================================")
+
+    failed = [n for n, r in results.items() if r[0] == "failed"]
+    for name in failed:
+        print(f"[FAIL] {name}: see {results[name][2]}")
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
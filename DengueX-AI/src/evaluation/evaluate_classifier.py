@@ -0,0 +1,292 @@
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+DATA_ROOT = os.path.join(PROJECT_ROOT, "data")
+YOLO_IMG = os.path.join(DATA_ROOT, "yolo", "images")
+PREDICTION_CACHE = os.path.join(DATA_ROOT, "cache", "predictions")
+OUTPUT_DIR = os.path.join(DATA_ROOT, "evaluation")
+
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "src", "dataset"))
+from dataset_stats import (  # noqa: E402
+    CACHE_PATH, collect_facts, load_cache, raw_source, save_cache, scan_tree, yolo_class_names,
+)
+from label_store import load_split  # noqa: E402
+
+# Same defaults as the backend classifier (an Ultralytics classification
+# export); a "<model>.json" sidecar overrides them.
+DEFAULT_META = {
+    "input_size": 224,
+    "mean": [0.0, 0.0, 0.0],
+    "std": [1.0, 1.0, 1.0],
+    "outputs_are_probabilities": False,
+}
+
+CALIBRATION_BINS = 10
+
+# --------------------------------------------------
+# MODEL
+# --------------------------------------------------
+
+def load_meta(model_path):
+    meta = dict(DEFAULT_META)
+    sidecar = os.path.splitext(model_path)[0] + ".json"
+    if os.path.exists(sidecar):
+        with open(sidecar, "r", encoding="utf-8") as f:
+            meta.update(json.load(f))
+    return meta
+
+def model_hash(model_path, meta):
+    """
+    Model file plus preprocessing metadata: either changing means new predictions.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    with open(model_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    h.update(json.dumps(meta, sort_keys=True).encode())
+    return h.hexdigest()
+
+def preprocess(path, meta):
+    """
+    Short-side resize and center crop to a float32 CHW array, like the
+    backend classifier.
+    """
+    size = meta["input_size"]
+    with Image.open(path) as img:
+        img = img.convert("RGB")
+        w, h = img.size
+        scale = size / min(w, h)
+        img = img.resize((max(size, round(w * scale)), max(size, round(h * scale))))
+    w, h = img.size
+    left, top = (w - size) // 2, (h - size) // 2
+    img = img.crop((left, top, left + size, top + size))
+
+    arr = np.asarray(img, dtype=np.float32) / 255.0
+    arr = (arr - np.asarray(meta["mean"], dtype=np.float32)) / np.asarray(meta["std"], dtype=np.float32)
+    return arr.transpose(2, 0, 1)
+
+def softmax(logits):
+    z = logits - logits.max(axis=1, keepdims=True)
+    e = np.exp(z)
+    return e / e.sum(axis=1, keepdims=True)
+
+def run_inference(model_path, meta, paths, batch_size, workers):
+    """
+    (N, num_classes) probabilities. Decoding runs on a thread pool one
+    batch ahead of the session.
+    """
+    import onnxruntime as ort
+
+    session = ort.InferenceSession(model_path, providers=["CPUExecutionProvider"])
+    model_input = session.get_inputs()[0]
+    fixed_single = model_input.shape[0] == 1
+
+    def load_batch(batch_paths):
+        return np.stack(list(pool.map(lambda p: preprocess(p, meta), batch_paths)))
+
+    outputs = []
+    with ThreadPoolExecutor(max_workers=workers) as pool, ThreadPoolExecutor(max_workers=1) as loader:
+        batches = [paths[i:i + batch_size] for i in range(0, len(paths), batch_size)]
+        pending = loader.submit(load_batch, batches[0]) if batches else None
+        for i in range(len(batches)):
+            batch = pending.result()
+            if i + 1 < len(batches):
+                pending = loader.submit(load_batch, batches[i + 1])
+            if fixed_single:
+                out = np.concatenate([session.run(None, {model_input.name: batch[j:j + 1]})[0]
+                                      for j in range(len(batch))])
+            else:
+                out = session.run(None, {model_input.name: batch})[0]
+            outputs.append(out)
+            print(f"\r[INFO] Inference {min((i + 1) * batch_size, len(paths))}/{len(paths)}", end="", flush=True)
+    print()
+
+    probs = np.concatenate(outputs).astype(np.float32)
+    return probs if meta["outputs_are_probabilities"] else softmax(probs)
+
+# --------------------------------------------------
+# PREDICTION CACHE (PER MODEL HASH, KEYED BY IMAGE CONTENT)
+# --------------------------------------------------
+
+def cache_path(mhash):
+    return os.path.join(PREDICTION_CACHE, f"{mhash}.npz")
+
+def load_predictions(mhash):
+    path = cache_path(mhash)
+    if not os.path.exists(path):
+        return {}
+    with np.load(path) as data:
+        return dict(zip(map(str, data["hashes"]), data["probs"]))
+
+def save_predictions(mhash, cached):
+    os.makedirs(PREDICTION_CACHE, exist_ok=True)
+    hashes = sorted(cached)
+    tmp = cache_path(mhash) + ".tmp.npz"
+    np.savez(tmp, hashes=np.array(hashes, dtype=str), probs=np.stack([cached[h] for h in hashes]))
+    os.replace(tmp, cache_path(mhash))
+
+# --------------------------------------------------
+# SOURCE ATTRIBUTION
+# --------------------------------------------------
+
+def image_hashes_and_sources(split, workers):
+    """
+    Content hash of every image in yolo/images/<split>, and the raw source
+    dataset each hash first appears in. Uses dataset_stats.py's file cache.
+    """
+    roots = [os.path.join(DATA_ROOT, "raw"), os.path.join(YOLO_IMG, split)]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        files = scan_tree(roots, pool)
+        facts, _, _ = collect_facts(files, load_cache(CACHE_PATH), pool)
+    # Merge so entries for other roots stay cached.
+    save_cache(CACHE_PATH, {**load_cache(CACHE_PATH), **facts})
+
+    hash_source, by_name = {}, {}
+    for rel, f in sorted(facts.items()):
+        if "hash" not in f:
+            continue
+        parts = rel.split(os.sep)
+        if parts[0] == "raw":
+            hash_source.setdefault(f["hash"], raw_source(parts[1:]))
+        else:
+            by_name[parts[-1]] = f["hash"]
+    return by_name, hash_source
+
+# --------------------------------------------------
+# METRICS (VECTORIZED)
+# --------------------------------------------------
+
+def metrics(y_true, probs, num_classes):
+    y_pred = probs.argmax(axis=1)
+    confidence = probs.max(axis=1)
+    correct = (y_pred == y_true).astype(np.float64)
+    n = len(y_true)
+
+    confusion = np.bincount(y_true * num_classes + y_pred, minlength=num_classes * num_classes)
+    confusion = confusion.reshape(num_classes, num_classes)
+    tp = np.diag(confusion).astype(np.float64)
+    predicted = confusion.sum(axis=0)
+    actual = confusion.sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        precision = np.where(predicted > 0, tp / predicted, 0.0)
+        recall = np.where(actual > 0, tp / actual, 0.0)
+        f1 = np.where(precision + recall > 0, 2 * precision * recall / (precision + recall), 0.0)
+
+    # Reliability bins over the top-class confidence.
+    bins = np.minimum((confidence * CALIBRATION_BINS).astype(np.int64), CALIBRATION_BINS - 1)
+    bin_count = np.bincount(bins, minlength=CALIBRATION_BINS)
+    bin_correct = np.bincount(bins, weights=correct, minlength=CALIBRATION_BINS)
+    bin_conf = np.bincount(bins, weights=confidence, minlength=CALIBRATION_BINS)
+    ece = float(np.abs(bin_correct - bin_conf).sum() / n) if n else 0.0
+
+    one_hot = np.eye(num_classes, dtype=np.float32)[y_true]
+    brier = float(((probs - one_hot) ** 2).sum(axis=1).mean()) if n else 0.0
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        reliability = [
+            {"bin": f"{b / CALIBRATION_BINS:.1f}-{(b + 1) / CALIBRATION_BINS:.1f}", "count": int(c),
+             "accuracy": round(float(bin_correct[b] / c), 4), "confidence": round(float(bin_conf[b] / c), 4)}
+            for b, c in enumerate(bin_count) if c
+        ]
+
+    return {
+        "images": n,
+        "accuracy": round(float(correct.mean()), 4) if n else 0.0,
+        "confusion": confusion.tolist(),
+        "precision": precision.round(4).tolist(),
+        "recall": recall.round(4).tolist(),
+        "f1": f1.round(4).tolist(),
+        "macro_f1": round(float(f1[actual > 0].mean()), 4) if (actual > 0).any() else 0.0,
+        "ece": round(ece, 4),
+        "brier": round(brier, 4),
+        "reliability": reliability,
+    }
+
+# --------------------------------------------------
+# MAIN
+# --------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate an ONNX classifier on the YOLO test split, stratified by source dataset.")
+    parser.add_argument("--model", required=True, help="ONNX classification model")
+    parser.add_argument("--split", default="test")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--output", help=f"Default: {OUTPUT_DIR}/<model>_<split>.json")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    names = yolo_class_names()
+    num_classes = max(names) + 1 if names else 3
+
+    store = load_split(args.split)
+    y_all = store.image_classes().astype(np.int64)
+    filenames = [str(f) for f in store.filenames]
+    by_name, hash_source = image_hashes_and_sources(args.split, args.workers)
+    # Labelled images missing from yolo/images/<split> (or unreadable) are
+    # skipped and listed in the report.
+    skipped = sorted(f for f, y in zip(filenames, y_all) if y >= 0 and f not in by_name)
+    keep = [i for i, f in enumerate(filenames) if y_all[i] >= 0 and f in by_name]
+    filenames = [filenames[i] for i in keep]
+    y_true = y_all[keep]
+
+    hashes = [by_name[f] for f in filenames]
+    sources = np.array([hash_source.get(h, "unknown") for h in hashes])
+
+    meta = load_meta(args.model)
+    mhash = model_hash(args.model, meta)
+    cached = load_predictions(mhash)
+    missing = sorted({h: f for h, f in zip(hashes, filenames) if h not in cached}.items())
+    if missing:
+        paths = [os.path.join(YOLO_IMG, args.split, f) for _, f in missing]
+        probs = run_inference(args.model, meta, paths, args.batch_size, args.workers)
+        cached.update(zip((h for h, _ in missing), probs))
+        save_predictions(mhash, cached)
+
+    probs = np.stack([cached[h] for h in hashes]) if hashes else np.zeros((0, num_classes), np.float32)
+    report = {
+        "model": os.path.abspath(args.model),
+        "model_hash": mhash,
+        "split": args.split,
+        "classes": [names.get(i, str(i)) for i in range(num_classes)],
+        "overall": metrics(y_true, probs, num_classes),
+        "by_source": {
+            source: metrics(y_true[sources == source], probs[sources == source], num_classes)
+            for source in sorted(set(sources.tolist()))
+        },
+        "inferred_images": len(missing),
+        "cached_images": len(set(hashes)) - len(missing),
+        "skipped_images": skipped,
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+
+    output = args.output or os.path.join(
+        OUTPUT_DIR, f"{os.path.splitext(os.path.basename(args.model))[0]}_{args.split}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    print("====================================")
+    print(f"CLASSIFIER EVALUATION ({args.split})")
+    print(f"{'source':22}{'images':>8}{'acc':>8}{'macroF1':>9}{'ECE':>8}  recall per class")
+    rows = [("overall", report["overall"])] + list(report["by_source"].items())
+    for source, m in rows:
+        print(f"{source:22}{m['images']:>8}{m['accuracy']:>8.3f}{m['macro_f1']:>9.3f}{m['ece']:>8.3f}  {m['recall']}")
+    print(f"Confusion (rows = true): {report['overall']['confusion']}")
+    print(f"Inference     : {len(missing)} images ({report['cached_images']} from cache)")
+    if skipped:
+        print(f"Skipped       : {len(skipped)} labelled images not found or unreadable, e.g. {skipped[:3]}")
+    print(f"Saved to      : {output}")
+    print("====================================")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,320 @@
+import argparse
+import multiprocessing as mp
+import os
+import queue
+import sys
+import time
+import traceback
+from multiprocessing import shared_memory
+
+import numpy as np
+from PIL import Image
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+YOLO_IMG = os.path.join(PROJECT_ROOT, "data", "yolo", "images")
+
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "src", "dataset"))
+from label_store import load_split  # noqa: E402
+
+# ImageNet statistics, applied by the trainer after it reads a batch.
+MEAN = np.array([0.485, 0.456, 0.406], dtype=np.float32)
+STD = np.array([0.229, 0.224, 0.225], dtype=np.float32)
+
+# --------------------------------------------------
+# AUGMENTATION (ONE IMAGE, WRITTEN IN PLACE)
+# --------------------------------------------------
+
+def random_resized_crop(img, size, rng, scale=(0.6, 1.0), ratio=(3 / 4, 4 / 3)):
+    width, height = img.size
+    area = width * height
+    for _ in range(10):
+        target = area * rng.uniform(*scale)
+        aspect = np.exp(rng.uniform(np.log(ratio[0]), np.log(ratio[1])))
+        w = int(round(np.sqrt(target * aspect)))
+        h = int(round(np.sqrt(target / aspect)))
+        if 0 < w <= width and 0 < h <= height:
+            x = int(rng.integers(0, width - w + 1))
+            y = int(rng.integers(0, height - h + 1))
+            return img.resize((size, size), Image.BILINEAR, box=(x, y, x + w, y + h))
+    return img.resize((size, size), Image.BILINEAR)
+
+def color_jitter(pixels, rng, strength=0.3):
+    """
+    Brightness, contrast and saturation on a float32 HxWx3 array in 0..255.
+    """
+    pixels *= rng.uniform(1 - strength, 1 + strength)
+
+    mean = pixels.mean()
+    pixels -= mean
+    pixels *= rng.uniform(1 - strength, 1 + strength)
+    pixels += mean
+
+    gray = pixels @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+    pixels -= gray[..., None]
+    pixels *= rng.uniform(1 - strength, 1 + strength)
+    pixels += gray[..., None]
+    return pixels
+
+def augment_into(out, path, rng):
+    """
+    Crop, flip and jitter one image straight into ``out`` (a uint8 slot row).
+    """
+    with Image.open(path) as img:
+        img = random_resized_crop(img.convert("RGB"), out.shape[0], rng)
+    pixels = np.asarray(img, dtype=np.float32)
+    if rng.random() < 0.5:
+        pixels = pixels[:, ::-1]
+    np.clip(color_jitter(pixels, rng), 0, 255, out=pixels)
+    out[...] = pixels
+
+# --------------------------------------------------
+# WORKER PROCESS
+# --------------------------------------------------
+# Slots are shared-memory blocks of [batch, size, size, 3] uint8 pixels
+# plus [batch] int16 labels. Workers take a free slot, fill it and pass
+# its index on; only small integers go through the queues.
+
+def worker_main(worker_id, slot_names, batch_size, image_size, paths, labels,
+                tasks, free_slots, ready, seed):
+    blocks = [shared_memory.SharedMemory(name=n) for n in slot_names]
+    views = [slot_arrays(b, batch_size, image_size) for b in blocks]
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            epoch, batch_no, indices = task
+            rng = np.random.default_rng((seed, epoch, batch_no))
+            slot = free_slots.get()
+            images, slot_labels = views[slot]
+
+            start = time.perf_counter()
+            try:
+                for row, i in enumerate(indices):
+                    augment_into(images[row], paths[i], rng)
+                    slot_labels[row] = labels[i]
+            except Exception:
+                free_slots.put(slot)
+                ready.put(("error", worker_id, traceback.format_exc()))
+                continue
+            ready.put(("batch", worker_id, slot, epoch, batch_no, len(indices),
+                       time.perf_counter() - start))
+    finally:
+        del views
+        for b in blocks:
+            b.close()
+
+def slot_arrays(block, batch_size, image_size):
+    pixels = batch_size * image_size * image_size * 3
+    images = np.ndarray((batch_size, image_size, image_size, 3), dtype=np.uint8, buffer=block.buf)
+    labels = np.ndarray((batch_size,), dtype=np.int16, buffer=block.buf, offset=pixels)
+    return images, labels
+
+# --------------------------------------------------
+# LOADER
+# --------------------------------------------------
+
+def split_samples(split):
+    """
+    (image paths, image classes) for data/yolo/images/<split>, from the
+    split's label store.
+    """
+    store = load_split(split)
+    image_dir = os.path.join(YOLO_IMG, split)
+    paths = [os.path.join(image_dir, str(name)) for name in store.filenames]
+    return paths, store.image_classes()
+
+class AugmentLoader:
+    """
+    Iterates (images, labels) batches augmented by worker processes.
+
+    ``prefetch`` is the number of ring slots, i.e. how many batches may be
+    ready or in progress ahead of the trainer. Yielded arrays are views of
+    shared memory and stay valid until the next batch is requested; copy
+    them to keep them longer.
+    """
+
+    def __init__(self, split="train", batch_size=32, image_size=224, workers=4,
+                 prefetch=8, shuffle=True, drop_last=True, seed=0):
+        self.paths, self.labels = split_samples(split)
+        self.batch_size = batch_size
+        self.image_size = image_size
+        self.workers = workers
+        self.prefetch = max(prefetch, workers)
+        self.shuffle = shuffle
+        self.drop_last = drop_last
+        self.seed = seed
+        self.epoch = 0
+
+        self.blocks = []
+        self.processes = []
+        self.worker_images = np.zeros(workers, dtype=np.int64)
+        self.worker_seconds = np.zeros(workers, dtype=np.float64)
+        self.wait_seconds = 0.0
+        self.batches = 0
+
+    def __len__(self):
+        n = len(self.paths)
+        return n // self.batch_size if self.drop_last else -(-n // self.batch_size)
+
+    def start(self):
+        ctx = mp.get_context("spawn")
+        slot_bytes = self.batch_size * (self.image_size * self.image_size * 3 + 2)
+        self.blocks = [shared_memory.SharedMemory(create=True, size=slot_bytes)
+                       for _ in range(self.prefetch)]
+        self.views = [slot_arrays(b, self.batch_size, self.image_size) for b in self.blocks]
+
+        self.tasks = ctx.Queue()
+        self.free_slots = ctx.Queue()
+        self.ready = ctx.Queue()
+        for slot in range(self.prefetch):
+            self.free_slots.put(slot)
+
+        names = [b.name for b in self.blocks]
+        labels = self.labels.tolist()
+        self.processes = [
+            ctx.Process(
+                target=worker_main,
+                args=(w, names, self.batch_size, self.image_size, self.paths, labels,
+                      self.tasks, self.free_slots, self.ready, self.seed),
+                daemon=True,
+            )
+            for w in range(self.workers)
+        ]
+        for p in self.processes:
+            p.start()
+        return self
+
+    def __iter__(self):
+        if not self.processes:
+            self.start()
+
+        order = np.arange(len(self.paths))
+        if self.shuffle:
+            np.random.default_rng((self.seed, self.epoch)).shuffle(order)
+        n_batches = len(self)
+        for b in range(n_batches):
+            self.tasks.put((self.epoch, b, order[b * self.batch_size:(b + 1) * self.batch_size].tolist()))
+
+        held = None
+        received = 0
+        try:
+            while received < n_batches:
+                if held is not None:
+                    self.free_slots.put(held)
+                    held = None
+
+                start = time.perf_counter()
+                msg = self.next_message()
+                self.wait_seconds += time.perf_counter() - start
+                if msg[0] == "error":
+                    raise RuntimeError(f"Augmentation worker {msg[1]} failed:\n{msg[2]}")
+
+                _, worker_id, slot, epoch, _, n, seconds = msg
+                if epoch != self.epoch:
+                    # Left over from an epoch the trainer stopped early.
+                    self.free_slots.put(slot)
+                    continue
+                received += 1
+                self.worker_images[worker_id] += n
+                self.worker_seconds[worker_id] += seconds
+                self.batches += 1
+
+                held = slot
+                images, labels = self.views[slot]
+                yield images[:n], labels[:n]
+        finally:
+            if held is not None:
+                self.free_slots.put(held)
+            self.epoch += 1
+
+    def next_message(self):
+        while True:
+            try:
+                return self.ready.get(timeout=1.0)
+            except queue.Empty:
+                dead = [w for w, p in enumerate(self.processes) if not p.is_alive()]
+                if dead:
+                    raise RuntimeError(f"Augmentation workers {dead} exited unexpectedly")
+
+    def stats(self):
+        """
+        Per-worker images/second while augmenting, and the time the trainer
+        spent blocked waiting for a batch (near zero means it never starved).
+        """
+        busy = np.maximum(self.worker_seconds, 1e-9)
+        return {
+            "batches": self.batches,
+            "worker_images_per_second": (self.worker_images / busy).round(1).tolist(),
+            "total_images_per_second": round(float((self.worker_images / busy).sum()), 1),
+            "trainer_wait_seconds": round(self.wait_seconds, 3),
+        }
+
+    def close(self):
+        for _ in self.processes:
+            self.tasks.put(None)
+        for p in self.processes:
+            p.join(timeout=5)
+            if p.is_alive():
+                p.terminate()
+        self.processes = []
+        self.views = []
+        for b in self.blocks:
+            b.close()
+            b.unlink()
+        self.blocks = []
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+def to_tensor_layout(images):
+    """
+    uint8 NHWC batch -> normalized float32 NCHW, ready for torch.from_numpy.
+    """
+    x = images.astype(np.float32) / 255.0
+    x -= MEAN
+    x /= STD
+    return np.ascontiguousarray(x.transpose(0, 3, 1, 2))
+
+# --------------------------------------------------
+# THROUGHPUT BENCHMARK
+# --------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure augmentation throughput against a simulated training step.")
+    parser.add_argument("--split", default="train")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--image-size", type=int, default=224)
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) - 1))
+    parser.add_argument("--prefetch", type=int, default=8, help="Ring slots (batches in flight)")
+    parser.add_argument("--epochs", type=int, default=1)
+    parser.add_argument("--step-ms", type=float, default=0.0, help="Simulated training step per batch")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    with AugmentLoader(args.split, args.batch_size, args.image_size, args.workers, args.prefetch) as loader:
+        images_seen = 0
+        for _ in range(args.epochs):
+            for images, labels in loader:
+                to_tensor_layout(images)
+                images_seen += len(labels)
+                if args.step_ms:
+                    time.sleep(args.step_ms / 1000)
+        stats = loader.stats()
+    elapsed = time.perf_counter() - start
+
+    print("====================================")
+    print("AUGMENTATION LOADER")
+    print(f"Workers / slots        : {args.workers} / {max(args.prefetch, args.workers)}")
+    print(f"Batches                : {stats['batches']} ({images_seen} images)")
+    print(f"Per-worker images/s    : {stats['worker_images_per_second']}")
+    print(f"Workers combined       : {stats['total_images_per_second']} images/s")
+    print(f"Trainer received       : {images_seen / elapsed:.1f} images/s")
+    print(f"Trainer waited         : {stats['trainer_wait_seconds']}s of {elapsed:.1f}s")
+    print("====================================")
+
+if __name__ == "__main__":
+    main()
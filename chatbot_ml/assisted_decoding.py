@@ -0,0 +1,121 @@
+import torch
+from transformers import (
+    LogitsProcessorList,
+    NoRepeatNGramLogitsProcessor,
+    RepetitionPenaltyLogitsProcessor,
+)
+
+# =========================
+# DRAFTS
+# =========================
+
+NGRAM_SIZES = (3, 2, 1)
+
+def propose(generated, drafts, num_tokens):
+    """
+    Next ``num_tokens`` draft tokens: find the longest recent n-gram of the
+    generated sequence inside a draft and continue from there. At the very
+    start the best draft is proposed from its beginning.
+    """
+    if len(generated) <= 1:
+        return drafts[0][:num_tokens] if drafts else []
+
+    for n in NGRAM_SIZES:
+        if len(generated) < n:
+            continue
+        tail = generated[-n:]
+        for draft in drafts:
+            for i in range(len(draft) - n):
+                if draft[i:i + n] == tail:
+                    return draft[i + n:i + n + num_tokens]
+    return []
+
+# =========================
+# KV CACHE
+# =========================
+
+def crop_cache(past, length):
+    """
+    Drop decoder self-attention entries past ``length`` (rejected draft
+    tokens). Cross-attention entries depend only on the encoder.
+    """
+    if hasattr(past, "crop"):
+        past.crop(length)
+        return past
+    return tuple(
+        (layer[0][:, :, :length], layer[1][:, :, :length]) + tuple(layer[2:])
+        for layer in past
+    )
+
+# =========================
+# DECODING
+# =========================
+
+@torch.no_grad()
+def assisted_greedy(model, input_ids, attention_mask, drafts, max_length,
+                    repetition_penalty=1.0, no_repeat_ngram_size=0, num_draft_tokens=10):
+    """
+    Greedy decoding for one encoder-decoder input, verifying draft tokens
+    in bulk.
+
+    Each step feeds the last accepted token plus up to ``num_draft_tokens``
+    draft tokens through the decoder in one pass. Position j's logits go
+    through the same logits processors ``model.generate`` uses, with the
+    exact prefix plain greedy decoding would have at that point, and the
+    argmax is taken. The argmax is accepted; if it equals draft token j the
+    next position's logits (which assumed that token) are valid too,
+    otherwise verification stops there. Every emitted token is therefore
+    the token greedy decoding would have emitted, so the output is the
+    same sequence; a draft only changes how many tokens each decoder pass
+    produces.
+
+    Returns (token_ids, decoder_passes).
+    """
+    config = model.generation_config
+    eos = config.eos_token_id
+    eos_ids = set(eos if isinstance(eos, list) else [eos])
+
+    processors = LogitsProcessorList()
+    if repetition_penalty != 1.0:
+        processors.append(RepetitionPenaltyLogitsProcessor(repetition_penalty))
+    if no_repeat_ngram_size:
+        processors.append(NoRepeatNGramLogitsProcessor(no_repeat_ngram_size))
+
+    encoder_outputs = model.get_encoder()(input_ids=input_ids, attention_mask=attention_mask)
+    generated = [config.decoder_start_token_id]
+    past = None
+    passes = 0
+
+    while len(generated) < max_length:
+        draft = propose(generated, drafts, min(num_draft_tokens, max_length - len(generated) - 1))
+        feed = generated[-1:] + draft if past is not None else generated + draft
+
+        out = model(
+            encoder_outputs=encoder_outputs,
+            attention_mask=attention_mask,
+            decoder_input_ids=torch.tensor([feed], device=input_ids.device),
+            past_key_values=past,
+            use_cache=True,
+        )
+        passes += 1
+        logits = out.logits[0, -(len(draft) + 1):]
+
+        done = False
+        for j in range(len(draft) + 1):
+            prefix = torch.tensor([generated], device=input_ids.device)
+            scores = processors(prefix, logits[j:j + 1].clone())
+            token = int(scores.argmax(dim=-1))
+            generated.append(token)
+
+            if token in eos_ids or len(generated) >= max_length:
+                done = True
+                break
+            if j == len(draft) or token != draft[j]:
+                break
+
+        if done:
+            break
+        # Everything but the newest token is now in the cache.
+        past = crop_cache(out.past_key_values, len(generated) - 1)
+
+    return generated, passes
@@ -1,25 +1,82 @@
-import re
-import torch
-from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+import json
+import os
+import threading
 
-from knowledge_base.canonical_answers import CANONICAL_ANSWERS
-from knowledge_base.question_classifier import classify_question
+from knowledge_base import snapshot as knowledge_base
+from text_normalization import clean_question, compile_literal_patterns, normalize_for_matching
 
 # =========================
 # MODEL LOADING
 # =========================
 
-MODEL_PATH = "model/denguex_flan_t5_final"
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
-device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+# Point DENGUEX_MODEL_PATH at another checkpoint (e.g. the distilled
+# student from scripts/distill_student.py) to serve it instead.
+MODEL_PATH = os.environ.get(
+    "DENGUEX_MODEL_PATH",
+    os.path.join(BASE_DIR, "model", "denguex_flan_t5_final")
+)
 
-tokenizer = AutoTokenizer.from_pretrained(
-    MODEL_PATH,
-    use_fast=False
+# Written per node by scripts/autotune_threads.py.
+SERVING_CONFIG_PATH = os.environ.get(
+    "DENGUEX_SERVING_CONFIG",
+    os.path.join(BASE_DIR, "serving_config.json")
 )
 
-model = AutoModelForSeq2SeqLM.from_pretrained(MODEL_PATH).to(device)
-model.eval()
+# torch and transformers take seconds to import, so they are loaded on the
+# first question that actually needs generation. Refusals and canonical
+# answers never pay for them.
+_model_lock = threading.Lock()
+_loaded = None
+
+def load_serving_config() -> dict:
+    """
+    Tuned thread counts for this node, or {} if it has not been tuned.
+    """
+    if not os.path.exists(SERVING_CONFIG_PATH):
+        return {}
+    with open(SERVING_CONFIG_PATH, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def apply_thread_config(torch, config: dict):
+    """
+    Without this every worker process starts one torch thread per core and
+    several workers on a node oversubscribe the CPU.
+    """
+    if config.get("intra_op_threads"):
+        torch.set_num_threads(int(config["intra_op_threads"]))
+    if config.get("inter_op_threads"):
+        try:
+            torch.set_num_interop_threads(int(config["inter_op_threads"]))
+        except RuntimeError:
+            # Only settable before the first parallel op in this process.
+            pass
+
+def load_model():
+    """
+    Returns (tokenizer, model, device), loading them once per process.
+    """
+    global _loaded
+    if _loaded is None:
+        with _model_lock:
+            if _loaded is None:
+                import torch
+                from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+
+                apply_thread_config(torch, load_serving_config())
+                device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+
+                tokenizer = AutoTokenizer.from_pretrained(
+                    MODEL_PATH,
+                    use_fast=False
+                )
+
+                model = AutoModelForSeq2SeqLM.from_pretrained(MODEL_PATH).to(device)
+                model.eval()
+
+                _loaded = (tokenizer, model, device)
+    return _loaded
 
 # =========================
 # USER-FRIENDLY MESSAGES
@@ -61,70 +118,161 @@ BLOCK_PATTERNS = [
     r"\bhow to cure",
 ]
 
+# One combined regex; compile_literal_patterns rejects anything that
+# could backtrack.
+BLOCK_REGEX = compile_literal_patterns(BLOCK_PATTERNS)
+
 def is_dengue_related(text: str) -> bool:
-    text = text.lower()
+    text = normalize_for_matching(text)
     return any(word in text for word in DENGUE_KEYWORDS)
 
 def is_medically_blocked(text: str) -> bool:
-    text = text.lower()
-    return any(re.search(p, text) for p in BLOCK_PATTERNS)
+    return BLOCK_REGEX.search(normalize_for_matching(text)) is not None
 
 # =========================
 # CHATBOT CORE FUNCTION
 # =========================
 
-def chatbot_answer(question: str) -> dict:
+def fast_answer(question: str, snapshot=None):
+    """
+    Steps 1-3: refusals and canonical facts. Returns None when the
+    question has to go to the model. ``snapshot`` pins a knowledge base
+    version (default: the current one).
+    """
+    # Bounded, case-folded, confusables mapped: all matching uses this.
+    question = normalize_for_matching(question)
+
     # 1. Non-dengue questions
     if not is_dengue_related(question):
         return {
             "allowed": False,
-            "answer": NON_DENGUE_MESSAGE
+            "answer": NON_DENGUE_MESSAGE,
+            "source": "non_dengue"
         }
 
     # 2. Dengue but medically unsafe
     if is_medically_blocked(question):
         return {
             "allowed": False,
-            "answer": MEDICAL_BLOCK_MESSAGE
+            "answer": MEDICAL_BLOCK_MESSAGE,
+            "source": "medical_block"
         }
 
     # 3. Canonical override (critical facts)
-    q_type = classify_question(question)
+    _, answer = (snapshot or knowledge_base.current()).canonical_answer(question)
 
-    if q_type in CANONICAL_ANSWERS:
+    if answer is not None:
         return {
             "allowed": True,
-            "answer": CANONICAL_ANSWERS[q_type]
+            "answer": answer,
+            "source": "canonical"
         }
 
-    # 4. Safe model generation (general awareness only)
-    prompt = (
-        f"question: {question} "
+    return None
+
+# =========================
+# MODEL GENERATION
+# =========================
+
+# beam     : 3-beam search (default)
+# greedy   : plain greedy decoding
+# assisted : greedy decoding drafted from the closest stored answers;
+#            same output as "greedy" in fewer decoder passes
+DECODING = os.environ.get("DENGUEX_DECODING", "beam")
+
+REPETITION_PENALTY = 1.2
+NO_REPEAT_NGRAM_SIZE = 3
+DRAFT_CANDIDATES = 3
+
+def build_prompt(question: str) -> str:
+    return (
+        f"question: {clean_question(question)} "
         f"Answer briefly in 1 to 3 clear sentences for public awareness."
     )
 
+def draft_token_ids(tokenizer, question):
+    from knowledge_base.retrieval import default_index
+
+    hits = default_index().search(clean_question(question), limit=DRAFT_CANDIDATES)
+    return [tokenizer(hit[3]).input_ids for hit in hits]
+
+def assisted_answer(question: str, quick: bool = False) -> dict:
+    from assisted_decoding import assisted_greedy
+
+    tokenizer, model, device = load_model()
+
     inputs = tokenizer(
-        prompt,
+        build_prompt(question),
         return_tensors="pt",
         truncation=True,
         max_length=128
     )
     inputs = {k: v.to(device) for k, v in inputs.items()}
 
+    ids, _ = assisted_greedy(
+        model,
+        inputs["input_ids"],
+        inputs["attention_mask"],
+        draft_token_ids(tokenizer, question),
+        max_length=40 if quick else 90,
+        repetition_penalty=REPETITION_PENALTY,
+        no_repeat_ngram_size=NO_REPEAT_NGRAM_SIZE
+    )
+
+    return {
+        "allowed": True,
+        "answer": tokenizer.decode(ids, skip_special_tokens=True).strip(),
+        "source": "model_quick" if quick else "model"
+    }
+
+def generate_answers(questions, quick: bool = False) -> list:
+    """
+    Model generation for a batch of questions. ``quick`` is the degraded
+    mode used when the model queue is saturated: a short greedy decode at
+    a fraction of the cost.
+    """
+    if DECODING == "assisted":
+        return [assisted_answer(question, quick=quick) for question in questions]
+
+    import torch
+
+    tokenizer, model, device = load_model()
+    greedy = quick or DECODING == "greedy"
+
+    # 4. Safe model generation (general awareness only)
+    inputs = tokenizer(
+        [build_prompt(question) for question in questions],
+        return_tensors="pt",
+        padding=True,
+        truncation=True,
+        max_length=128
+    )
+    inputs = {k: v.to(device) for k, v in inputs.items()}
+
     with torch.no_grad():
         outputs = model.generate(
             **inputs,
-            max_length=90,
-            num_beams=3,
+            max_length=40 if quick else 90,
+            num_beams=1 if greedy else 3,
             do_sample=False,
-            repetition_penalty=1.2,
-            no_repeat_ngram_size=3,
-            early_stopping=True
+            repetition_penalty=REPETITION_PENALTY,
+            no_repeat_ngram_size=NO_REPEAT_NGRAM_SIZE,
+            early_stopping=not greedy
         )
 
-    answer = tokenizer.decode(outputs[0], skip_special_tokens=True)
+    answers = tokenizer.batch_decode(outputs, skip_special_tokens=True)
 
-    return {
-        "allowed": True,
-        "answer": answer.strip()
-    }
+    return [
+        {
+            "allowed": True,
+            "answer": answer.strip(),
+            "source": "model_quick" if quick else "model"
+        }
+        for answer in answers
+    ]
+
+def generate_answer(question: str, quick: bool = False) -> dict:
+    return generate_answers([question], quick=quick)[0]
+
+def chatbot_answer(question: str) -> dict:
+    return fast_answer(question) or generate_answer(question)
@@ -1,4 +1,4 @@
-from chatbot_core import chatbot_answer
+from chatbot_engine import chatbot_answer
 
 # =========================
 # 50 DENGUE QUESTIONS
@@ -1,63 +1,46 @@
-def classify_question(question: str) -> str:
-    q = question.lower()
-
+# Checked in order; the first matching rule wins. Each rule is
+# (intent, alternatives) and an alternative matches when all of its
+# phrases occur in the lower-cased question. A knowledge base snapshot
+# (knowledge_base/snapshot.py) may replace this list without a restart.
+INTENT_RULES = [
     # --- Core definitions ---
-    if "what is dengue" in q or "define dengue" in q:
-        return "what_is_dengue"
+    ("what_is_dengue", [["what is dengue"], ["define dengue"]]),
 
     # --- Transmission ---
-    if "spread" in q or "transmit" in q:
-        return "how_dengue_spreads"
-
-    if "person to person" in q:
-        return "person_to_person"
+    ("how_dengue_spreads", [["spread"], ["transmit"]]),
+    ("person_to_person", [["person to person"]]),
 
     # --- Mosquito specific ---
-    if "which mosquito" in q or "aedes" in q:
-        return "which_mosquito"
+    ("which_mosquito", [["which mosquito"], ["aedes"]]),
 
     # --- Breeding & water ---
-    if "breed" in q or "breeding" in q or "stagnant water" in q:
-        return "breeding_sites"
+    ("breeding_sites", [["breed"], ["breeding"], ["stagnant water"]]),
 
     # --- Seasonal / climate ---
-    if "monsoon" in q or "rain" in q or "seasonal" in q:
-        return "why_after_monsoon"
-
-    if "summer" in q:
-        return "summer_rise"
-
-    if "tropical" in q:
-        return "tropical_regions"
-
-    if "climate" in q:
-        return "climate_effect"
+    ("why_after_monsoon", [["monsoon"], ["rain"], ["seasonal"]]),
+    ("summer_rise", [["summer"]]),
+    ("tropical_regions", [["tropical"]]),
+    ("climate_effect", [["climate"]]),
 
     # --- Urban / public health ---
-    if "urban" in q or "city" in q:
-        return "urban_risk"
-
-    if "public health" in q:
-        return "public_health_problem"
-
-    if "control" in q or "difficult" in q:
-        return "urban_control_difficulty"
-
-    if "vector-borne" in q:
-        return "vector_borne"
+    ("urban_risk", [["urban"], ["city"]]),
+    ("public_health_problem", [["public health"]]),
+    ("urban_control_difficulty", [["control"], ["difficult"]]),
+    ("vector_borne", [["vector-borne"]]),
 
     # --- Community & prevention ---
-    if "community" in q or "reduce risk" in q:
-        return "community_risk_reduction"
+    ("community_risk_reduction", [["community"], ["reduce risk"]]),
+    ("waste_management", [["waste"]]),
+    ("clean_water_storage", [["clean water"]]),
+    ("cover_containers", [["cover", "container"]]),
+]
 
-    if "waste" in q:
-        return "waste_management"
-
-    if "clean water" in q:
-        return "clean_water_storage"
+def classify_question(question: str, rules=None) -> str:
+    q = question.lower()
 
-    if "cover" in q and "container" in q:
-        return "cover_containers"
+    for intent, alternatives in INTENT_RULES if rules is None else rules:
+        if any(all(phrase in q for phrase in phrases) for phrases in alternatives):
+            return intent
 
     # --- Fallback ---
     return "general"
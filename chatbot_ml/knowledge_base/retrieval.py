@@ -0,0 +1,145 @@
+import json
+import math
+import os
+import re
+
+from knowledge_base.canonical_answers import CANONICAL_ANSWERS
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+QA_DATASETS = [
+    os.path.join(BASE_DIR, "dataset", "raw", "dengue_qa_train.jsonl"),
+    os.path.join(BASE_DIR, "dataset", "expanded", "dengue_qa_train_expanded.jsonl"),
+]
+
+# =========================
+# TOKENIZATION
+# =========================
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "do", "does",
+    "for", "from", "how", "in", "is", "it", "of", "on", "or", "the", "to",
+    "what", "when", "where", "which", "who", "why", "with", "question",
+}
+
+_WORD = re.compile(r"[a-z]+")
+
+def stem(word: str) -> str:
+    """
+    Crude suffix stripping so "bites", "biting" and "bite" meet.
+    """
+    for suffix in ("ing", "es", "ed", "s"):
+        base = word[: -len(suffix)]
+        if word.endswith(suffix) and len(base) >= 3 and not base.endswith(("e", "s")):
+            word = base
+            break
+    if len(word) > 3 and word.endswith("e") and not word.endswith("ee"):
+        word = word[:-1]
+    return word
+
+def tokenize(text: str) -> set:
+    return {stem(w) for w in _WORD.findall(text.lower()) if w not in STOPWORDS}
+
+# =========================
+# INDEX
+# =========================
+
+class RetrievalIndex:
+    """
+    Small TF-IDF style index (binary term weights, cosine score) over
+    known answers. Each entry is (kind, key, match_text, answer):
+    canonical entries match on their answer text, dataset entries on
+    their question.
+
+    ``previous`` is an older index whose tokenized texts are reused, so a
+    knowledge base update only tokenizes entries that changed.
+    """
+
+    def __init__(self, entries, previous=None):
+        self.entries = list(entries)
+        self._postings = {}
+        self._tokens = {}
+        known = previous._tokens if previous is not None else {}
+        doc_tokens = []
+        for i, (_, _, text, _) in enumerate(self.entries):
+            tokens = known.get(text)
+            if tokens is None:
+                tokens = tokenize(text)
+            self._tokens[text] = tokens
+            doc_tokens.append(tokens)
+            for t in tokens:
+                self._postings.setdefault(t, []).append(i)
+
+        n = max(len(self.entries), 1)
+        self._idf = {t: math.log(1 + n / len(ids)) for t, ids in self._postings.items()}
+        self._max_idf = math.log(1 + n)
+        self._norms = [
+            math.sqrt(sum(self._idf[t] ** 2 for t in tokens)) or 1.0
+            for tokens in doc_tokens
+        ]
+
+    def search(self, question: str, kind: str = None, limit: int = 1):
+        """
+        Returns [(score, kind, key, answer)] best first. Score is in [0, 1].
+        """
+        # Words the index has never seen count at full weight in the query
+        # norm, so an unfamiliar question scores low instead of matching on
+        # its one familiar word.
+        tokens = tokenize(question)
+        q_tokens = [t for t in tokens if t in self._idf]
+        if not q_tokens:
+            return []
+        q_norm = math.sqrt(sum(self._idf.get(t, self._max_idf) ** 2 for t in tokens)) or 1.0
+
+        scores = {}
+        for t in q_tokens:
+            w = self._idf[t] ** 2
+            for i in self._postings[t]:
+                scores[i] = scores.get(i, 0.0) + w
+
+        ranked = []
+        for i, dot in scores.items():
+            entry_kind, key, _, answer = self.entries[i]
+            if kind and entry_kind != kind:
+                continue
+            ranked.append((dot / (q_norm * self._norms[i]), entry_kind, key, answer))
+        ranked.sort(key=lambda r: -r[0])
+        return ranked[:limit]
+
+    def best(self, question: str, kind: str = None):
+        hits = self.search(question, kind=kind, limit=1)
+        return hits[0] if hits else None
+
+def load_qa_pairs(paths=None):
+    pairs = []
+    for path in paths or QA_DATASETS:
+        if not os.path.exists(path):
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    rec = json.loads(line)
+                    pairs.append((rec["input"].replace("question:", "").strip(), rec["output"]))
+    return pairs
+
+def build_index(canonical_answers=None, qa_pairs=None, previous=None):
+    canonical_answers = CANONICAL_ANSWERS if canonical_answers is None else canonical_answers
+    qa_pairs = load_qa_pairs() if qa_pairs is None else qa_pairs
+
+    # Canonical answers match on their intent name plus their text.
+    entries = [
+        ("canonical", intent, intent.replace("_", " ") + " " + answer, answer)
+        for intent, answer in canonical_answers.items()
+    ]
+    entries += [("dataset", i, q, a) for i, (q, a) in enumerate(qa_pairs)]
+    return RetrievalIndex(entries, previous=previous)
+
+def default_index() -> RetrievalIndex:
+    """
+    Index of the current knowledge base snapshot. It is rebuilt with each
+    snapshot, off the request path.
+    """
+    from knowledge_base.snapshot import current
+
+    return current().index
@@ -0,0 +1,233 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from types import MappingProxyType
+
+from knowledge_base.canonical_answers import CANONICAL_ANSWERS
+from knowledge_base.question_classifier import INTENT_RULES, classify_question
+from knowledge_base.retrieval import QA_DATASETS, build_index, load_qa_pairs
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Optional JSON file with "canonical_answers" and/or "intent_rules". A
+# section present in the file replaces the module default wholesale, so
+# answers can be added, edited or removed without a deploy. Every worker
+# polls it (and the QA datasets) and swaps in the new version by itself.
+OVERRIDE_PATH = os.environ.get(
+    "DENGUEX_KNOWLEDGE_BASE",
+    os.path.join(BASE_DIR, "knowledge_base.json")
+)
+POLL_SECONDS = float(os.environ.get("DENGUEX_KB_POLL_SECONDS", "5"))
+
+# =========================
+# SNAPSHOT
+# =========================
+
+class Snapshot:
+    """
+    One immutable version of the knowledge base: canonical answers, intent
+    rules, QA pairs and the retrieval index over them. A request reads
+    current() once and uses that snapshot throughout, so a swap never
+    mixes two versions within one answer.
+    """
+
+    def __init__(self, canonical_answers, intent_rules, qa_pairs, previous=None):
+        self.canonical_answers = MappingProxyType(dict(canonical_answers))
+        self.intent_rules = tuple(
+            (intent, tuple(tuple(phrases) for phrases in alternatives))
+            for intent, alternatives in intent_rules
+        )
+        self.qa_pairs = tuple(tuple(pair) for pair in qa_pairs)
+        self.version = content_version(self.canonical_answers, self.intent_rules, self.qa_pairs)
+        self.index = build_index(
+            self.canonical_answers, self.qa_pairs,
+            previous=previous.index if previous is not None else None,
+        )
+
+    def classify(self, question: str) -> str:
+        return classify_question(question, self.intent_rules)
+
+    def canonical_answer(self, question: str):
+        """
+        (intent, answer) where answer is None if the intent has no canonical answer.
+        """
+        intent = self.classify(question)
+        return intent, self.canonical_answers.get(intent)
+
+def content_version(canonical_answers, intent_rules, qa_pairs) -> str:
+    h = hashlib.blake2b(digest_size=8)
+    h.update(json.dumps([sorted(canonical_answers.items()), intent_rules, qa_pairs]).encode("utf-8"))
+    return h.hexdigest()
+
+def changes(old, new) -> dict:
+    """
+    What differs between two snapshots, for selective cache invalidation.
+    """
+    if old is None:
+        return {"canonical": set(new.canonical_answers), "intent_rules": True, "qa_pairs": True}
+    keys = set(old.canonical_answers) | set(new.canonical_answers)
+    return {
+        "canonical": {k for k in keys if old.canonical_answers.get(k) != new.canonical_answers.get(k)},
+        "intent_rules": old.intent_rules != new.intent_rules,
+        "qa_pairs": old.qa_pairs != new.qa_pairs,
+    }
+
+# =========================
+# SOURCES
+# =========================
+
+def source_paths():
+    return [OVERRIDE_PATH, *QA_DATASETS]
+
+def source_stamp():
+    """
+    (path, size, mtime) of every source file; a change triggers a rebuild.
+    """
+    stamp = []
+    for path in source_paths():
+        try:
+            st = os.stat(path)
+            stamp.append((path, st.st_size, st.st_mtime_ns))
+        except FileNotFoundError:
+            stamp.append((path, None, None))
+    return tuple(stamp)
+
+def valid_rule(rule) -> bool:
+    """
+    [intent, [[phrase, ...], ...]]. A bare string where a list belongs
+    would be iterated as one-letter phrases that match almost anything.
+    """
+    if not isinstance(rule, (list, tuple)) or len(rule) != 2:
+        return False
+    intent, alternatives = rule
+    return (
+        isinstance(intent, str) and isinstance(alternatives, (list, tuple)) and bool(alternatives)
+        and all(
+            isinstance(phrases, (list, tuple)) and phrases and all(isinstance(p, str) and p for p in phrases)
+            for phrases in alternatives
+        )
+    )
+
+def load_override(path=None):
+    path = path or OVERRIDE_PATH
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if not isinstance(data, dict):
+        raise ValueError(f"{path}: expected a JSON object, got {type(data).__name__}")
+
+    answers = data.get("canonical_answers", {})
+    if not isinstance(answers, dict) or not all(
+        isinstance(k, str) and isinstance(v, str) and v.strip() for k, v in answers.items()
+    ):
+        raise ValueError(f"{path}: canonical_answers must map intent names to non-empty strings")
+    rules = data.get("intent_rules", [])
+    if not isinstance(rules, list):
+        raise ValueError(f"{path}: intent_rules must be a list")
+    for rule in rules:
+        if not valid_rule(rule):
+            raise ValueError(f"{path}: bad intent rule {rule!r}")
+    return data
+
+def build_snapshot(previous=None, override=None) -> Snapshot:
+    override = load_override() if override is None else override
+    return Snapshot(
+        override.get("canonical_answers", CANONICAL_ANSWERS),
+        override.get("intent_rules", INTENT_RULES),
+        load_qa_pairs(),
+        previous=previous,
+    )
+
+# =========================
+# CURRENT SNAPSHOT AND RELOADING
+# =========================
+
+_lock = threading.Lock()
+_current = None
+_stamp = None
+_watcher = None
+
+def current() -> Snapshot:
+    """
+    The live snapshot. The first one is built by ChatbotConfig.ready() at
+    startup (or on first use outside Django); later versions are built by
+    a background thread and swapped in with a single assignment.
+    """
+    if _current is None:
+        reload()
+    _ensure_watching()
+    return _current
+
+def _install(snapshot, stamp):
+    global _current, _stamp
+    _current, _stamp = snapshot, stamp
+
+def reload(force=False):
+    """
+    Rebuilds from the sources if they changed (or ``force``) and swaps the
+    result in. Returns the changes, or None if nothing changed. A broken
+    source file is logged and the running snapshot kept (the built-in
+    answers if there is none yet); either way the stamp advances, so the
+    file is not re-read until it changes again.
+    """
+    with _lock:
+        stamp = source_stamp()
+        if not force and _current is not None and stamp == _stamp:
+            return None
+        old = _current
+        try:
+            # Built while requests keep reading the old snapshot.
+            new = build_snapshot(previous=old)
+        except Exception as exc:
+            logger.error("Knowledge base rebuild failed, keeping version %s: %s",
+                         old.version if old else "built-in", exc)
+            _install(old or build_snapshot(override={}), stamp)
+            return None
+        if old is not None and new.version == old.version:
+            _install(old, stamp)
+            return None
+        _install(new, stamp)
+
+    diff = changes(old, new)
+    logger.info("Knowledge base %s -> %s (%d canonical answers changed)",
+                old.version if old else None, new.version, len(diff["canonical"]))
+    return diff
+
+def _watch():
+    while True:
+        time.sleep(POLL_SECONDS)
+        try:
+            reload()
+        except Exception:
+            logger.exception("Knowledge base watcher error")
+
+def _ensure_watching():
+    global _watcher
+    if _watcher is not None or POLL_SECONDS <= 0:
+        return
+    with _lock:
+        if _watcher is None:
+            _watcher = threading.Thread(target=_watch, name="knowledge-base-watcher", daemon=True)
+            _watcher.start()
+
+def export(path=None):
+    """
+    Writes the current canonical answers and intent rules as an override
+    file to edit.
+    """
+    snapshot = current()
+    path = path or OVERRIDE_PATH
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({
+            "canonical_answers": dict(snapshot.canonical_answers),
+            "intent_rules": snapshot.intent_rules,
+        }, f, indent=2, ensure_ascii=False)
+    os.replace(tmp, path)
+    return path
@@ -0,0 +1,248 @@
+import argparse
+import itertools
+import json
+import multiprocessing as mp
+import os
+import queue
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+sys.path.insert(0, BASE_DIR)
+
+from evaluate_50_dengue_questions import DENGUE_QUESTIONS  # noqa: E402
+
+DEFAULT_OUTPUT = os.path.join(BASE_DIR, "serving_config.json")
+
+# =========================
+# CPU TOPOLOGY
+# =========================
+
+def physical_cores(cpus):
+    """
+    Distinct (socket, core) pairs among the CPUs this process may run on.
+    Hyper-threads share a core's execution units, so they add little to
+    matmul-heavy inference.
+    """
+    cores = set()
+    try:
+        with open("/proc/cpuinfo", "r", encoding="utf-8") as f:
+            blocks = f.read().strip().split("\n\n")
+    except OSError:
+        return len(cpus)
+
+    for block in blocks:
+        info = dict(
+            (k.strip(), v.strip())
+            for k, v in (line.split(":", 1) for line in block.splitlines() if ":" in line)
+        )
+        if int(info.get("processor", -1)) in cpus:
+            cores.add((info.get("physical id", "0"), info.get("core id", info.get("processor"))))
+    return len(cores) or len(cpus)
+
+def cgroup_cpus():
+    """
+    CPU limit from a cgroup v2 quota (containers), or None.
+    """
+    try:
+        with open("/sys/fs/cgroup/cpu.max", "r", encoding="utf-8") as f:
+            quota, period = f.read().split()
+    except (OSError, ValueError):
+        return None
+    if quota == "max":
+        return None
+    return max(1, int(int(quota) / int(period)))
+
+def cpu_topology():
+    cpus = os.sched_getaffinity(0) if hasattr(os, "sched_getaffinity") else set(range(os.cpu_count() or 1))
+    physical = physical_cores(cpus)
+    limit = cgroup_cpus()
+    return {
+        "logical_cpus": len(cpus),
+        "physical_cores": physical,
+        "cgroup_cpus": limit,
+        "usable_cores": min(physical, limit) if limit else physical,
+    }
+
+def candidate_configs(cores, batch_sizes, max_workers):
+    """
+    (workers, threads) pairs that never put more torch threads on the node
+    than there are cores, crossed with the batch sizes.
+    """
+    pairs = set()
+    for workers in range(1, min(cores, max_workers) + 1):
+        threads = 1
+        while workers * threads <= cores:
+            pairs.add((workers, threads))
+            threads *= 2
+        pairs.add((workers, cores // workers))
+    return [(w, t, b) for (w, t), b in itertools.product(sorted(pairs), batch_sizes)]
+
+# =========================
+# BENCHMARK
+# =========================
+
+def bench_worker(threads, batch_size, seconds, warmup, offset, barrier, results):
+    """
+    One serving process: pins torch to ``threads``, then generates batches
+    of evaluation questions until ``seconds`` have passed.
+    """
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    # Benchmark the candidate, not whatever config the node already has.
+    os.environ["DENGUEX_SERVING_CONFIG"] = ""
+
+    import torch
+    import chatbot_engine
+
+    chatbot_engine.apply_thread_config(torch, {"intra_op_threads": threads, "inter_op_threads": 1})
+    chatbot_engine.load_model()
+
+    questions = itertools.cycle(DENGUE_QUESTIONS[offset:] + DENGUE_QUESTIONS[:offset])
+    next_batch = lambda: [next(questions) for _ in range(batch_size)]
+
+    for _ in range(warmup):
+        chatbot_engine.generate_answers(next_batch())
+
+    barrier.wait()
+    latencies = []
+    answered = 0
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        start = time.perf_counter()
+        chatbot_engine.generate_answers(next_batch())
+        latencies.append(time.perf_counter() - start)
+        answered += batch_size
+
+    results.put({"answered": answered, "latencies": latencies})
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+def run_config(workers, threads, batch_size, seconds, warmup):
+    ctx = mp.get_context("spawn")
+    barrier = ctx.Barrier(workers)
+    results = ctx.Queue()
+
+    procs = [
+        ctx.Process(target=bench_worker,
+                    args=(threads, batch_size, seconds, warmup, i * 7, barrier, results))
+        for i in range(workers)
+    ]
+    for p in procs:
+        p.start()
+
+    # A worker that dies (e.g. out of memory) never reports, and the others
+    # wait at the barrier forever: stop them all and skip the config.
+    reports = []
+    while len(reports) < workers:
+        try:
+            reports.append(results.get(timeout=1.0))
+        except queue.Empty:
+            crashed = [p.exitcode for p in procs if not p.is_alive() and p.exitcode != 0]
+            if crashed or not any(p.is_alive() for p in procs):
+                for p in procs:
+                    p.terminate()
+                for p in procs:
+                    p.join()
+                return {"workers": workers, "intra_op_threads": threads, "batch_size": batch_size,
+                        "error": f"worker exited with code {crashed[0] if crashed else 0}"}
+    for p in procs:
+        p.join()
+
+    latencies = [lat for r in reports for lat in r["latencies"]]
+    return {
+        "workers": workers,
+        "intra_op_threads": threads,
+        "batch_size": batch_size,
+        "answers_per_sec": sum(r["answered"] for r in reports) / seconds,
+        # Every question in a batch waits for the whole batch.
+        "p50_latency": statistics.median(latencies) if latencies else None,
+        "p95_latency": percentile(latencies, 0.95) if latencies else None,
+    }
+
+def pick(results, latency_budget):
+    """
+    Highest throughput whose p95 fits the budget; lowest p95 otherwise.
+    """
+    measured = [r for r in results if r.get("p95_latency") is not None]
+    within = [r for r in measured if r["p95_latency"] <= latency_budget]
+    if within:
+        return max(within, key=lambda r: r["answers_per_sec"])
+    return min(measured, key=lambda r: r["p95_latency"])
+
+# =========================
+# MAIN
+# =========================
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Benchmark chatbot generation across workers x threads x batch size and "
+                    "write a serving config for this node."
+    )
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--batch-sizes", default="1",
+                        help="Comma-separated batch sizes (the backend answers one question per call)")
+    parser.add_argument("--max-workers", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=20.0, help="Measurement time per config")
+    parser.add_argument("--warmup", type=int, default=2, help="Warm-up batches per worker")
+    parser.add_argument("--latency-budget", type=float, default=3.0,
+                        help="p95 seconds per answer the chosen config must meet")
+    parser.add_argument("--dry-run", action="store_true", help="List the configs without running them")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    topology = cpu_topology()
+    batch_sizes = [int(b) for b in args.batch_sizes.split(",") if b.strip()]
+    configs = candidate_configs(topology["usable_cores"], batch_sizes, args.max_workers)
+
+    print(f"[INFO] CPU topology: {topology}")
+    print(f"[INFO] {len(configs)} configs, ~{len(configs) * args.seconds / 60:.1f} min of measurement")
+    if args.dry_run:
+        for workers, threads, batch_size in configs:
+            print(f"  workers={workers} threads={threads} batch={batch_size}")
+        return
+
+    results = []
+    for workers, threads, batch_size in configs:
+        result = run_config(workers, threads, batch_size, args.seconds, args.warmup)
+        results.append(result)
+        if "error" in result:
+            print(f"[SKIP] workers={workers} threads={threads} batch={batch_size}: {result['error']}")
+            continue
+        print(f"[BENCH] workers={workers} threads={threads} batch={batch_size} "
+              f"{result['answers_per_sec']:.2f} answers/s "
+              f"p50={result['p50_latency']:.2f}s p95={result['p95_latency']:.2f}s")
+
+    if not any("error" not in r for r in results):
+        sys.exit("[ERROR] Every config failed; nothing written.")
+    best = pick(results, args.latency_budget)
+    # Only the thread counts are read back (chatbot_engine.load_model). The
+    # worker count is for the process manager, so it is printed, not stored.
+    config = {
+        "intra_op_threads": best["intra_op_threads"],
+        "inter_op_threads": 1,
+        "latency_budget": args.latency_budget,
+        "topology": topology,
+        "tuned_at": datetime.now(timezone.utc).isoformat(),
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(config, f, indent=2)
+
+    print("====================================")
+    print("RECOMMENDED SERVING CONFIG")
+    print(f"Worker processes : {best['workers']} (start this many with your process manager)")
+    print(f"Torch threads    : {config['intra_op_threads']} per worker")
+    print(f"Batch size       : {best['batch_size']}")
+    print(f"Throughput       : {best['answers_per_sec']:.2f} answers/s")
+    print(f"p95 latency      : {best['p95_latency']:.2f}s")
+    print(f"Written to       : {args.output}")
+    print("====================================")
+
+if __name__ == "__main__":
+    main()
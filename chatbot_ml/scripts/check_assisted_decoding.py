@@ -0,0 +1,100 @@
+import argparse
+import os
+import sys
+import time
+
+import torch
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+sys.path.insert(0, BASE_DIR)
+
+import chatbot_engine  # noqa: E402
+from assisted_decoding import assisted_greedy  # noqa: E402
+from evaluate_50_dengue_questions import DENGUE_QUESTIONS  # noqa: E402
+
+# =========================
+# ONE QUESTION
+# =========================
+
+def greedy_reference(model, inputs, max_length):
+    start = time.perf_counter()
+    with torch.no_grad():
+        out = model.generate(
+            **inputs,
+            max_length=max_length,
+            num_beams=1,
+            do_sample=False,
+            repetition_penalty=chatbot_engine.REPETITION_PENALTY,
+            no_repeat_ngram_size=chatbot_engine.NO_REPEAT_NGRAM_SIZE,
+        )
+    return out[0].tolist(), time.perf_counter() - start
+
+def assisted(tokenizer, model, inputs, question, max_length, draft_tokens):
+    start = time.perf_counter()
+    ids, passes = assisted_greedy(
+        model,
+        inputs["input_ids"],
+        inputs["attention_mask"],
+        chatbot_engine.draft_token_ids(tokenizer, question),
+        max_length=max_length,
+        repetition_penalty=chatbot_engine.REPETITION_PENALTY,
+        no_repeat_ngram_size=chatbot_engine.NO_REPEAT_NGRAM_SIZE,
+        num_draft_tokens=draft_tokens,
+    )
+    return ids, passes, time.perf_counter() - start
+
+# =========================
+# MAIN
+# =========================
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Check that assisted decoding reproduces greedy decoding token for token, "
+                    "and measure decoder passes and latency."
+    )
+    parser.add_argument("--max-length", type=int, default=90)
+    parser.add_argument("--draft-tokens", type=int, default=10)
+    args = parser.parse_args()
+
+    tokenizer, model, device = chatbot_engine.load_model()
+
+    mismatches = 0
+    greedy_steps = assisted_passes = 0
+    greedy_time = assisted_time = 0.0
+
+    for idx, question in enumerate(DENGUE_QUESTIONS, 1):
+        inputs = tokenizer(chatbot_engine.build_prompt(question), return_tensors="pt",
+                           truncation=True, max_length=128)
+        inputs = {k: v.to(device) for k, v in inputs.items()}
+
+        ref, t_ref = greedy_reference(model, inputs, args.max_length)
+        ids, passes, t_ast = assisted(tokenizer, model, inputs, question, args.max_length, args.draft_tokens)
+
+        same = ids == ref
+        mismatches += not same
+        greedy_steps += len(ref) - 1
+        assisted_passes += passes
+        greedy_time += t_ref
+        assisted_time += t_ast
+
+        print(f"Q{idx}: {'SAME' if same else 'DIFFERENT'} "
+              f"{len(ref) - 1} tokens, {passes} passes, {t_ref:.2f}s -> {t_ast:.2f}s  {question}")
+        if not same:
+            print(f"  greedy  : {tokenizer.decode(ref, skip_special_tokens=True)}")
+            print(f"  assisted: {tokenizer.decode(ids, skip_special_tokens=True)}")
+
+    print("====================================")
+    print("ASSISTED DECODING CHECK")
+    print(f"Questions        : {len(DENGUE_QUESTIONS)}")
+    print(f"Identical output : {len(DENGUE_QUESTIONS) - mismatches}/{len(DENGUE_QUESTIONS)}")
+    print(f"Decoder passes   : {greedy_steps} -> {assisted_passes} "
+          f"({assisted_passes / max(greedy_steps, 1):.0%})")
+    print(f"Total latency    : {greedy_time:.2f}s -> {assisted_time:.2f}s")
+    print("====================================")
+
+    if mismatches:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
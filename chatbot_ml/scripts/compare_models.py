@@ -0,0 +1,148 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL_PATH = os.path.join(BASE_DIR, "model", "denguex_flan_t5_final")
+
+sys.path.insert(0, BASE_DIR)
+
+# =========================
+# ONE MODEL (CHILD PROCESS)
+# =========================
+
+def dir_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+    return total
+
+def evaluate_current_model(warmup):
+    """
+    Runs the 50-question evaluation against whatever model chatbot_engine
+    serves (DENGUEX_MODEL_PATH), one question at a time like production.
+    """
+    import chatbot_engine
+    from evaluate_50_dengue_questions import DENGUE_QUESTIONS, is_answer_reasonable
+
+    start = time.perf_counter()
+    _, model, _ = chatbot_engine.load_model()
+    load_seconds = time.perf_counter() - start
+
+    for question in DENGUE_QUESTIONS[:warmup]:
+        chatbot_engine.generate_answer(question)
+
+    rows = []
+    for question in DENGUE_QUESTIONS:
+        start = time.perf_counter()
+        generated = chatbot_engine.generate_answer(question)
+        latency = time.perf_counter() - start
+
+        # End to end: refusals and canonical facts still come first.
+        served = chatbot_engine.fast_answer(question) or generated
+        rows.append({
+            "question": question,
+            "model_answer": generated["answer"],
+            "model_ok": is_answer_reasonable(generated["answer"]),
+            "served_ok": served["allowed"] and is_answer_reasonable(served["answer"]),
+            "latency": latency,
+        })
+
+    latencies = sorted(r["latency"] for r in rows)
+    return {
+        "model_path": chatbot_engine.MODEL_PATH,
+        "params_m": sum(p.numel() for p in model.parameters()) / 1e6,
+        "disk_mb": dir_size(chatbot_engine.MODEL_PATH) / 1e6,
+        "load_seconds": load_seconds,
+        "model_accuracy": sum(r["model_ok"] for r in rows) / len(rows),
+        "served_accuracy": sum(r["served_ok"] for r in rows) / len(rows),
+        "mean_latency": statistics.mean(latencies),
+        "p95_latency": latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))],
+        "rows": rows,
+    }
+
+# =========================
+# REPORT
+# =========================
+
+def run_model(name, path, warmup):
+    """
+    Each model runs in a fresh interpreter so load time and memory are not
+    skewed by the previous one.
+    """
+    env = dict(os.environ, DENGUEX_MODEL_PATH=path)
+    proc = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", "--warmup", str(warmup)],
+        env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise SystemExit(f"Evaluation of {name} ({path}) failed:\n{proc.stderr[-4000:]}")
+    print(f"[INFO] Evaluated {name}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+def print_report(results):
+    names = list(results)
+    width = max(16, *(len(n) for n in names))
+
+    print("====================================")
+    print("MODEL COMPARISON (50 DENGUE QUESTIONS)")
+    print("metric".ljust(18) + "".join(n.rjust(width) for n in names))
+    for label, key, fmt in [
+        ("params (M)", "params_m", "{:.0f}"),
+        ("disk (MB)", "disk_mb", "{:.0f}"),
+        ("load time (s)", "load_seconds", "{:.1f}"),
+        ("model accuracy", "model_accuracy", "{:.0%}"),
+        ("served accuracy", "served_accuracy", "{:.0%}"),
+        ("mean latency (s)", "mean_latency", "{:.3f}"),
+        ("p95 latency (s)", "p95_latency", "{:.3f}"),
+    ]:
+        print(label.ljust(18) + "".join(fmt.format(results[n][key]).rjust(width) for n in names))
+    print("====================================")
+
+    for i, row in enumerate(results[names[0]]["rows"]):
+        print(f"Q{i + 1}: {row['question']}")
+        for name in names:
+            r = results[name]["rows"][i]
+            print(f"  [{name}] {'RIGHT' if r['model_ok'] else 'WRONG'} "
+                  f"{r['latency']:.2f}s  {r['model_answer']}")
+        print("-" * 70)
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Side-by-side quality and latency of chatbot models on the 50-question evaluation."
+    )
+    parser.add_argument("--model", action="append", default=[],
+                        help="name=path (repeatable); the current model is always included as 'teacher'")
+    parser.add_argument("--warmup", type=int, default=3, help="Untimed questions before measuring")
+    parser.add_argument("--output", help="Also write the full results as JSON")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+
+    if args.child:
+        print(json.dumps(evaluate_current_model(args.warmup)))
+        return
+
+    models = {"teacher": MODEL_PATH}
+    for spec in args.model:
+        name, _, path = spec.partition("=")
+        if not path:
+            raise SystemExit(f"--model expects name=path, got {spec!r}")
+        models[name] = path
+
+    results = {name: run_model(name, path, args.warmup) for name, path in models.items()}
+    print_report(results)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"[INFO] Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+import torch
+import torch.nn.functional as F
+from transformers import AutoModelForSeq2SeqLM, get_linear_schedule_with_warmup
+
+from token_cache import BASE_DIR, DATASETS, MODEL_PATH, load_or_build
+from train_flan_t5 import LABEL_PAD_ID, bucketed_batches, collate, load_progress, save_checkpoint
+
+sys.path.insert(0, BASE_DIR)
+
+# File Paths
+
+TEACHER_ANSWERS = os.path.join(BASE_DIR, "dataset", "distill", "teacher_answers.jsonl")
+OUTPUT_DIR = os.path.join(BASE_DIR, "model", "denguex_flan_t5_student")
+STUDENT_BASE = "google/flan-t5-small"
+
+# Defaults
+
+SEED = 42
+BATCH_SIZE = 16
+TEMPERATURE = 2.0
+ALPHA = 0.5               # weight of the hard-label loss vs. the teacher's soft targets
+
+# =========================
+# TEACHER ANSWERS
+# =========================
+
+def unique_questions(paths):
+    seen = set()
+    questions = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                question = json.loads(line)["input"].replace("question:", "").strip()
+                if question not in seen:
+                    seen.add(question)
+                    questions.append(question)
+    return questions
+
+def write_teacher_answers(engine, questions, out_path, batch_size):
+    """
+    Sequence-level distillation data: the teacher's own answer to every
+    training question, generated with the serving decode settings and
+    stored in the dataset JSONL format. Appends, so an interrupted run
+    picks up where it stopped.
+    """
+    done = set(unique_questions([out_path])) if os.path.exists(out_path) else set()
+    todo = [q for q in questions if q not in done]
+    print(f"[INFO] Teacher answers: {len(done)} cached, {len(todo)} to generate")
+
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    start = time.perf_counter()
+    with open(out_path, "a", encoding="utf-8") as f:
+        for i in range(0, len(todo), batch_size):
+            batch = todo[i:i + batch_size]
+            for question, result in zip(batch, engine.generate_answers(batch)):
+                f.write(json.dumps({"input": f"question: {question}", "output": result["answer"]}) + "\n")
+            f.flush()
+            if (i // batch_size) % 20 == 0:
+                print(f"[TEACHER] {i + len(batch)}/{len(todo)} "
+                      f"({(i + len(batch)) / max(time.perf_counter() - start, 1e-9):.1f} questions/sec)")
+
+# =========================
+# LOSS
+# =========================
+
+def distillation_loss(student_logits, teacher_logits, labels, temperature):
+    """
+    KL(teacher || student) on temperature-softened distributions, averaged
+    over real target tokens and scaled by T^2 so its gradient magnitude
+    does not shrink with the temperature.
+    """
+    mask = labels != LABEL_PAD_ID
+    s = F.log_softmax(student_logits[mask] / temperature, dim=-1)
+    t = F.softmax(teacher_logits[mask] / temperature, dim=-1)
+    return F.kl_div(s, t, reduction="batchmean") * temperature ** 2
+
+# =========================
+# TRAINING
+# =========================
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Distill the fine-tuned DengueX model into a smaller student.")
+    parser.add_argument("--teacher", default=MODEL_PATH)
+    parser.add_argument("--student-base", default=STUDENT_BASE, help="Student to start from when not resuming")
+    parser.add_argument("--output-dir", default=OUTPUT_DIR)
+    parser.add_argument("--teacher-answers", default=TEACHER_ANSWERS)
+    parser.add_argument("--teacher-batch-size", type=int, default=16)
+    parser.add_argument("--epochs", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--lr", type=float, default=5e-4)
+    parser.add_argument("--warmup-ratio", type=float, default=0.05)
+    parser.add_argument("--temperature", type=float, default=TEMPERATURE)
+    parser.add_argument("--alpha", type=float, default=ALPHA)
+    parser.add_argument("--save-every", type=int, default=200, help="Optimizer steps between checkpoints")
+    parser.add_argument("--log-every", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--no-resume", action="store_true", help="Start over even if a checkpoint exists")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+
+    random.seed(args.seed)
+    torch.manual_seed(args.seed)
+
+    # The teacher is loaded through the serving engine, so teacher answers
+    # use exactly the prompt and decode settings users see.
+    os.environ["DENGUEX_MODEL_PATH"] = args.teacher
+    import chatbot_engine
+
+    tokenizer, teacher, device = chatbot_engine.load_model()
+    teacher.eval()
+
+    write_teacher_answers(chatbot_engine, unique_questions(DATASETS), args.teacher_answers,
+                          args.teacher_batch_size)
+
+    cache = load_or_build(DATASETS + [args.teacher_answers], args.teacher)
+    pad_id = cache.meta["pad_token_id"]
+    lengths = cache.input_lengths() + cache.label_lengths()
+
+    ckpt_dir = os.path.join(args.output_dir, "checkpoint-last")
+    progress = None if args.no_resume else load_progress(ckpt_dir)
+
+    student_source = ckpt_dir if progress else args.student_base
+    print(f"[INFO] Loading student from {student_source}")
+    student = AutoModelForSeq2SeqLM.from_pretrained(student_source).to(device)
+    student.train()
+
+    if student.config.vocab_size != teacher.config.vocab_size:
+        raise SystemExit(
+            f"Student vocab ({student.config.vocab_size}) differs from the teacher's "
+            f"({teacher.config.vocab_size}); pick a student from the same model family."
+        )
+
+    teacher_params = sum(p.numel() for p in teacher.parameters())
+    student_params = sum(p.numel() for p in student.parameters())
+    print(f"[INFO] Teacher {teacher_params / 1e6:.0f}M params, student {student_params / 1e6:.0f}M params")
+
+    steps_per_epoch = len(bucketed_batches(lengths, args.batch_size, args.seed))
+    total_steps = steps_per_epoch * args.epochs
+
+    optimizer = torch.optim.AdamW(student.parameters(), lr=args.lr)
+    scheduler = get_linear_schedule_with_warmup(
+        optimizer, int(total_steps * args.warmup_ratio), total_steps
+    )
+
+    state = {"epoch": 0, "batch_in_epoch": 0, "global_step": 0}
+    if progress:
+        trainer_state = torch.load(os.path.join(ckpt_dir, "trainer_state.pt"), map_location="cpu")
+        optimizer.load_state_dict(trainer_state["optimizer"])
+        scheduler.load_state_dict(trainer_state["scheduler"])
+        torch.set_rng_state(trainer_state["torch_rng"])
+        state = progress
+        print(f"[INFO] Resuming at epoch {state['epoch']} batch {state['batch_in_epoch']} "
+              f"(step {state['global_step']}/{total_steps})")
+
+    for epoch in range(state["epoch"], args.epochs):
+        batches = bucketed_batches(lengths, args.batch_size, args.seed + epoch)
+        start_batch = state["batch_in_epoch"] if epoch == state["epoch"] else 0
+
+        for b in range(start_batch, len(batches)):
+            batch = {k: v.to(device) for k, v in collate(cache, batches[b], pad_id).items()}
+
+            with torch.no_grad():
+                teacher_logits = teacher(**batch).logits
+            out = student(**batch)
+
+            kd = distillation_loss(out.logits, teacher_logits, batch["labels"], args.temperature)
+            loss = args.alpha * out.loss + (1 - args.alpha) * kd
+
+            loss.backward()
+            torch.nn.utils.clip_grad_norm_(student.parameters(), 1.0)
+            optimizer.step()
+            scheduler.step()
+            optimizer.zero_grad(set_to_none=True)
+
+            state = {"epoch": epoch, "batch_in_epoch": b + 1, "global_step": state["global_step"] + 1}
+            step = state["global_step"]
+
+            if step % args.log_every == 0:
+                print(f"[DISTILL] epoch {epoch + 1} step {step}/{total_steps} "
+                      f"loss {loss.item():.4f} (ce {out.loss.item():.4f}, kd {kd.item():.4f}) "
+                      f"lr {scheduler.get_last_lr()[0]:.2e}")
+
+            if step % args.save_every == 0:
+                save_checkpoint(ckpt_dir, student, tokenizer, optimizer, scheduler, state)
+
+        state = {"epoch": epoch + 1, "batch_in_epoch": 0, "global_step": state["global_step"]}
+        save_checkpoint(ckpt_dir, student, tokenizer, optimizer, scheduler, state)
+
+    final_dir = os.path.join(args.output_dir, "final")
+    student.save_pretrained(final_dir)
+    tokenizer.save_pretrained(final_dir)
+
+    print("====================================")
+    print("DISTILLATION COMPLETE")
+    print(f"Optimizer steps : {state['global_step']}")
+    print(f"Student size    : {student_params / teacher_params:.0%} of teacher")
+    print(f"Saved to        : {final_dir}")
+    print(f"Serve it with   : DENGUEX_MODEL_PATH={final_dir}")
+    print(f"Compare with    : python compare_models.py --model student={final_dir}")
+    print("====================================")
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,15 @@
+import argparse
+import hashlib
 import json
 import os
 import random
+import re
+import shutil
+import tempfile
+from collections import deque
+from itertools import islice
+from multiprocessing import Pool
+
 from tqdm import tqdm
 
 # File Paths
@@ -23,47 +32,172 @@ TEMPLATES = [
     "question: What is the reason behind {}?"
 ]
 
+# Pipeline tuning
+
+SEED = 42
+CHUNK_SIZE = 256          # seed records handed to a worker at a time
+MAX_IN_FLIGHT = 2         # chunks queued or running per worker
+SHUFFLE_BUCKETS = 64      # temp files used by the external shuffle
+IN_MEMORY_SHUFFLE = 100_000  # below this many rows, shuffle in RAM
+
 def normalize(q):
     q = q.replace("question:", "").strip()
     return q.rstrip("?")
 
-# Load  dataset
-
-records = []
-with open(INPUT_FILE, "r", encoding="utf-8") as f:
-    for line in f:
-        records.append(json.loads(line))
-
-print(f"Loaded {len(records)} seed QA pairs")
-
-expanded = []
-seen = set()
-
-print("Expanding dataset...")
-for rec in tqdm(records):
-    base_q = normalize(rec["input"])
-
-    for tpl in TEMPLATES:
-        new_q = tpl.format(base_q)
-
-        if new_q not in seen:
-            expanded.append({
-                "input": new_q,
-                "output": rec["output"]
-            })
-            seen.add(new_q)
-
-        if len(expanded) >= TARGET_SIZE:
-            break
-
-    if len(expanded) >= TARGET_SIZE:
-        break
-
-random.shuffle(expanded)
-
-os.makedirs(os.path.dirname(OUTPUT_FILE), exist_ok=True)
-with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
-    for r in expanded:
-        f.write(json.dumps(r, ensure_ascii=False) + "\n")
-
-print(f"Done. Final dataset size: {len(expanded)}")
+_NON_WORD = re.compile(r"[^a-z0-9 ]+")
+_SPACES = re.compile(r"\s+")
+
+def dedup_key(q):
+    """
+    8-byte digest of a question with case, punctuation and spacing removed,
+    so near-identical paraphrases collapse to one entry. Stored as an int,
+    which keeps the seen-set far smaller than a set of strings.
+    """
+    q = _NON_WORD.sub(" ", q.lower())
+    q = _SPACES.sub(" ", q).strip()
+    digest = hashlib.blake2b(q.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+# =========================
+# STREAMING STAGES
+# =========================
+
+def read_records(paths):
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+
+def chunked(iterable, size):
+    it = iter(iterable)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+def expand_chunk(records):
+    """
+    Worker: apply every template to each seed record.
+    Returns (dedup_key, line) pairs so the parent never re-encodes JSON.
+    """
+    out = []
+    for rec in records:
+        base_q = normalize(rec["input"])
+        for tpl in TEMPLATES:
+            new_q = tpl.format(base_q)
+            line = json.dumps({"input": new_q, "output": rec["output"]}, ensure_ascii=False)
+            out.append((dedup_key(new_q), line))
+    return out
+
+def expand(paths, workers, target_size):
+    """
+    Yield unique expanded JSONL lines in deterministic order.
+    At most MAX_IN_FLIGHT chunks per worker are read ahead, and results are
+    consumed in submission order, so memory stays bounded and the output
+    does not depend on worker timing.
+    """
+    seen = set()
+    produced = 0
+    chunks = chunked(read_records(paths), CHUNK_SIZE)
+    window = max(1, workers * MAX_IN_FLIGHT)
+
+    with Pool(processes=workers) as pool:
+        pending = deque()
+        for chunk in islice(chunks, window):
+            pending.append(pool.apply_async(expand_chunk, (chunk,)))
+
+        while pending:
+            pairs = pending.popleft().get()
+            chunk = next(chunks, None)
+            if chunk is not None:
+                pending.append(pool.apply_async(expand_chunk, (chunk,)))
+
+            for key, line in pairs:
+                if key in seen:
+                    continue
+                seen.add(key)
+                yield line
+                produced += 1
+                if target_size and produced >= target_size:
+                    pool.terminate()
+                    return
+
+# =========================
+# BOUNDED-MEMORY SHUFFLE
+# =========================
+
+def external_shuffle(lines, out_path, seed):
+    """
+    Scatter lines into temp buckets at random, then shuffle each bucket in
+    memory. Peak memory is one bucket rather than the whole dataset, and the
+    result is fully determined by the seed and the input order.
+    """
+    rng = random.Random(seed)
+    tmp_dir = tempfile.mkdtemp(prefix="expand_shuffle_")
+    count = 0
+    try:
+        buckets = [
+            open(os.path.join(tmp_dir, f"{i:03d}.jsonl"), "w", encoding="utf-8")
+            for i in range(SHUFFLE_BUCKETS)
+        ]
+        try:
+            for line in lines:
+                buckets[rng.randrange(SHUFFLE_BUCKETS)].write(line + "\n")
+                count += 1
+        finally:
+            for b in buckets:
+                b.close()
+
+        with open(out_path, "w", encoding="utf-8") as out:
+            for b in buckets:
+                with open(b.name, "r", encoding="utf-8") as f:
+                    chunk = f.readlines()
+                rng.shuffle(chunk)
+                out.writelines(chunk)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    return count
+
+def small_shuffle(lines, out_path, seed):
+    rows = list(lines)
+    random.Random(seed).shuffle(rows)
+    with open(out_path, "w", encoding="utf-8") as out:
+        for line in rows:
+            out.write(line + "\n")
+    return len(rows)
+
+# =========================
+# CLI
+# =========================
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Expand seed QA pairs with question templates.")
+    parser.add_argument("--input", action="append", help="Seed JSONL file (repeatable)")
+    parser.add_argument("--output", default=OUTPUT_FILE)
+    parser.add_argument("--target-size", type=int, default=TARGET_SIZE,
+                        help="Stop after this many unique pairs (0 = no limit)")
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    inputs = args.input or [INPUT_FILE]
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+
+    print("Expanding dataset...")
+    lines = tqdm(expand(inputs, args.workers, args.target_size), unit="pairs")
+
+    if args.target_size and args.target_size <= IN_MEMORY_SHUFFLE:
+        total = small_shuffle(lines, args.output, args.seed)
+    else:
+        total = external_shuffle(lines, args.output, args.seed)
+
+    print(f"Done. Final dataset size: {total}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+
+# File Paths
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL_PATH = os.path.join(BASE_DIR, "model", "denguex_flan_t5_final")
+CACHE_ROOT = os.path.join(BASE_DIR, "dataset", "cache")
+
+DATASETS = [
+    os.path.join(BASE_DIR, "dataset", "raw", "dengue_qa_train.jsonl"),
+    os.path.join(BASE_DIR, "dataset", "expanded", "dengue_qa_train_expanded.jsonl"),
+]
+
+# Same limits the engine uses at inference time
+MAX_INPUT_LENGTH = 128
+MAX_TARGET_LENGTH = 128
+
+TOKENIZER_FILES = [
+    "spiece.model",
+    "tokenizer_config.json",
+    "special_tokens_map.json",
+    "added_tokens.json",
+]
+
+BATCH_SIZE = 512
+TOKEN_DTYPE = np.int32
+
+# =========================
+# CACHE KEY
+# =========================
+
+def _hash_files(paths):
+    h = hashlib.sha256()
+    for path in paths:
+        h.update(os.path.basename(path).encode("utf-8"))
+        if not os.path.exists(path):
+            h.update(b"<missing>")
+            continue
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+    return h.hexdigest()[:16]
+
+def tokenizer_hash(model_path=MODEL_PATH):
+    return _hash_files([os.path.join(model_path, name) for name in TOKENIZER_FILES])
+
+def dataset_hash(paths):
+    return _hash_files(paths)
+
+def cache_dir_for(paths, model_path=MODEL_PATH,
+                  max_input_length=MAX_INPUT_LENGTH, max_target_length=MAX_TARGET_LENGTH):
+    key = f"tok-{tokenizer_hash(model_path)}_data-{dataset_hash(paths)}_{max_input_length}x{max_target_length}"
+    return os.path.join(CACHE_ROOT, key)
+
+# =========================
+# BUILD
+# =========================
+
+def _read_pairs(paths):
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    rec = json.loads(line)
+                    yield rec["input"], rec["output"]
+
+def _batches(pairs, size):
+    batch = []
+    for pair in pairs:
+        batch.append(pair)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def build_cache(paths, out_dir, model_path=MODEL_PATH,
+                max_input_length=MAX_INPUT_LENGTH, max_target_length=MAX_TARGET_LENGTH):
+    """
+    Tokenize every (input, output) pair once into two flat token files
+    plus offset indexes. Written to a temp dir and renamed so a crashed
+    build never looks like a valid cache.
+    """
+    from transformers import AutoTokenizer
+
+    tokenizer = AutoTokenizer.from_pretrained(model_path, use_fast=False)
+
+    tmp_dir = out_dir + ".tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    input_offsets = [0]
+    label_offsets = [0]
+
+    with open(os.path.join(tmp_dir, "input_ids.bin"), "wb") as fin, \
+         open(os.path.join(tmp_dir, "labels.bin"), "wb") as flab:
+        for batch in _batches(_read_pairs(paths), BATCH_SIZE):
+            questions = [q for q, _ in batch]
+            answers = [a for _, a in batch]
+
+            enc = tokenizer(questions, truncation=True, max_length=max_input_length)
+            dec = tokenizer(text_target=answers, truncation=True, max_length=max_target_length)
+
+            for ids in enc["input_ids"]:
+                np.asarray(ids, dtype=TOKEN_DTYPE).tofile(fin)
+                input_offsets.append(input_offsets[-1] + len(ids))
+            for ids in dec["input_ids"]:
+                np.asarray(ids, dtype=TOKEN_DTYPE).tofile(flab)
+                label_offsets.append(label_offsets[-1] + len(ids))
+
+    np.save(os.path.join(tmp_dir, "input_offsets.npy"), np.asarray(input_offsets, dtype=np.int64))
+    np.save(os.path.join(tmp_dir, "label_offsets.npy"), np.asarray(label_offsets, dtype=np.int64))
+
+    meta = {
+        "datasets": [os.path.relpath(p, BASE_DIR) for p in paths],
+        "tokenizer_hash": tokenizer_hash(model_path),
+        "dataset_hash": dataset_hash(paths),
+        "max_input_length": max_input_length,
+        "max_target_length": max_target_length,
+        "num_examples": len(input_offsets) - 1,
+        "pad_token_id": tokenizer.pad_token_id,
+    }
+    with open(os.path.join(tmp_dir, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+
+    shutil.rmtree(out_dir, ignore_errors=True)
+    os.replace(tmp_dir, out_dir)
+    return out_dir
+
+# =========================
+# LOAD
+# =========================
+
+class TokenCache:
+    """
+    Read-only view over a built cache. Token arrays are memory-mapped,
+    so opening the cache costs nothing and pages are shared across
+    dataloader workers.
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        with open(os.path.join(cache_dir, "meta.json"), "r", encoding="utf-8") as f:
+            self.meta = json.load(f)
+
+        self.input_offsets = np.load(os.path.join(cache_dir, "input_offsets.npy"))
+        self.label_offsets = np.load(os.path.join(cache_dir, "label_offsets.npy"))
+        self.input_ids = self._memmap("input_ids.bin", self.input_offsets[-1])
+        self.labels = self._memmap("labels.bin", self.label_offsets[-1])
+
+    def _memmap(self, name, size):
+        if size == 0:
+            return np.zeros(0, dtype=TOKEN_DTYPE)
+        return np.memmap(os.path.join(self.cache_dir, name), dtype=TOKEN_DTYPE, mode="r", shape=(int(size),))
+
+    def __len__(self):
+        return len(self.input_offsets) - 1
+
+    def __getitem__(self, i):
+        inp = self.input_ids[self.input_offsets[i]:self.input_offsets[i + 1]]
+        lab = self.labels[self.label_offsets[i]:self.label_offsets[i + 1]]
+        return inp, lab
+
+    def input_lengths(self):
+        return np.diff(self.input_offsets)
+
+    def label_lengths(self):
+        return np.diff(self.label_offsets)
+
+def load_or_build(paths=None, model_path=MODEL_PATH, rebuild=False,
+                  max_input_length=MAX_INPUT_LENGTH, max_target_length=MAX_TARGET_LENGTH):
+    """
+    Return a TokenCache for these datasets, building it only when the
+    tokenizer or dataset contents changed since the last build.
+    """
+    paths = paths or DATASETS
+    out_dir = cache_dir_for(paths, model_path, max_input_length, max_target_length)
+
+    if rebuild or not os.path.exists(os.path.join(out_dir, "meta.json")):
+        start = time.perf_counter()
+        build_cache(paths, out_dir, model_path, max_input_length, max_target_length)
+        print(f"[INFO] Built token cache in {time.perf_counter() - start:.1f}s: {out_dir}")
+    else:
+        print(f"[INFO] Reusing token cache: {out_dir}")
+
+    return TokenCache(out_dir)
+
+# =========================
+# CLI
+# =========================
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-tokenize QA datasets into a memory-mapped cache.")
+    parser.add_argument("--dataset", action="append", help="JSONL dataset (repeatable, default: raw + expanded)")
+    parser.add_argument("--model-path", default=MODEL_PATH)
+    parser.add_argument("--rebuild", action="store_true", help="Ignore an existing cache")
+    args = parser.parse_args()
+
+    cache = load_or_build(args.dataset, args.model_path, rebuild=args.rebuild)
+
+    print("====================================")
+    print("TOKEN CACHE READY")
+    print(f"Examples        : {len(cache)}")
+    print(f"Input tokens    : {int(cache.input_offsets[-1])}")
+    print(f"Target tokens   : {int(cache.label_offsets[-1])}")
+    print(f"Location        : {cache.cache_dir}")
+    print("====================================")
+
+if __name__ == "__main__":
+    main()
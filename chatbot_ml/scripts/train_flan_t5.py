@@ -0,0 +1,223 @@
+import argparse
+import json
+import os
+import random
+import shutil
+import time
+
+import numpy as np
+import torch
+from transformers import AutoModelForSeq2SeqLM, AutoTokenizer, get_linear_schedule_with_warmup
+
+from token_cache import BASE_DIR, DATASETS, MODEL_PATH, load_or_build
+
+# File Paths
+
+OUTPUT_DIR = os.path.join(BASE_DIR, "model", "denguex_flan_t5_retrained")
+BASE_MODEL = "google/flan-t5-base"
+
+# Defaults
+
+SEED = 42
+BATCH_SIZE = 16
+BUCKET_MULTIPLIER = 50    # batches drawn from one length-sorted pool
+LABEL_PAD_ID = -100       # ignored by the seq2seq loss
+
+# =========================
+# LENGTH-BUCKETED BATCHING
+# =========================
+
+def bucketed_batches(lengths, batch_size, seed, multiplier=BUCKET_MULTIPLIER):
+    """
+    Shuffle, cut into pools of batch_size * multiplier, sort each pool by
+    length and slice into batches, then shuffle the batch order. Samples in a
+    batch have similar lengths, so dynamic padding adds few pad tokens while
+    the epoch order stays random. Deterministic for a given seed.
+    """
+    rng = np.random.default_rng(seed)
+    order = rng.permutation(len(lengths))
+    pool_size = batch_size * multiplier
+
+    batches = []
+    for start in range(0, len(order), pool_size):
+        pool = order[start:start + pool_size]
+        pool = pool[np.argsort(lengths[pool], kind="stable")]
+        for b in range(0, len(pool), batch_size):
+            batches.append(pool[b:b + batch_size])
+
+    rng.shuffle(batches)
+    return batches
+
+def collate(cache, indices, pad_id):
+    """
+    Pad to the longest sample in this batch only.
+    """
+    pairs = [cache[int(i)] for i in indices]
+    max_in = max(len(inp) for inp, _ in pairs)
+    max_lab = max(len(lab) for _, lab in pairs)
+
+    input_ids = np.full((len(pairs), max_in), pad_id, dtype=np.int64)
+    attention = np.zeros((len(pairs), max_in), dtype=np.int64)
+    labels = np.full((len(pairs), max_lab), LABEL_PAD_ID, dtype=np.int64)
+
+    for row, (inp, lab) in enumerate(pairs):
+        input_ids[row, :len(inp)] = inp
+        attention[row, :len(inp)] = 1
+        labels[row, :len(lab)] = lab
+
+    return {
+        "input_ids": torch.from_numpy(input_ids),
+        "attention_mask": torch.from_numpy(attention),
+        "labels": torch.from_numpy(labels),
+    }
+
+# =========================
+# CHECKPOINTS
+# =========================
+
+def save_checkpoint(path, model, tokenizer, optimizer, scheduler, state):
+    tmp = path + ".tmp"
+    os.makedirs(tmp, exist_ok=True)
+    model.save_pretrained(tmp)
+    tokenizer.save_pretrained(tmp)
+    torch.save({
+        "optimizer": optimizer.state_dict(),
+        "scheduler": scheduler.state_dict(),
+        "torch_rng": torch.get_rng_state(),
+    }, os.path.join(tmp, "trainer_state.pt"))
+    with open(os.path.join(tmp, "progress.json"), "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+
+    if os.path.isdir(path):
+        old = path + ".old"
+        os.replace(path, old)
+        os.replace(tmp, path)
+        shutil.rmtree(old, ignore_errors=True)
+    else:
+        os.replace(tmp, path)
+
+def load_progress(path):
+    progress_file = os.path.join(path, "progress.json")
+    if not os.path.exists(progress_file):
+        return None
+    with open(progress_file, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+# =========================
+# TRAINING
+# =========================
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Fine-tune FLAN-T5 on the DengueX QA datasets.")
+    parser.add_argument("--dataset", action="append", help="JSONL dataset (repeatable, default: raw + expanded)")
+    parser.add_argument("--base-model", default=BASE_MODEL, help="Model to start from when not resuming")
+    parser.add_argument("--tokenizer-path", default=MODEL_PATH)
+    parser.add_argument("--output-dir", default=OUTPUT_DIR)
+    parser.add_argument("--epochs", type=int, default=3)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--grad-accum", type=int, default=1, help="Micro-batches per optimizer step")
+    parser.add_argument("--lr", type=float, default=3e-4)
+    parser.add_argument("--warmup-ratio", type=float, default=0.05)
+    parser.add_argument("--save-every", type=int, default=200, help="Optimizer steps between checkpoints")
+    parser.add_argument("--log-every", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--threads", type=int, default=0, help="torch intra-op threads (0 = torch default)")
+    parser.add_argument("--no-resume", action="store_true", help="Start over even if a checkpoint exists")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+
+    random.seed(args.seed)
+    torch.manual_seed(args.seed)
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    cache = load_or_build(args.dataset or DATASETS, args.tokenizer_path)
+    pad_id = cache.meta["pad_token_id"]
+    lengths = cache.input_lengths() + cache.label_lengths()
+
+    ckpt_dir = os.path.join(args.output_dir, "checkpoint-last")
+    progress = None if args.no_resume else load_progress(ckpt_dir)
+
+    model_source = ckpt_dir if progress else args.base_model
+    print(f"[INFO] Loading model from {model_source}")
+    tokenizer = AutoTokenizer.from_pretrained(args.tokenizer_path, use_fast=False)
+    model = AutoModelForSeq2SeqLM.from_pretrained(model_source).to(device)
+    model.train()
+
+    batches_per_epoch = len(bucketed_batches(lengths, args.batch_size, args.seed))
+    steps_per_epoch = (batches_per_epoch + args.grad_accum - 1) // args.grad_accum
+    total_steps = steps_per_epoch * args.epochs
+
+    optimizer = torch.optim.AdamW(model.parameters(), lr=args.lr)
+    scheduler = get_linear_schedule_with_warmup(
+        optimizer, int(total_steps * args.warmup_ratio), total_steps
+    )
+
+    state = {"epoch": 0, "batch_in_epoch": 0, "global_step": 0}
+    if progress:
+        trainer_state = torch.load(os.path.join(ckpt_dir, "trainer_state.pt"), map_location="cpu")
+        optimizer.load_state_dict(trainer_state["optimizer"])
+        scheduler.load_state_dict(trainer_state["scheduler"])
+        torch.set_rng_state(trainer_state["torch_rng"])
+        state = progress
+        print(f"[INFO] Resuming at epoch {state['epoch']} batch {state['batch_in_epoch']} "
+              f"(step {state['global_step']}/{total_steps})")
+
+    window_tokens = 0
+    window_start = time.perf_counter()
+
+    for epoch in range(state["epoch"], args.epochs):
+        batches = bucketed_batches(lengths, args.batch_size, args.seed + epoch)
+        start_batch = state["batch_in_epoch"] if epoch == state["epoch"] else 0
+
+        optimizer.zero_grad(set_to_none=True)
+        for b in range(start_batch, len(batches)):
+            batch = {k: v.to(device) for k, v in collate(cache, batches[b], pad_id).items()}
+
+            loss = model(**batch).loss / args.grad_accum
+            loss.backward()
+
+            window_tokens += int(batch["attention_mask"].sum()) + int((batch["labels"] != LABEL_PAD_ID).sum())
+
+            last_in_epoch = b == len(batches) - 1
+            if (b + 1) % args.grad_accum and not last_in_epoch:
+                continue
+
+            torch.nn.utils.clip_grad_norm_(model.parameters(), 1.0)
+            optimizer.step()
+            scheduler.step()
+            optimizer.zero_grad(set_to_none=True)
+
+            state = {"epoch": epoch, "batch_in_epoch": b + 1, "global_step": state["global_step"] + 1}
+            step = state["global_step"]
+
+            if step % args.log_every == 0:
+                elapsed = time.perf_counter() - window_start
+                print(f"[TRAIN] epoch {epoch + 1} step {step}/{total_steps} "
+                      f"loss {loss.item() * args.grad_accum:.4f} "
+                      f"lr {scheduler.get_last_lr()[0]:.2e} "
+                      f"{window_tokens / max(elapsed, 1e-9):.0f} tokens/sec")
+                window_tokens = 0
+                window_start = time.perf_counter()
+
+            if step % args.save_every == 0:
+                save_checkpoint(ckpt_dir, model, tokenizer, optimizer, scheduler, state)
+
+        state = {"epoch": epoch + 1, "batch_in_epoch": 0, "global_step": state["global_step"]}
+        save_checkpoint(ckpt_dir, model, tokenizer, optimizer, scheduler, state)
+
+    final_dir = os.path.join(args.output_dir, "final")
+    model.save_pretrained(final_dir)
+    tokenizer.save_pretrained(final_dir)
+
+    print("====================================")
+    print("TRAINING COMPLETE")
+    print(f"Optimizer steps : {state['global_step']}")
+    print(f"Saved to        : {final_dir}")
+    print("====================================")
+
+if __name__ == "__main__":
+    main()
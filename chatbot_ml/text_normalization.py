@@ -0,0 +1,81 @@
+import re
+import unicodedata
+
+# =========================
+# INPUT BOUNDS
+# =========================
+
+# The model only sees the first 128 tokens (~500 characters), so longer
+# questions gain nothing. Raw input is cut before any Unicode work so a
+# megabyte payload costs no more than a long question.
+MAX_QUESTION_CHARS = 500
+MAX_RAW_CHARS = MAX_QUESTION_CHARS * 4
+
+_SPACES = re.compile(r"\s+")
+
+def _invisible(ch: str) -> bool:
+    # Cf: zero-width spaces/joiners, bidi controls, soft hyphen.
+    # Cc: control characters (whitespace is handled separately).
+    return unicodedata.category(ch) in ("Cf", "Cc") and not ch.isspace()
+
+# Format characters only occur in the BMP, the SMP and the tag block, so
+# there is no need to scan all 1.1M code points at import.
+_INVISIBLE = {
+    cp: None
+    for block in (range(0x20000), range(0xE0000, 0xE1000))
+    for cp in block
+    if _invisible(chr(cp))
+}
+
+def clean_question(text: str) -> str:
+    """
+    Bounded, NFKC-normalized question with invisible characters removed
+    and whitespace collapsed. Case is kept: this is what gets logged and
+    sent to the model.
+    """
+    # NFKC can expand one character into up to 18, so cut again after it.
+    text = unicodedata.normalize("NFKC", text[:MAX_RAW_CHARS])[:MAX_RAW_CHARS].translate(_INVISIBLE)
+    return _SPACES.sub(" ", text).strip()[:MAX_QUESTION_CHARS]
+
+# =========================
+# MATCHING FORM
+# =========================
+
+# Latin look-alikes from Cyrillic and Greek that NFKC leaves alone, so
+# "d\u0435ngue" (Cyrillic e) cannot slip past the keyword and block lists.
+CONFUSABLES = str.maketrans({
+    "\u0430": "a", "\u0432": "b", "\u0435": "e", "\u0451": "e", "\u043a": "k", "\u043c": "m",
+    "\u043d": "h", "\u043e": "o", "\u0440": "p", "\u0441": "c", "\u0442": "t", "\u0443": "y",
+    "\u0445": "x", "\u0456": "i", "\u0457": "i", "\u0458": "j", "\u0455": "s", "\u0501": "d",
+    "\u051b": "q", "\u051d": "w", "\u04bb": "h", "\u0261": "g", "\u0251": "a", "\u0131": "i",
+    "\u03b1": "a", "\u03b2": "b", "\u03b3": "y", "\u03b5": "e", "\u03b7": "n", "\u03b9": "i",
+    "\u03ba": "k", "\u03bd": "v", "\u03bf": "o", "\u03c1": "p", "\u03c4": "t", "\u03c5": "u",
+    "\u03c7": "x", "\u03c9": "w",
+})
+
+def normalize_for_matching(text: str) -> str:
+    """
+    clean_question() plus case folding and confusable mapping. Guardrails
+    scan this form only.
+    """
+    return clean_question(text).casefold().translate(CONFUSABLES)
+
+# =========================
+# LINEAR-TIME PATTERNS
+# =========================
+
+# Literal text with optional \b anchors. No quantifiers, groups,
+# alternation or classes means no backtracking: the combined regex does
+# at most (input length x total pattern length) work.
+_LITERAL_PATTERN = re.compile(r"(?:\\b)?[a-z0-9 '\-]+(?:\\b)?")
+
+def compile_literal_patterns(patterns):
+    """
+    Validates that every pattern is a \\b-anchored literal and combines
+    them into one regex. Raises ValueError for anything else, so a pattern
+    that could backtrack fails at import, not under load.
+    """
+    for pattern in patterns:
+        if not _LITERAL_PATTERN.fullmatch(pattern):
+            raise ValueError(f"Guardrail pattern must be a literal with optional \\b anchors: {pattern!r}")
+    return re.compile("|".join(f"(?:{p})" for p in patterns))
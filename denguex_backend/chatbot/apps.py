@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class ChatbotConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'chatbot'
+
+    def ready(self):
+        # Build the knowledge base snapshot and its prepared responses at
+        # startup, so the first question does not pay for them.
+        from knowledge_base import snapshot as knowledge_base
+
+        from .responses import table_for
+
+        table_for(knowledge_base.current())
@@ -1,4 +1,4 @@
-import re
+from text_normalization import compile_literal_patterns, normalize_for_matching
 
 # ==========================
 # 1. DOMAIN GUARDRAIL (DENGUE ONLY)
@@ -39,6 +39,9 @@ MEDICAL_BLOCK_PATTERNS = [
     r"\bwhat should i take",
 ]
 
+# Literal-only patterns in one regex: matching is linear in the input.
+MEDICAL_BLOCK_REGEX = compile_literal_patterns(MEDICAL_BLOCK_PATTERNS)
+
 # ==========================
 # 3. REFUSAL MESSAGES
 # ==========================
@@ -59,7 +62,7 @@ def is_dengue_related(text: str) -> bool:
     """
     Returns True if the query is related to dengue.
     """
-    text = text.lower()
+    text = normalize_for_matching(text)
     return any(keyword in text for keyword in DENGUE_KEYWORDS)
 
 
@@ -67,14 +70,15 @@ def is_medically_unsafe(text: str) -> bool:
     """
     Returns True if the query asks for diagnosis or treatment.
     """
-    text = text.lower()
-    return any(re.search(pattern, text) for pattern in MEDICAL_BLOCK_PATTERNS)
+    return MEDICAL_BLOCK_REGEX.search(normalize_for_matching(text)) is not None
 
 
 def guardrail_check(text: str):
     """
     Returns (allowed: bool, message: str | None)
     """
+    text = normalize_for_matching(text)
+
     if not is_dengue_related(text):
         return False, DOMAIN_REFUSAL_MESSAGE
 
@@ -0,0 +1,275 @@
+import atexit
+import glob
+import json
+import logging
+import os
+import queue
+import threading
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+
+logger = logging.getLogger(__name__)
+
+# ==========================
+# 1. RECORD FORMAT
+# ==========================
+def make_record(question, guardrail, intent, source, allowed, latency_ms) -> dict:
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "question": question,
+        "guardrail": guardrail,
+        "intent": intent,
+        "source": source,
+        "allowed": allowed,
+        "latency_ms": round(latency_ms, 3),
+    }
+
+
+# ==========================
+# 2. BUFFERED BATCH WRITER
+# ==========================
+class InteractionLogger:
+    """
+    Request threads only do a non-blocking put into a bounded queue.
+    A single background thread drains it and inserts whole batches in
+    one transaction, together with the matching rollup increments.
+
+    When the queue is full or a batch fails, records go to an append-only
+    spill file (or are dropped when no spill path is configured). Spilled
+    records are loaded back once the writer is idle again. Records that
+    keep failing, or cannot be parsed, are moved to a ".bad" file.
+    """
+
+    # Attempts before a record is quarantined instead of spilled again.
+    MAX_ATTEMPTS = 3
+
+    def __init__(self, queue_size, batch_size, flush_seconds, spill_path=None):
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.spill_path = str(spill_path) if spill_path else None
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._spill_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+        self.written = 0
+        self.spilled = 0
+        self.dropped = 0
+        self.failed_batches = 0
+
+    def log(self, record: dict):
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self._spill([record])
+
+    def stats(self) -> dict:
+        return {
+            "queued": self._queue.qsize(),
+            "written": self.written,
+            "spilled": self.spilled,
+            "dropped": self.dropped,
+            "failed_batches": self.failed_batches,
+        }
+
+    # ---- background writer ----
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="chat-log-writer", daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+
+    def _drain(self):
+        try:
+            batch = [self._queue.get(timeout=self.flush_seconds)]
+        except queue.Empty:
+            return []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                batch = self._drain()
+                if batch:
+                    self._write(batch)
+                else:
+                    self._replay_spill()
+            except Exception:
+                # Never let one bad batch or file kill the writer thread.
+                logger.exception("Chat log writer error")
+                self._stop.wait(self.flush_seconds)
+        # Final flush on shutdown.
+        while True:
+            batch = self._drain_nowait()
+            if not batch:
+                break
+            self._write(batch)
+        connection.close()
+
+    def _drain_nowait(self):
+        batch = []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch):
+        from .models import ChatInteraction
+        from .rollups import record_batch
+
+        objs, kept = [], []
+        for r in batch:
+            try:
+                fields = {k: v for k, v in r.items() if k != "attempts"}
+                fields["created_at"] = datetime.fromisoformat(fields["created_at"])
+                objs.append(ChatInteraction(**fields))
+                kept.append(r)
+            except (KeyError, TypeError, ValueError):
+                self._quarantine([r])
+
+        if not objs:
+            return
+        close_old_connections()
+        try:
+            with transaction.atomic():
+                ChatInteraction.objects.bulk_create(objs, batch_size=self.batch_size)
+                # Rollups commit with the rows they count.
+                record_batch(objs)
+        except Exception:
+            logger.exception("Chat log batch of %d failed; spilling", len(kept))
+            self.failed_batches += 1
+            retry = [{**r, "attempts": r.get("attempts", 0) + 1} for r in kept]
+            self._spill([r for r in retry if r["attempts"] < self.MAX_ATTEMPTS])
+            self._quarantine([r for r in retry if r["attempts"] >= self.MAX_ATTEMPTS])
+            return
+        self.written += len(objs)
+
+    # ---- spill file ----
+
+    def _append(self, path, records):
+        with self._spill_lock, open(path, "a", encoding="utf-8") as f:
+            for r in records:
+                f.write((r if isinstance(r, str) else json.dumps(r, ensure_ascii=False)) + "\n")
+
+    def _spill_file(self):
+        # One file per process, so a replay never races another worker's appends.
+        return f"{self.spill_path}.{os.getpid()}"
+
+    def _spill(self, records):
+        if not records:
+            return
+        if not self.spill_path:
+            self.dropped += len(records)
+            return
+        try:
+            self._append(self._spill_file(), records)
+            self.spilled += len(records)
+        except OSError:
+            self.dropped += len(records)
+
+    def _quarantine(self, records):
+        if not records:
+            return
+        self.dropped += len(records)
+        if self.spill_path:
+            try:
+                self._append(self.spill_path + ".bad", records)
+            except OSError:
+                pass
+
+    def _claim_spill(self):
+        """
+        Renames this process's spill file out of the way and returns the
+        new name. Files left behind by a dead worker are adopted the same
+        way; the rename lets only one live worker win each of them.
+        """
+        claimed = self._spill_file() + ".replaying"
+        if os.path.exists(claimed):
+            # Left over from an interrupted replay in this process.
+            return claimed
+        try:
+            with self._spill_lock:
+                os.replace(self._spill_file(), claimed)
+            return claimed
+        except FileNotFoundError:
+            pass
+
+        prefix = self.spill_path + "."
+        for path in glob.glob(glob.escape(self.spill_path) + ".*"):
+            pid = path[len(prefix):].split(".")[0]
+            if pid.isdigit() and int(pid) != os.getpid() and not _pid_alive(int(pid)):
+                try:
+                    os.replace(path, claimed)
+                    return claimed
+                except FileNotFoundError:
+                    continue
+        return None
+
+    def _replay_spill(self):
+        if not self.spill_path:
+            return
+        replay_path = self._claim_spill()
+        if replay_path is None:
+            return
+
+        batch = []
+        with open(replay_path, "r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    self._quarantine([line.rstrip("\n")])
+                    continue
+                if not isinstance(record, dict):
+                    self._quarantine([line.rstrip("\n")])
+                    continue
+                batch.append(record)
+                if len(batch) >= self.batch_size:
+                    self._write(batch)
+                    batch = []
+        if batch:
+            self._write(batch)
+        os.remove(replay_path)
+
+    def close(self, timeout=5.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+interaction_logger = InteractionLogger(
+    queue_size=settings.CHAT_LOG_QUEUE_SIZE,
+    batch_size=settings.CHAT_LOG_BATCH_SIZE,
+    flush_seconds=settings.CHAT_LOG_FLUSH_SECONDS,
+    spill_path=settings.CHAT_LOG_SPILL_PATH,
+)
+
+
+def log_interaction(**fields):
+    interaction_logger.log(make_record(**fields))
@@ -0,0 +1,40 @@
+from datetime import datetime, time, timedelta, timezone
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max, Min
+
+from chatbot.models import ChatInteraction
+from chatbot.rollups import backfill
+
+
+def _parse_day(value):
+    try:
+        return datetime.combine(datetime.strptime(value, "%Y-%m-%d").date(), time.min, tzinfo=timezone.utc)
+    except ValueError:
+        raise CommandError(f"Expected YYYY-MM-DD, got {value!r}")
+
+
+class Command(BaseCommand):
+    help = "Rebuild hourly and daily chatbot rollups from the interaction log."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--since", help="First day to rebuild (YYYY-MM-DD, UTC). Default: oldest log.")
+        parser.add_argument("--until", help="Last day to rebuild, inclusive. Default: newest log.")
+
+    def handle(self, *args, **options):
+        bounds = ChatInteraction.objects.aggregate(first=Min("created_at"), last=Max("created_at"))
+        if bounds["first"] is None:
+            self.stdout.write("No chat interactions to backfill.")
+            return
+
+        start = _parse_day(options["since"]) if options["since"] else bounds["first"]
+        end = _parse_day(options["until"]) if options["until"] else bounds["last"]
+        end = end.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+
+        total = backfill(start, end)
+
+        self.stdout.write("====================================")
+        self.stdout.write("CHATBOT ROLLUP BACKFILL COMPLETE")
+        self.stdout.write(f"Range        : {start:%Y-%m-%d} .. {end - timedelta(days=1):%Y-%m-%d}")
+        self.stdout.write(f"Interactions : {total}")
+        self.stdout.write("====================================")
@@ -0,0 +1,88 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from chatbot_engine import fast_answer
+from knowledge_base import snapshot as knowledge_base
+from text_normalization import clean_question
+
+from chatbot.views import cheap_answer
+
+MB = 1024 * 1024
+
+# Inputs built to make naive lowercase + per-pattern regex scanning slow:
+# huge payloads, near-miss prefixes of block patterns, characters that
+# NFKC expands or that hide between letters.
+ADVERSARIAL = {
+    "1 MB of one letter": "a" * MB,
+    "1 MB of dengue": "dengue " * (MB // 7),
+    "repeated 'diagno' prefix": "dengue diagno" * (MB // 13),
+    "repeated 'do i have dengu' prefix": "do i have dengu" * (MB // 15),
+    "zero-width flood then question": "\u200b" * MB + "diagnose dengue",
+    "Cyrillic confusables": "d\u0435ngue " * (MB // 7),
+    "combining marks": "a" + "\u0301" * MB,
+    "NFKC 18x expansion": "\ufdfa" * MB,
+    "whitespace flood": " \t\n" * (MB // 3),
+    "astral characters": "\U0001f99f" * MB,
+}
+
+# (question, expected source) after normalization.
+EXPECTED = [
+    ("How does dengue spread?", None),
+    ("What is the weather today?", "guardrail"),
+    ("Can you diagnose d\u0435ngue?", "guardrail"),     # Cyrillic e
+    ("diag\u200bnose dengue please", "guardrail"),      # zero-width space
+    ("\uff24\uff25\uff2e\uff27\uff35\uff25 treatment", "guardrail"),  # fullwidth
+    ("\u202edengue\u202c how to cure", "guardrail"),    # bidi controls
+]
+
+
+class Command(BaseCommand):
+    help = "Feed adversarial inputs through the chatbot guardrails and fail if any exceeds a latency ceiling."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--ceiling-ms", type=float, default=20.0,
+                            help="Maximum milliseconds per input for the full guardrail path")
+        parser.add_argument("--repeat", type=int, default=5, help="Runs per input; the worst one counts")
+
+    def handle(self, *args, **options):
+        failures = []
+
+        # Pinned like a request does; built by ChatbotConfig.ready(), so no
+        # timed run pays for building the index.
+        snapshot = knowledge_base.current()
+        cheap_answer(clean_question("How does dengue spread?"), snapshot)
+
+        self.stdout.write("====================================")
+        self.stdout.write("GUARDRAIL LATENCY (worst of runs)")
+        self.stdout.write(f"{'input':36}{'size':>10}{'view ms':>10}{'engine ms':>11}")
+        for name, payload in ADVERSARIAL.items():
+            view_ms = engine_ms = 0.0
+            for _ in range(options["repeat"]):
+                start = time.perf_counter()
+                cheap_answer(clean_question(payload), snapshot)
+                view_ms = max(view_ms, (time.perf_counter() - start) * 1000)
+
+                # The engine is also called directly (scripts, tests) with raw text.
+                start = time.perf_counter()
+                fast_answer(payload, snapshot)
+                engine_ms = max(engine_ms, (time.perf_counter() - start) * 1000)
+
+            self.stdout.write(f"{name:36}{len(payload):>10}{view_ms:>10.2f}{engine_ms:>11.2f}")
+            if max(view_ms, engine_ms) > options["ceiling_ms"]:
+                failures.append(f"{name}: {max(view_ms, engine_ms):.2f} ms")
+
+        self.stdout.write("------------------------------------")
+        self.stdout.write("Normalization checks:")
+        for question, expected in EXPECTED:
+            result = cheap_answer(clean_question(question), snapshot)
+            source = result["source"] if result else None
+            ok = source == expected if expected else source not in ("guardrail", "non_dengue", "medical_block")
+            self.stdout.write(f"  {'OK  ' if ok else 'FAIL'} {question.encode('unicode_escape').decode()!s:50} -> {source}")
+            if not ok:
+                failures.append(f"{question!r}: got {source}, expected {expected or 'allowed'}")
+        self.stdout.write("====================================")
+
+        if failures:
+            raise CommandError("Guardrail benchmark failed:\n  " + "\n  ".join(failures))
+        self.stdout.write(self.style.SUCCESS(f"All inputs under {options['ceiling_ms']:.0f} ms."))
@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from knowledge_base import snapshot as knowledge_base
+from knowledge_base.canonical_answers import CANONICAL_ANSWERS
+from knowledge_base.question_classifier import INTENT_RULES
+from knowledge_base.retrieval import load_qa_pairs
+
+
+class Command(BaseCommand):
+    help = (
+        "Export the knowledge base to its override file for editing, or check the file. "
+        "Running workers pick up a valid edit by themselves within DENGUEX_KB_POLL_SECONDS."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("action", choices=["export", "check"])
+        parser.add_argument("--path", default=knowledge_base.OVERRIDE_PATH)
+
+    def handle(self, *args, **options):
+        if options["action"] == "export":
+            path = knowledge_base.export(options["path"])
+            self.stdout.write(self.style.SUCCESS(f"Wrote {path}"))
+            return
+
+        try:
+            override = knowledge_base.load_override(options["path"])
+        except (OSError, ValueError, TypeError) as exc:
+            raise CommandError(f"Invalid knowledge base file: {exc}")
+
+        qa_pairs = load_qa_pairs()
+        built_in = knowledge_base.Snapshot(CANONICAL_ANSWERS, INTENT_RULES, qa_pairs)
+        snapshot = knowledge_base.Snapshot(
+            override.get("canonical_answers", CANONICAL_ANSWERS),
+            override.get("intent_rules", INTENT_RULES),
+            qa_pairs,
+            previous=built_in,
+        )
+        diff = knowledge_base.changes(built_in, snapshot)
+
+        rule_intents = {intent for intent, _ in snapshot.intent_rules}
+        unanswered = sorted(rule_intents - set(snapshot.canonical_answers))
+
+        self.stdout.write("====================================")
+        self.stdout.write(f"Version           : {snapshot.version}")
+        self.stdout.write(f"Canonical answers : {len(snapshot.canonical_answers)}")
+        self.stdout.write(f"Intent rules      : {len(snapshot.intent_rules)}")
+        self.stdout.write(f"QA pairs          : {len(snapshot.qa_pairs)}")
+        self.stdout.write(f"Changed vs code   : {sorted(diff['canonical']) or 'none'}"
+                          f"{' (intent rules changed)' if diff['intent_rules'] else ''}")
+        if unanswered:
+            self.stdout.write(f"Rules without an answer (sent to the model): {unanswered}")
+        self.stdout.write("====================================")
@@ -0,0 +1,351 @@
+import ast
+import asyncio
+import json
+import random
+import ssl
+import time
+from collections import defaultdict
+from urllib.parse import urlencode, urlsplit
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+DATASET_PATH = settings.CHATBOT_ML_DIR / 'dataset' / 'raw' / 'dengue_qa_train.jsonl'
+CONTROLLED_PATH = settings.CHATBOT_ML_DIR / 'test_chatbot_controlled.py'
+
+OFF_TOPIC_PROBES = [
+    "What is the capital of France?",
+    "Write a poem about cricket.",
+    "How do I reset my email password?",
+    "Who won the football match yesterday?",
+    "Explain how a car engine works.",
+    "What is the weather today?",
+]
+
+MEDICAL_PROBES = [
+    "Do I have dengue? I have a rash and joint pain.",
+    "What medicine should I take for dengue fever?",
+    "My platelet count is 90000, is that dengue?",
+    "Can you diagnose dengue from my symptoms?",
+    "How to cure dengue fast at home?",
+    "What should I take for dengue fever, 500 mg paracetamol?",
+]
+
+DEFAULT_MIX = "dataset=0.6,controlled=0.25,off_topic=0.1,medical=0.05"
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+# ==========================
+# 1. QUESTION MIX
+# ==========================
+def load_dataset_questions():
+    questions = []
+    with open(DATASET_PATH, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                questions.append(json.loads(line)["input"].replace("question:", "").strip())
+    return questions
+
+
+def load_controlled_questions():
+    """
+    TEST_CASES read from the source: importing the module would load the engine.
+    """
+    tree = ast.parse(CONTROLLED_PATH.read_text(encoding="utf-8"))
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(getattr(t, "id", None) == "TEST_CASES" for t in node.targets):
+            return [question for question, _ in ast.literal_eval(node.value)]
+    raise CommandError(f"No TEST_CASES in {CONTROLLED_PATH}")
+
+
+def parse_mix(spec):
+    pools = {
+        "dataset": load_dataset_questions,
+        "controlled": load_controlled_questions,
+        "off_topic": lambda: OFF_TOPIC_PROBES,
+        "medical": lambda: MEDICAL_PROBES,
+    }
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in pools:
+            raise CommandError(f"Unknown mix entry {name!r}; choose from {sorted(pools)}")
+        mix[name] = (float(weight or 1), pools[name]())
+    return mix
+
+
+# ==========================
+# 2. RAW ASYNCIO HTTP/1.1 CLIENT
+# ==========================
+class BadResponse(Exception):
+    """
+    The server closed the connection or sent an unparsable status line.
+    """
+
+
+async def http_request(target, method, question, headers, timeout):
+    """
+    One request on its own connection. Returns (status, headers dict).
+    """
+    path = target.path or "/"
+    body = b""
+    if method == "GET":
+        path += "?" + urlencode({"question": question})
+    else:
+        body = json.dumps({"question": question}).encode("utf-8")
+
+    lines = [
+        f"{method} {path} HTTP/1.1",
+        f"Host: {target.netloc}",
+        "Connection: close",
+        "Accept: application/json",
+        *(f"{k}: {v}" for k, v in headers.items()),
+    ]
+    if method == "POST":
+        lines += ["Content-Type: application/json", f"Content-Length: {len(body)}"]
+    raw = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body
+
+    async def exchange():
+        reader, writer = await asyncio.open_connection(
+            target.hostname,
+            target.port or (443 if target.scheme == "https" else 80),
+            ssl=ssl.create_default_context() if target.scheme == "https" else None,
+        )
+        try:
+            writer.write(raw)
+            await writer.drain()
+            status_line = await reader.readline()
+            response_headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                key, _, value = line.decode("latin-1").partition(":")
+                response_headers[key.strip().lower()] = value.strip()
+            await reader.read()
+            parts = status_line.split()
+            if len(parts) < 2 or not parts[1].isdigit():
+                raise BadResponse(status_line[:80])
+            return int(parts[1]), response_headers
+        finally:
+            writer.close()
+
+    return await asyncio.wait_for(exchange(), timeout)
+
+
+def answer_path(status, headers):
+    if status == 429:
+        return "rate_limited"
+    if status == 503:
+        return "busy"
+    if status >= 400:
+        return f"http_{status}"
+    return headers.get("x-answer-source", "unknown")
+
+
+# ==========================
+# 3. OPEN-LOOP DRIVER
+# ==========================
+def arrival_times(mode, rate, duration, ramp_to, steps):
+    """
+    Seconds from start at which each request is sent, independent of how
+    fast the server answers. Ramp mode raises the rate in equal steps.
+    Yields (send_at, step).
+    """
+    if mode == "constant":
+        n = int(rate * duration)
+        for i in range(n):
+            yield i / rate, 0
+        return
+
+    step_seconds = duration / steps
+    for step in range(steps):
+        step_rate = rate + (ramp_to - rate) * step / max(steps - 1, 1)
+        n = int(step_rate * step_seconds)
+        for i in range(n):
+            yield step * step_seconds + i / step_rate, step
+
+
+async def run_load(target, schedule, questions, options):
+    """
+    Latency counts from the scheduled send time, so a server that falls
+    behind is charged for the queueing it causes (no coordinated omission).
+    """
+    rng = random.Random(options["seed"])
+    limit = asyncio.Semaphore(options["max_inflight"])
+    results = []
+    dropped = defaultdict(int)
+
+    async def one(send_at, step, pool, question, client):
+        headers = {"X-Forwarded-For": client} if client else {}
+        if options["deadline_ms"]:
+            headers["X-Deadline-Ms"] = str(options["deadline_ms"])
+        try:
+            status, response_headers = await http_request(
+                target, options["method"], question, headers, options["timeout"])
+            path = answer_path(status, response_headers)
+        except asyncio.TimeoutError:
+            path = "timeout"
+        except BadResponse:
+            path = "bad_response"
+        except OSError:
+            path = "connect_error"
+        finally:
+            limit.release()
+        results.append((step, pool, path, time.perf_counter() - start - send_at))
+
+    names = list(questions)
+    weights = [questions[n][0] for n in names]
+    tasks = []
+    start = time.perf_counter()
+    for send_at, step in schedule:
+        delay = start + send_at - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if limit.locked():
+            # Client-side cap reached: counted, not queued, to stay open-loop.
+            dropped[step] += 1
+            continue
+        await limit.acquire()
+        pool = rng.choices(names, weights)[0]
+        question = rng.choice(questions[pool][1])
+        client = f"10.0.{rng.randrange(256)}.{rng.randrange(1, 255)}" if options["spread_clients"] else None
+        tasks.append(asyncio.create_task(one(send_at, step, pool, question, client)))
+    await asyncio.gather(*tasks)
+    return results, dict(dropped), time.perf_counter() - start
+
+
+# ==========================
+# 4. REPORT
+# ==========================
+def summarize(latencies):
+    ms = sorted(x * 1000 for x in latencies)
+    if not ms:
+        return {"count": 0}
+    return {
+        "count": len(ms),
+        **{f"p{p}": round(ms[min(len(ms) - 1, int(len(ms) * p / 100))], 1) for p in PERCENTILES},
+        "max": round(ms[-1], 1),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Open-loop load test of a running chatbot endpoint with a weighted question mix. "
+        "Reports latency percentiles per answer path; ramp mode finds the saturation point."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", default="http://127.0.0.1:8000/api/chatbot/ask/")
+        parser.add_argument("--mode", choices=["constant", "ramp"], default="constant")
+        parser.add_argument("--rate", type=float, default=5.0, help="Requests/second (ramp: starting rate)")
+        parser.add_argument("--ramp-to", type=float, default=50.0, help="Final requests/second in ramp mode")
+        parser.add_argument("--steps", type=int, default=10, help="Rate steps in ramp mode")
+        parser.add_argument("--duration", type=float, default=30.0, help="Seconds (ramp: all steps together)")
+        parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Pool weights, default {DEFAULT_MIX}")
+        parser.add_argument("--method", choices=["GET", "POST"], default="POST",
+                            help="POST skips browser caching of fixed answers")
+        parser.add_argument("--timeout", type=float, default=30.0)
+        parser.add_argument("--deadline-ms", type=int, default=0, help="Send X-Deadline-Ms on every request")
+        parser.add_argument("--max-inflight", type=int, default=1000)
+        parser.add_argument("--spread-clients", action="store_true",
+                            help="Random X-Forwarded-For per request (server must trust it) "
+                                 "so per-client rate limits do not dominate")
+        parser.add_argument("--slo-ms", type=float, default=2000.0, help="p95 ceiling for a healthy ramp step")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--output", help="Write the full report as JSON")
+
+    def handle(self, *args, **options):
+        target = urlsplit(options["url"])
+        if target.scheme not in ("http", "https") or not target.hostname:
+            raise CommandError(f"Bad --url {options['url']!r}")
+        questions = parse_mix(options["mix"])
+        schedule = list(arrival_times(
+            options["mode"], options["rate"], options["duration"], options["ramp_to"], options["steps"]))
+
+        results, dropped, elapsed = asyncio.run(run_load(target, schedule, questions, options))
+
+        by_path = defaultdict(list)
+        for _, _, path, latency in results:
+            by_path[path].append(latency)
+        report = {
+            "url": options["url"],
+            "mode": options["mode"],
+            "sent": len(results),
+            "dropped_client_side": sum(dropped.values()),
+            "seconds": round(elapsed, 2),
+            "overall": summarize([r[3] for r in results]),
+            "by_path": {p: summarize(v) for p, v in sorted(by_path.items(), key=lambda kv: -len(kv[1]))},
+            "by_pool": {
+                pool: dict(sorted(
+                    {p: sum(1 for r in results if r[1] == pool and r[2] == p) for p in by_path}.items(),
+                    key=lambda kv: -kv[1]))
+                for pool in questions
+            },
+        }
+
+        self.stdout.write("====================================")
+        self.stdout.write(f"LOAD TEST ({options['mode']}, {options['method']} {options['url']})")
+        self.stdout.write(f"{'answer path':22}{'count':>7}" + "".join(f"{'p%d' % p:>9}" for p in PERCENTILES) + f"{'max':>9}")
+        rows = [("overall", report["overall"])] + list(report["by_path"].items())
+        for path, s in rows:
+            if s["count"]:
+                self.stdout.write(f"{path:22}{s['count']:>7}"
+                                  + "".join(f"{s['p%d' % p]:>9.1f}" for p in PERCENTILES) + f"{s['max']:>9.1f}")
+        self.stdout.write(f"Sent {len(results)} at {len(schedule) / options['duration']:.1f} req/s offered, "
+                          f"all answered after {elapsed:.1f}s, "
+                          f"{report['dropped_client_side']} dropped at --max-inflight")
+
+        if options["mode"] == "ramp":
+            report["steps"] = self.ramp_report(results, dropped, options)
+
+        rate_limited = len(by_path.get("rate_limited", []))
+        if rate_limited > len(results) / 10:
+            self.stdout.write(self.style.WARNING(
+                f"{rate_limited} requests were rate limited (429): use --spread-clients with "
+                "CHATBOT_TRUST_X_FORWARDED_FOR, or raise CHATBOT_RATE_LIMITS for the test."))
+        self.stdout.write("====================================")
+
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(f"Saved to {options['output']}")
+
+    def ramp_report(self, results, dropped, options):
+        """
+        Per-step offered rate, p95 and failure share. The saturation point is
+        the first step whose p95 exceeds --slo-ms or where more than 1% of
+        requests fail (busy, timeout, dropped, bad responses or errors).
+        """
+        step_seconds = options["duration"] / options["steps"]
+        steps, saturated = [], None
+
+        self.stdout.write("------------------------------------")
+        self.stdout.write(f"{'step':>5}{'offered/s':>11}{'p50':>9}{'p95':>9}{'failed':>8}  degraded paths")
+        for step in range(options["steps"]):
+            rows = [r for r in results if r[0] == step]
+            offered = options["rate"] + (options["ramp_to"] - options["rate"]) * step / max(options["steps"] - 1, 1)
+            failed = sum(1 for r in rows if r[2] in ("busy", "timeout", "connect_error", "bad_response")
+                         or r[2].startswith("http_")) + dropped.get(step, 0)
+            degraded = defaultdict(int)
+            for r in rows:
+                if r[2].startswith("fallback_") or r[2] == "model_quick":
+                    degraded[r[2]] += 1
+            s = summarize([r[3] for r in rows])
+            total = len(rows) + dropped.get(step, 0)
+            entry = {"offered_rate": round(offered, 2), "sent": len(rows), "failed": failed,
+                     "degraded": dict(degraded), **s}
+            steps.append(entry)
+            self.stdout.write(f"{step:>5}{offered:>11.1f}{s.get('p50', 0):>9.1f}{s.get('p95', 0):>9.1f}"
+                              f"{failed:>8}  {dict(degraded) or '-'}")
+            if saturated is None and total and (s.get("p95", 0) > options["slo_ms"] or failed / total > 0.01):
+                saturated = offered
+
+        if saturated is None:
+            self.stdout.write(self.style.SUCCESS(
+                f"No saturation up to {options['ramp_to']:.1f} req/s (p95 <= {options['slo_ms']:.0f} ms)."))
+        else:
+            self.stdout.write(self.style.WARNING(f"Saturation at about {saturated:.1f} req/s offered."))
+        return steps
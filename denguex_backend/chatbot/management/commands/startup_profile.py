@@ -0,0 +1,118 @@
+import json
+import os
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Modules that should never be imported just to boot a worker.
+HEAVY_MODULES = ("torch", "transformers", "onnxruntime", "sentencepiece", "tokenizers")
+
+# Runs in a fresh interpreter under -X importtime; timings go to stdout as
+# JSON, the per-module import log goes to stderr.
+PROBE = r"""
+import json, os, sys, time
+t0 = time.perf_counter()
+import django
+django.setup()
+t_setup = time.perf_counter()
+
+from django.urls import get_resolver
+get_resolver().url_patterns
+t_urls = time.perf_counter()
+
+# The probe request must not land in the interaction log.
+from chatbot.interaction_log import interaction_logger
+interaction_logger.log = lambda record: None
+
+from django.test import Client
+response = Client().get(sys.argv[1], HTTP_HOST="localhost")
+t_request = time.perf_counter()
+
+print(json.dumps({
+    "setup": t_setup - t0,
+    "urlconf": t_urls - t_setup,
+    "first_request": t_request - t_urls,
+    "status": response.status_code,
+    "heavy_loaded": sorted(m for m in sys.argv[2].split(",") if m in sys.modules),
+}))
+"""
+
+
+def parse_importtime(stderr: str):
+    """
+    -X importtime lines: "import time: self [us] | cumulative | imported package"
+    Returns [(module, self_us, cumulative_us)].
+    """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue
+        rows.append((parts[2].strip(), int(parts[0]), int(parts[1])))
+    return rows
+
+
+class Command(BaseCommand):
+    help = "Profile backend startup: import time per module and time to first request."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--path", default="/api/chatbot/ask/?question=What+is+dengue",
+                            help="URL to request once the app is loaded (default: a canonical answer)")
+        parser.add_argument("--top", type=int, default=25, help="Number of modules to list")
+        parser.add_argument("--budget", type=float, default=0.0,
+                            help="Fail if startup + first request exceeds this many seconds")
+
+    def handle(self, *args, **options):
+        env = dict(os.environ)
+        env.setdefault("DJANGO_SETTINGS_MODULE", "denguex_backend.settings")
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(settings.BASE_DIR), env.get("PYTHONPATH")]))
+
+        start = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", PROBE, options["path"], ",".join(HEAVY_MODULES)],
+            cwd=settings.BASE_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        wall = time.perf_counter() - start
+
+        if proc.returncode != 0:
+            raise CommandError(f"Startup probe failed:\n{proc.stderr[-4000:]}")
+
+        timings = json.loads(proc.stdout.strip().splitlines()[-1])
+        imports = parse_importtime(proc.stderr)
+
+        # Top-level packages only, so "django.db.models" doesn't crowd the list.
+        packages = {}
+        for module, self_us, cumulative_us in imports:
+            top = module.split(".")[0]
+            packages[top] = packages.get(top, 0) + self_us
+
+        self.stdout.write("====================================")
+        self.stdout.write("BACKEND STARTUP PROFILE")
+        self.stdout.write(f"django.setup()      : {timings['setup'] * 1000:8.1f} ms")
+        self.stdout.write(f"URLconf import      : {timings['urlconf'] * 1000:8.1f} ms")
+        self.stdout.write(f"First request       : {timings['first_request'] * 1000:8.1f} ms "
+                          f"(HTTP {timings['status']} {options['path']})")
+        self.stdout.write(f"Process wall time   : {wall * 1000:8.1f} ms")
+        self.stdout.write(f"Heavy ML modules    : {', '.join(timings['heavy_loaded']) or 'none loaded'}")
+        self.stdout.write("------------------------------------")
+        self.stdout.write("Slowest imports (cumulative):")
+        for module, self_us, cumulative_us in sorted(imports, key=lambda r: -r[2])[:options["top"]]:
+            self.stdout.write(f"  {cumulative_us / 1000:8.1f} ms  {module}")
+        self.stdout.write("------------------------------------")
+        self.stdout.write("Import time by top-level package (self):")
+        for top, self_us in sorted(packages.items(), key=lambda kv: -kv[1])[:options["top"]]:
+            self.stdout.write(f"  {self_us / 1000:8.1f} ms  {top}")
+        self.stdout.write("====================================")
+
+        if timings["heavy_loaded"]:
+            self.stderr.write(f"Warning: {', '.join(timings['heavy_loaded'])} imported during startup.")
+        if options["budget"] and wall > options["budget"]:
+            raise CommandError(f"Startup took {wall:.2f}s, over the {options['budget']:.2f}s budget.")
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChatInteraction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(db_index=True)),
+                ('question', models.TextField()),
+                ('guardrail', models.CharField(choices=[('passed', 'Passed'), ('domain_refusal', 'Non-dengue refusal'), ('medical_refusal', 'Medical refusal')], max_length=32)),
+                ('intent', models.CharField(max_length=64)),
+                ('source', models.CharField(max_length=32)),
+                ('allowed', models.BooleanField()),
+                ('latency_ms', models.FloatField()),
+            ],
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chatbot', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InteractionRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('granularity', models.CharField(choices=[('hour', 'Hourly'), ('day', 'Daily')], max_length=8)),
+                ('bucket_start', models.DateTimeField()),
+                ('intent', models.CharField(max_length=64)),
+                ('refusal', models.CharField(blank=True, default='', max_length=32)),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('granularity', 'bucket_start', 'intent', 'refusal'), name='chatbot_rollup_bucket_uniq')],
+            },
+        ),
+    ]
@@ -1,3 +1,62 @@
 from django.db import models
 
-# Create your models here.
+
+class ChatInteraction(models.Model):
+    """
+    One chatbot request/response. Rows are written in batches by
+    chatbot.interaction_log, never from the request thread.
+    """
+
+    GUARDRAIL_PASSED = "passed"
+    GUARDRAIL_DOMAIN = "domain_refusal"
+    GUARDRAIL_MEDICAL = "medical_refusal"
+    GUARDRAIL_CHOICES = [
+        (GUARDRAIL_PASSED, "Passed"),
+        (GUARDRAIL_DOMAIN, "Non-dengue refusal"),
+        (GUARDRAIL_MEDICAL, "Medical refusal"),
+    ]
+
+    created_at = models.DateTimeField(db_index=True)
+    question = models.TextField()
+    guardrail = models.CharField(max_length=32, choices=GUARDRAIL_CHOICES)
+    intent = models.CharField(max_length=64)
+    source = models.CharField(max_length=32)
+    allowed = models.BooleanField()
+    latency_ms = models.FloatField()
+
+    def __str__(self):
+        return f"{self.created_at:%Y-%m-%d %H:%M} [{self.source}] {self.question[:60]}"
+
+
+class InteractionRollup(models.Model):
+    """
+    Pre-aggregated interaction counts per time bucket, intent and refusal
+    type. Incremented by the chat log writer as batches land, so dashboard
+    queries read a handful of rows instead of scanning ChatInteraction.
+    """
+
+    HOUR = "hour"
+    DAY = "day"
+    GRANULARITY_CHOICES = [
+        (HOUR, "Hourly"),
+        (DAY, "Daily"),
+    ]
+
+    granularity = models.CharField(max_length=8, choices=GRANULARITY_CHOICES)
+    bucket_start = models.DateTimeField()
+    intent = models.CharField(max_length=64)
+    # Empty for answered questions, otherwise the ChatInteraction guardrail value.
+    refusal = models.CharField(max_length=32, blank=True, default="")
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            # Also serves range queries on (granularity, bucket_start).
+            models.UniqueConstraint(
+                fields=["granularity", "bucket_start", "intent", "refusal"],
+                name="chatbot_rollup_bucket_uniq",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.granularity} {self.bucket_start:%Y-%m-%d %H:%M} {self.intent} {self.refusal or '-'}: {self.count}"
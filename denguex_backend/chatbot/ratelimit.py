@@ -0,0 +1,142 @@
+import threading
+import time
+from itertools import islice
+
+from django.conf import settings
+
+# ==========================
+# 1. IN-PROCESS TOKEN BUCKETS
+# ==========================
+class TokenBucketLimiter:
+    """
+    Per-client token buckets: ``rate`` tokens per second, up to ``burst``.
+
+    State is one (tokens, last_seen) tuple per client in a dict. A bucket
+    that has been idle long enough to refill completely is identical to a
+    new one, so the periodic sweep simply deletes it. ``max_clients`` caps
+    memory under a flood of distinct clients: when the dict is full, the
+    least recently seen ``evict_fraction`` of it is dropped in one go, so
+    the cost per request stays constant instead of a scan every time.
+    """
+
+    evict_fraction = 0.1
+
+    def __init__(self, rate: float, burst: float, max_clients: int = 100_000, sweep_seconds: float = 60.0):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self.sweep_seconds = sweep_seconds
+        self.idle_seconds = burst / rate if rate else float("inf")
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self._next_sweep = time.monotonic() + sweep_seconds
+
+    def allow(self, key: str, cost: float = 1.0):
+        """
+        Returns (allowed, retry_after_seconds).
+        """
+        now = time.monotonic()
+        with self._lock:
+            if now >= self._next_sweep:
+                self._sweep(now)
+            if len(self._buckets) >= self.max_clients and key not in self._buckets:
+                self._evict_oldest()
+
+            tokens, last = self._buckets.pop(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+
+            if tokens >= cost:
+                self._buckets[key] = (tokens - cost, now)
+                return True, 0.0
+
+            # Re-inserting keeps dict order roughly "least recently seen first".
+            self._buckets[key] = (tokens, now)
+            return False, (cost - tokens) / self.rate if self.rate else float("inf")
+
+    def _sweep(self, now):
+        idle_before = now - self.idle_seconds
+        for key in [k for k, (_, last) in self._buckets.items() if last <= idle_before]:
+            del self._buckets[key]
+        self._next_sweep = now + self.sweep_seconds
+
+    def _evict_oldest(self):
+        # Dict order is least recently seen first (allow() re-inserts).
+        count = max(1, int(self.max_clients * self.evict_fraction))
+        for key in list(islice(self._buckets, count)):
+            del self._buckets[key]
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+# ==========================
+# 2. SHARED (CROSS-WORKER) BUCKETS
+# ==========================
+class SharedTokenBucketLimiter:
+    """
+    Same algorithm backed by a Django cache alias (e.g. a local Memcached
+    or Redis) so all workers on a node share one budget per client.
+    Read-modify-write is not atomic across workers, so concurrent requests
+    from one client can occasionally both pass; that slack is acceptable
+    for abuse control and avoids a lock round-trip per request.
+    """
+
+    def __init__(self, rate: float, burst: float, cache_alias: str, prefix: str):
+        from django.core.cache import caches
+
+        self.rate = rate
+        self.burst = burst
+        self.cache = caches[cache_alias]
+        self.prefix = prefix
+        self.timeout = int(burst / rate) + 1 if rate else None
+
+    def allow(self, key: str, cost: float = 1.0):
+        now = time.time()
+        cache_key = f"{self.prefix}:{key}"
+        tokens, last = self.cache.get(cache_key) or (self.burst, now)
+        tokens = min(self.burst, tokens + max(0.0, now - last) * self.rate)
+
+        if tokens >= cost:
+            self.cache.set(cache_key, (tokens - cost, now), self.timeout)
+            return True, 0.0
+
+        self.cache.set(cache_key, (tokens, now), self.timeout)
+        return False, (cost - tokens) / self.rate if self.rate else float("inf")
+
+
+# ==========================
+# 3. CONFIGURED LIMITERS
+# ==========================
+# "cheap": every request (refusals and canonical answers cost almost nothing)
+# "model": requests that reach FLAN-T5 generation
+def _build(name: str):
+    rate, burst = settings.CHATBOT_RATE_LIMITS[name]
+    if settings.CHATBOT_RATE_LIMIT_CACHE:
+        return SharedTokenBucketLimiter(rate, burst, settings.CHATBOT_RATE_LIMIT_CACHE, f"chatbot-rl-{name}")
+    return TokenBucketLimiter(rate, burst, max_clients=settings.CHATBOT_RATE_LIMIT_MAX_CLIENTS)
+
+
+limiters = {name: _build(name) for name in settings.CHATBOT_RATE_LIMITS}
+
+
+def client_key(request) -> str:
+    """
+    Session key when the client has one, otherwise the client IP.
+    """
+    session = getattr(request, "session", None)
+    if session is not None and session.session_key:
+        return f"s:{session.session_key}"
+
+    ip = request.META.get("REMOTE_ADDR", "")
+    if settings.CHATBOT_TRUST_X_FORWARDED_FOR:
+        forwarded = request.META.get("HTTP_X_FORWARDED_FOR", "")
+        if forwarded:
+            ip = forwarded.split(",")[0].strip()
+    return f"ip:{ip}"
+
+
+def check(request, budget: str):
+    """
+    Returns (allowed, retry_after_seconds) for this request's client.
+    """
+    return limiters[budget].allow(client_key(request))
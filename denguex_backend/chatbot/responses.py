@@ -0,0 +1,100 @@
+import hashlib
+import json
+import threading
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+
+from chatbot_engine import MEDICAL_BLOCK_MESSAGE, NON_DENGUE_MESSAGE
+from knowledge_base import snapshot as knowledge_base
+
+from .guardrails import DOMAIN_REFUSAL_MESSAGE, MEDICAL_REFUSAL_MESSAGE
+
+# ==========================
+# 1. PRE-ENCODED BODIES
+# ==========================
+class PreparedResponse:
+    __slots__ = ("body", "etag")
+
+    def __init__(self, answer: str, allowed: bool):
+        self.body = json.dumps({"response": answer, "allowed": allowed}).encode("utf-8")
+        self.etag = '"' + hashlib.sha256(self.body).hexdigest()[:32] + '"'
+
+
+def build_table(snapshot, previous=None) -> dict:
+    """
+    (answer, allowed) -> PreparedResponse for every fixed answer of a
+    knowledge base snapshot. Entries whose text is unchanged are taken
+    from ``previous``, so only edited answers are re-encoded and every
+    other ETag stays valid in browser and CDN caches.
+    """
+    fixed = [(text, True) for text in snapshot.canonical_answers.values()]
+    fixed += [
+        (NON_DENGUE_MESSAGE, False),
+        (MEDICAL_BLOCK_MESSAGE, False),
+        (DOMAIN_REFUSAL_MESSAGE, False),
+        (MEDICAL_REFUSAL_MESSAGE, False),
+    ]
+    previous = previous or {}
+    return {
+        key: previous.get(key) or PreparedResponse(*key)
+        for key in fixed
+    }
+
+
+_lock = threading.Lock()
+_version = None
+_table = {}
+
+
+def table_for(snapshot) -> dict:
+    """
+    The prepared table for ``snapshot``, rebuilt when its version changes.
+    """
+    global _table, _version
+    if snapshot.version != _version:
+        with _lock:
+            if snapshot.version != _version:
+                _table = build_table(snapshot, _table)
+                _version = snapshot.version
+    return _table
+
+
+def prepared_for(answer: str, allowed: bool, snapshot=None):
+    """
+    Returns the PreparedResponse for a fixed answer, or None for
+    model-generated text. Pass the snapshot the answer came from, so a
+    swap in between cannot pair it with another version's table.
+    """
+    table = table_for(snapshot or knowledge_base.current())
+    return table.get((answer, allowed))
+
+
+# ==========================
+# 2. HTTP RESPONSES
+# ==========================
+def _etag_matches(request, etag: str) -> bool:
+    header = request.META.get("HTTP_IF_NONE_MATCH", "")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return etag in (tag.strip().removeprefix("W/") for tag in header.split(","))
+
+
+def cached_response(request, prepared: PreparedResponse):
+    """
+    Serves pre-encoded bytes. GET responses are cacheable by browsers and
+    CDNs and revalidate with If-None-Match for a 304 and no body.
+    """
+    if request.method == "GET" and _etag_matches(request, prepared.etag):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(prepared.body, content_type="application/json")
+
+    response["ETag"] = prepared.etag
+    if request.method == "GET":
+        response["Cache-Control"] = f"public, max-age={settings.CHATBOT_FIXED_ANSWER_MAX_AGE}"
+    else:
+        response["Cache-Control"] = "no-cache"
+    return response
@@ -0,0 +1,121 @@
+from collections import Counter
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.db.models import Count
+from django.db.models.functions import TruncDay, TruncHour
+
+from .models import ChatInteraction, InteractionRollup
+
+# ==========================
+# 1. BUCKETING
+# ==========================
+def refusal_type(guardrail: str) -> str:
+    return "" if guardrail == ChatInteraction.GUARDRAIL_PASSED else guardrail
+
+
+def hour_bucket(dt):
+    return dt.replace(minute=0, second=0, microsecond=0)
+
+
+def day_bucket(dt):
+    return dt.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def bucket_counts(interactions) -> Counter:
+    """
+    (granularity, bucket_start, intent, refusal) -> count for a batch.
+    """
+    counts = Counter()
+    for i in interactions:
+        refusal = refusal_type(i.guardrail)
+        counts[(InteractionRollup.HOUR, hour_bucket(i.created_at), i.intent, refusal)] += 1
+        counts[(InteractionRollup.DAY, day_bucket(i.created_at), i.intent, refusal)] += 1
+    return counts
+
+
+# ==========================
+# 2. INCREMENTAL UPDATE
+# ==========================
+UPSERT_SQL = (
+    "INSERT INTO {table} (granularity, bucket_start, intent, refusal, count) "
+    "VALUES (%s, %s, %s, %s, %s) "
+    "ON CONFLICT (granularity, bucket_start, intent, refusal) "
+    "DO UPDATE SET count = {table}.count + excluded.count"
+)
+
+
+def apply_counts(counts: Counter):
+    """
+    Adds counts onto the rollup rows in one executemany. Call inside the
+    transaction that inserted the interactions so both commit together.
+    """
+    if not counts:
+        return
+    ops = connection.ops
+    rows = [
+        (granularity, ops.adapt_datetimefield_value(bucket), intent, refusal, n)
+        for (granularity, bucket, intent, refusal), n in counts.items()
+    ]
+    sql = UPSERT_SQL.format(table=connection.ops.quote_name(InteractionRollup._meta.db_table))
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, rows)
+
+
+def record_batch(interactions):
+    apply_counts(bucket_counts(interactions))
+
+
+# ==========================
+# 3. BACKFILL
+# ==========================
+def backfill(start, end, chunk=timedelta(days=1)):
+    """
+    Rebuilds rollups for whole days in [start, end) from ChatInteraction.
+    Each day is replaced in its own transaction, so the dashboard never
+    sees a half-built day and memory stays bounded by one day's groups.
+    Returns the number of interactions counted.
+    """
+    total = 0
+    day = day_bucket(start)
+    while day < end:
+        next_day = day + chunk
+        logs = ChatInteraction.objects.filter(created_at__gte=day, created_at__lt=next_day)
+
+        with transaction.atomic():
+            InteractionRollup.objects.filter(bucket_start__gte=day, bucket_start__lt=next_day).delete()
+
+            counts = Counter()
+            for granularity, trunc in ((InteractionRollup.HOUR, TruncHour), (InteractionRollup.DAY, TruncDay)):
+                grouped = (
+                    logs.annotate(bucket=trunc("created_at"))
+                    .values("bucket", "intent", "guardrail")
+                    .annotate(n=Count("id"))
+                )
+                for row in grouped:
+                    key = (granularity, row["bucket"], row["intent"], refusal_type(row["guardrail"]))
+                    counts[key] += row["n"]
+                    if granularity == InteractionRollup.DAY:
+                        total += row["n"]
+            apply_counts(counts)
+
+        day = next_day
+    return total
+
+
+# ==========================
+# 4. DASHBOARD QUERIES
+# ==========================
+def series(granularity: str, since, until, intent=None):
+    """
+    Rollup rows for a time range, served from the unique index on
+    (granularity, bucket_start, ...).
+    """
+    rows = InteractionRollup.objects.filter(
+        granularity=granularity,
+        bucket_start__gte=since,
+        bucket_start__lt=until,
+    )
+    if intent:
+        rows = rows.filter(intent=intent)
+    return rows.order_by("bucket_start").values("bucket_start", "intent", "refusal", "count")
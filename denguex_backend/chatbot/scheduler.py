@@ -0,0 +1,228 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+FULL = "full"
+QUICK = "quick"
+
+
+class SchedulerBusy(Exception):
+    """
+    No degraded answer was good enough and no generation fits the deadline.
+    """
+
+
+# ==========================
+# 1. MODEL QUEUE
+# ==========================
+class DeadlineScheduler:
+    """
+    Bounded model queue that decides, per request, whether generation can
+    finish before the request's deadline.
+
+    Service time for full (beam search) and quick (short greedy) generation
+    is tracked as an exponentially weighted moving average. The queue keeps
+    the sum of the estimates of every queued and running job, so the
+    expected wait is that backlog divided by the number of workers. When a
+    full generation would miss the deadline the request degrades, in order,
+    to the closest canonical answer, the best QA dataset match, or a quick
+    decode; it never joins a queue it cannot get through in time.
+
+    Each worker runs ``warm`` (e.g. the model load) before taking jobs and
+    does not record its first generation, so one-off costs never enter the
+    estimates. While requests keep degrading, an idle queue runs a full
+    generation every ``probe_seconds`` just to re-measure it; otherwise an
+    estimate above the deadline would never be corrected.
+    """
+
+    def __init__(self, generate, retrieve, workers: int = 1, initial_seconds: float = 3.0,
+                 quick_ratio: float = 0.3, alpha: float = 0.2,
+                 canonical_min_score: float = 0.35, dataset_min_score: float = 0.5,
+                 warm=None, probe_seconds: float = 30.0):
+        self.generate = generate
+        self.retrieve = retrieve
+        self.workers = workers
+        self.alpha = alpha
+        self.warm = warm
+        self.probe_seconds = probe_seconds
+        self._next_probe = time.monotonic() + probe_seconds
+        self.canonical_min_score = canonical_min_score
+        self.dataset_min_score = dataset_min_score
+        self.ewma = {FULL: initial_seconds, QUICK: initial_seconds * quick_ratio}
+
+        self._jobs = queue.Queue()
+        self._lock = threading.Lock()
+        self._backlog = 0.0
+        self.stats = {FULL: 0, QUICK: 0, "fallback_canonical": 0, "fallback_dataset": 0,
+                      "missed": 0, "busy": 0, "probes": 0}
+
+        for i in range(workers):
+            threading.Thread(target=self._run, name=f"chatbot-model-{i}", daemon=True).start()
+
+    # Estimates ------------------------------------------------------------
+    def estimated_wait(self) -> float:
+        with self._lock:
+            return self._backlog / self.workers
+
+    def _observe(self, kind, seconds):
+        with self._lock:
+            self.ewma[kind] += self.alpha * (seconds - self.ewma[kind])
+
+    # Workers --------------------------------------------------------------
+    def _submit(self, kind, question, probe=False) -> Future:
+        future = Future()
+        estimate = self.ewma[kind]
+        with self._lock:
+            self._backlog += estimate
+            self.stats["probes" if probe else kind] += 1
+        self._jobs.put((kind, question, estimate, future))
+        return future
+
+    def _maybe_probe(self, question):
+        now = time.monotonic()
+        with self._lock:
+            if self._backlog > 0 or now < self._next_probe:
+                return
+            self._next_probe = now + self.probe_seconds
+        # Nobody waits on the result; the worker records its timing.
+        self._submit(FULL, question, probe=True)
+
+    def _run(self):
+        if self.warm is not None:
+            try:
+                self.warm()
+            except Exception:
+                logger.exception("Model warm-up failed")
+        cold = True
+        while True:
+            kind, question, estimate, future = self._jobs.get()
+            try:
+                # Skipped if the caller already gave up on it.
+                if not future.set_running_or_notify_cancel():
+                    continue
+                start = time.monotonic()
+                try:
+                    future.set_result(self.generate(question, quick=(kind == QUICK)))
+                except BaseException as exc:
+                    future.set_exception(exc)
+                if not cold:
+                    self._observe(kind, time.monotonic() - start)
+                cold = False
+            finally:
+                with self._lock:
+                    self._backlog -= estimate
+
+    # Scheduling -----------------------------------------------------------
+    def answer(self, question: str, deadline: float) -> dict:
+        """
+        ``deadline`` is a time.monotonic() value. Returns an engine-style
+        result dict; raises SchedulerBusy when nothing fits.
+        """
+        wait = self.estimated_wait()
+        if time.monotonic() + wait + self.ewma[FULL] <= deadline:
+            future = self._submit(FULL, question)
+            try:
+                return future.result(timeout=max(0.0, deadline - time.monotonic()))
+            except FutureTimeout:
+                future.cancel()
+                with self._lock:
+                    self.stats["missed"] += 1
+        else:
+            self._maybe_probe(question)
+        return self.degrade(question, deadline)
+
+    def degrade(self, question: str, deadline: float) -> dict:
+        """
+        The answer when full generation cannot make the deadline: closest
+        canonical answer, best dataset match or a quick decode, in order.
+        Raises SchedulerBusy when none of them is good enough or in time.
+        """
+        hits = self.retrieve(question)
+        canonical = hits.get("canonical")
+        if canonical and canonical[0] >= self.canonical_min_score:
+            return self._fallback("fallback_canonical", canonical)
+        dataset = hits.get("dataset")
+        if dataset and dataset[0] >= self.dataset_min_score:
+            return self._fallback("fallback_dataset", dataset)
+
+        if time.monotonic() + self.estimated_wait() + self.ewma[QUICK] <= deadline:
+            future = self._submit(QUICK, question)
+            try:
+                return future.result(timeout=max(0.0, deadline - time.monotonic()))
+            except FutureTimeout:
+                future.cancel()
+
+        with self._lock:
+            self.stats["busy"] += 1
+        raise SchedulerBusy(question)
+
+    def _fallback(self, source, hit):
+        with self._lock:
+            self.stats[source] += 1
+        return {"allowed": True, "answer": hit[3], "source": source}
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "estimated_wait": self._backlog / self.workers,
+                "ewma_seconds": dict(self.ewma),
+                **self.stats,
+            }
+
+
+# ==========================
+# 2. PROCESS-WIDE SCHEDULER
+# ==========================
+def retrieve(question: str) -> dict:
+    """
+    Best canonical and best dataset hit: {"canonical": (score, kind, key, answer), ...}
+    """
+    from knowledge_base.retrieval import default_index
+
+    index = default_index()
+    return {kind: index.best(question, kind=kind) for kind in ("canonical", "dataset")}
+
+
+_lock = threading.Lock()
+_scheduler = None
+
+
+def get_scheduler() -> DeadlineScheduler:
+    global _scheduler
+    if _scheduler is None:
+        with _lock:
+            if _scheduler is None:
+                from chatbot_engine import generate_answer, load_model
+
+                _scheduler = DeadlineScheduler(
+                    generate_answer,
+                    retrieve,
+                    workers=settings.CHATBOT_MODEL_WORKERS,
+                    initial_seconds=settings.CHATBOT_GENERATION_SECONDS,
+                    canonical_min_score=settings.CHATBOT_FALLBACK_MIN_SCORE["canonical"],
+                    dataset_min_score=settings.CHATBOT_FALLBACK_MIN_SCORE["dataset"],
+                    warm=load_model,
+                    probe_seconds=settings.CHATBOT_FULL_PROBE_SECONDS,
+                )
+    return _scheduler
+
+
+def request_deadline(request, start: float) -> float:
+    """
+    monotonic deadline for a request that started at ``start``. Clients may
+    ask for a tighter budget with an X-Deadline-Ms header, never a looser one.
+    """
+    budget = settings.CHATBOT_DEADLINE_SECONDS
+    header = request.META.get("HTTP_X_DEADLINE_MS")
+    if header:
+        try:
+            budget = min(budget, max(0.0, float(header) / 1000.0))
+        except ValueError:
+            pass
+    return start + budget
@@ -0,0 +1,94 @@
+import asyncio
+import math
+import re
+import threading
+from concurrent.futures import Future
+
+_SPACES = re.compile(r"\s+")
+_TRAILING = re.compile(r"[\s?!.]+$")
+
+
+def coalesce_key(question: str) -> str:
+    """
+    Questions that differ only in case, spacing or trailing punctuation
+    share one in-flight generation.
+    """
+    return _TRAILING.sub("", _SPACES.sub(" ", question.lower())).strip()
+
+
+def deadline_class(budget: float) -> int:
+    """
+    Remaining time budget rounded up to a power of two seconds. Requests
+    only share a generation with requests of the same class, so a caller
+    never waits on a leader that was allowed far more time than it was.
+    """
+    return math.ceil(math.log2(max(budget, 0.125)))
+
+
+class SingleFlight:
+    """
+    Collapses concurrent calls with the same key into one execution.
+
+    The first caller (the leader) runs the function; callers arriving while
+    it is running wait on the same concurrent.futures.Future and receive
+    its result or its exception. The entry is removed as soon as the call
+    finishes, so this is coalescing, not caching. Works from plain threads
+    (``do``) and from asyncio code (``ado``) against the same table.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.leaders = 0
+        self.followers = 0
+
+    def _join(self, key):
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.followers += 1
+                return future, False
+            future = Future()
+            future.set_running_or_notify_cancel()
+            self._calls[key] = future
+            self.leaders += 1
+            return future, True
+
+    def _finish(self, key, future, fn, args):
+        try:
+            future.set_result(fn(*args))
+        except BaseException as exc:
+            future.set_exception(exc)
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def do(self, key, fn, *args, timeout=None):
+        """
+        Blocking call. Followers raise concurrent.futures.TimeoutError if the
+        leader has not finished within ``timeout`` seconds; the leader keeps
+        running for everyone else.
+        """
+        future, leader = self._join(key)
+        if leader:
+            self._finish(key, future, fn, args)
+        return future.result(timeout=None if leader else timeout)
+
+    async def ado(self, key, fn, *args, timeout=None, executor=None):
+        """
+        Awaitable call. The leader runs ``fn`` in ``executor`` so the event
+        loop stays free. Waiters are shielded, so one caller timing out or
+        being cancelled never cancels the shared computation.
+        """
+        future, leader = self._join(key)
+        if leader:
+            loop = asyncio.get_running_loop()
+            loop.run_in_executor(executor, self._finish, key, future, fn, args)
+        waiter = asyncio.shield(asyncio.wrap_future(future))
+        if leader or timeout is None:
+            return await waiter
+        return await asyncio.wait_for(waiter, timeout)
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
@@ -0,0 +1,8 @@
+from django.urls import path
+
+from . import views
+
+urlpatterns = [
+    path('ask/', views.chatbot_api, name='chatbot-ask'),
+    path('rollups/', views.rollups_api, name='chatbot-rollups'),
+]
@@ -1,3 +1,212 @@
-from django.shortcuts import render
+import json
+import time
+from concurrent.futures import TimeoutError as FutureTimeout
+from datetime import datetime, timedelta, timezone
 
-# Create your views here.
+from django.conf import settings
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.utils.dateparse import parse_datetime
+from django.views.decorators.http import require_GET, require_http_methods
+
+from chatbot_engine import fast_answer
+from knowledge_base import snapshot as knowledge_base
+from text_normalization import clean_question
+
+from .guardrails import guardrail_check, is_dengue_related
+from .interaction_log import log_interaction
+from . import ratelimit
+from .responses import cached_response, prepared_for
+from .scheduler import SchedulerBusy, get_scheduler, request_deadline
+from .singleflight import SingleFlight, coalesce_key, deadline_class
+from .models import ChatInteraction, InteractionRollup
+from .rollups import series
+
+# Engine refusals mapped onto the backend's guardrail outcomes.
+ENGINE_REFUSALS = {
+    "non_dengue": ChatInteraction.GUARDRAIL_DOMAIN,
+    "medical_block": ChatInteraction.GUARDRAIL_MEDICAL,
+}
+
+# Sources whose answer is fixed text, safe to serve publicly cacheable.
+# Degraded answers (fallback_*, model_quick) reflect load at the moment
+# and must not be cached by browsers or CDNs.
+FIXED_SOURCES = {"canonical", "guardrail", "non_dengue", "medical_block"}
+
+# Identical questions arriving together with similar deadlines share one
+# model.generate call.
+inflight = SingleFlight()
+
+
+def _read_question(request):
+    if request.method == "GET":
+        return request.GET.get("question", "")
+    if request.content_type == "application/json":
+        try:
+            return str(json.loads(request.body or b"{}").get("question", ""))
+        except (ValueError, AttributeError):
+            return ""
+    return request.POST.get("question", "")
+
+
+def cheap_answer(question: str, snapshot=None):
+    """
+    Backend guardrails, then the engine's refusals and canonical facts.
+    Returns None when the question needs model generation.
+    """
+    allowed, message = guardrail_check(question)
+    if not allowed:
+        guardrail = (
+            ChatInteraction.GUARDRAIL_DOMAIN
+            if not is_dengue_related(question)
+            else ChatInteraction.GUARDRAIL_MEDICAL
+        )
+        return {"allowed": False, "answer": message, "source": "guardrail", "guardrail": guardrail}
+
+    result = fast_answer(question, snapshot)
+    if result is not None:
+        result["guardrail"] = ENGINE_REFUSALS.get(result["source"], ChatInteraction.GUARDRAIL_PASSED)
+    return result
+
+
+def model_answer(question: str, deadline: float) -> dict:
+    """
+    Full generation when the model queue can meet the deadline, otherwise
+    a degraded answer (see scheduler.DeadlineScheduler).
+    """
+    # Followers wait no longer than their own deadline allows.
+    budget = max(0.0, deadline - time.monotonic())
+
+    # The result dict is shared by every coalesced caller: copy, don't mutate.
+    scheduler = get_scheduler()
+    try:
+        result = inflight.do(
+            (coalesce_key(question), deadline_class(budget)),
+            scheduler.answer,
+            question,
+            deadline,
+            timeout=min(settings.CHATBOT_COALESCE_TIMEOUT, budget),
+        )
+    except FutureTimeout:
+        # Joined a leader with a later deadline that is still generating:
+        # answer like any request whose deadline a generation cannot meet.
+        result = scheduler.degrade(question, deadline)
+    return {**result, "guardrail": ChatInteraction.GUARDRAIL_PASSED}
+
+
+def rate_limited(retry_after: float):
+    response = JsonResponse(
+        {"error": "Too many questions. Please wait a moment and try again.", "allowed": False},
+        status=429,
+    )
+    response["Retry-After"] = str(max(1, int(retry_after + 0.999)))
+    return response
+
+
+@csrf_exempt
+@require_http_methods(["GET", "POST"])
+def chatbot_api(request):
+    """
+    question -> {"response": str, "allowed": bool}
+    """
+    # Bounded and normalized before anything scans it.
+    question = clean_question(_read_question(request))
+    if not question:
+        return JsonResponse({"error": "Please provide a question."}, status=400)
+
+    # Every request spends from the cheap budget; only those that reach
+    # model generation also spend from the (much smaller) model budget.
+    ok, retry_after = ratelimit.check(request, "cheap")
+    if not ok:
+        return rate_limited(retry_after)
+
+    start = time.perf_counter()
+    deadline = request_deadline(request, time.monotonic())
+
+    # One knowledge base version for the whole request, even if a new one
+    # is swapped in meanwhile.
+    snapshot = knowledge_base.current()
+
+    # Refusals and canonical hits never touch the model queue.
+    result = cheap_answer(question, snapshot)
+    if result is None:
+        ok, retry_after = ratelimit.check(request, "model")
+        if not ok:
+            return rate_limited(retry_after)
+        try:
+            result = model_answer(question, deadline)
+        except (FutureTimeout, SchedulerBusy):
+            return JsonResponse(
+                {"error": "The assistant is busy. Please try again shortly.", "allowed": False},
+                status=503,
+            )
+    latency_ms = (time.perf_counter() - start) * 1000.0
+
+    log_interaction(
+        question=question,
+        guardrail=result["guardrail"],
+        intent=snapshot.classify(question),
+        source=result["source"],
+        allowed=result["allowed"],
+        latency_ms=latency_ms,
+    )
+
+    # Refusals and canonical facts are served from pre-encoded bytes.
+    prepared = None
+    if result["source"] in FIXED_SOURCES:
+        prepared = prepared_for(result["answer"], result["allowed"], snapshot)
+    if prepared is not None:
+        response = cached_response(request, prepared)
+    else:
+        response = JsonResponse({
+            "response": result["answer"],
+            "allowed": result["allowed"],
+        })
+        response["Cache-Control"] = "no-store"
+
+    # Which path answered (canonical, model, fallback_dataset, ...), for
+    # load tests and monitoring; not part of the JSON contract.
+    response["X-Answer-Source"] = result["source"]
+    return response
+
+
+def _query_datetime(request, name):
+    """
+    Optional ISO datetime query parameter; naive values are taken as UTC.
+    Raises ValueError for a malformed or impossible value.
+    """
+    value = request.GET.get(name)
+    if not value:
+        return None
+    try:
+        parsed = parse_datetime(value)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise ValueError(f"{name} must be an ISO 8601 datetime.")
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+@require_GET
+def rollups_api(request):
+    """
+    Hourly or daily counts by intent and refusal type for dashboards.
+    ?granularity=hour|day&since=<ISO>&until=<ISO>&intent=<name>
+    """
+    granularity = request.GET.get("granularity", InteractionRollup.HOUR)
+    if granularity not in (InteractionRollup.HOUR, InteractionRollup.DAY):
+        return JsonResponse({"error": "granularity must be 'hour' or 'day'."}, status=400)
+
+    now = datetime.now(timezone.utc)
+    default_span = timedelta(days=2) if granularity == InteractionRollup.HOUR else timedelta(days=60)
+    try:
+        since = _query_datetime(request, "since") or now - default_span
+        until = _query_datetime(request, "until") or now + timedelta(hours=1)
+    except ValueError as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+
+    rows = [
+        {**row, "bucket_start": row["bucket_start"].isoformat()}
+        for row in series(granularity, since, until, request.GET.get("intent"))
+    ]
+    return JsonResponse({"granularity": granularity, "buckets": rows})
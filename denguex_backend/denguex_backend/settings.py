@@ -10,11 +10,18 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import sys
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# The chatbot AI module lives next to the backend and imports its own
+# knowledge_base package, so its folder has to be on the path.
+CHATBOT_ML_DIR = BASE_DIR.parent / 'chatbot_ml'
+if str(CHATBOT_ML_DIR) not in sys.path:
+    sys.path.insert(0, str(CHATBOT_ML_DIR))
+
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.2/howto/deployment/checklist/
@@ -37,6 +44,8 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'chatbot',
+    'mosquito',
 ]
 
 MIDDLEWARE = [
@@ -76,6 +85,18 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            # WAL lets readers run alongside the chat log writer; NORMAL sync
+            # is durable across app crashes and much cheaper per commit.
+            'init_command': (
+                'PRAGMA journal_mode=WAL;'
+                'PRAGMA synchronous=NORMAL;'
+                'PRAGMA temp_store=MEMORY;'
+                'PRAGMA cache_size=-20000;'
+            ),
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 5,
+        },
     }
 }
 
@@ -120,3 +141,102 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+
+# Mosquito image classifier (ONNX, trained on DengueX-AI/data/yolo/dengue.yaml)
+
+MOSQUITO_MODEL_PATH = BASE_DIR.parent / 'DengueX-AI' / 'models' / 'mosquito_classifier.onnx'
+
+MOSQUITO_INTRA_OP_THREADS = 0  # 0 lets ONNX Runtime pick
+
+MOSQUITO_MAX_BATCH = 16
+
+MOSQUITO_BATCH_WAIT_MS = 10
+
+# Uploads are spooled to a temp file and refused past the limit. Django's
+# ASGI handler reads the whole request body before any view runs, so the
+# hard cap on body size belongs in the front server (for example nginx
+# client_max_body_size 11m on /api/mosquito/).
+
+MOSQUITO_MAX_UPLOAD_BYTES = 10 * 1024 * 1024
+
+MOSQUITO_UPLOAD_SPOOL_BYTES = 1024 * 1024
+
+MOSQUITO_MAX_IMAGE_PIXELS = 40_000_000
+
+MOSQUITO_DECODE_WORKERS = 2
+
+# Classification results are cached per model version by upload SHA-256,
+# and optionally by perceptual hash to catch re-compressed copies. A
+# perceptual hit returns another upload's result, so it is off by default.
+# Distances above 3 bits are checked by a linear scan of the cache.
+
+MOSQUITO_RESULT_CACHE_SIZE = 4096
+
+MOSQUITO_PERCEPTUAL_CACHE = False
+
+MOSQUITO_PHASH_MAX_DISTANCE = 3
+
+# Chat interaction log: buffered in memory, written in batches by a
+# background thread. When the buffer is full, records are appended to
+# the spill file (or dropped if it is None) instead of blocking requests.
+# Each worker process spills to "<path>.<pid>"; records that cannot be
+# written after a few attempts end up in "<path>.bad".
+
+CHAT_LOG_QUEUE_SIZE = 10_000
+
+CHAT_LOG_BATCH_SIZE = 500
+
+CHAT_LOG_FLUSH_SECONDS = 1.0
+
+CHAT_LOG_SPILL_PATH = BASE_DIR / 'chat_log_spill.jsonl'
+
+# Per-client token buckets for the chatbot: (tokens per second, burst).
+# "cheap" is charged on every request, "model" only when FLAN-T5 runs.
+# Set CHATBOT_RATE_LIMIT_CACHE to a cache alias to share buckets across
+# workers; None keeps them in each process.
+
+CHATBOT_RATE_LIMITS = {
+    'cheap': (2.0, 30),
+    'model': (0.2, 5),
+}
+
+CHATBOT_RATE_LIMIT_CACHE = None
+
+CHATBOT_RATE_LIMIT_MAX_CLIENTS = 100_000
+
+CHATBOT_TRUST_X_FORWARDED_FOR = False
+
+# Browser/CDN cache lifetime (seconds) for GET responses that carry a
+# fixed canonical or refusal answer. They are revalidated via ETag.
+
+CHATBOT_FIXED_ANSWER_MAX_AGE = 300
+
+# Seconds a coalesced request waits for the in-flight generation of the
+# same question before giving up with 503. A request never waits past its
+# own deadline, and only coalesces with requests of a similar deadline.
+
+CHATBOT_COALESCE_TIMEOUT = 30.0
+
+# Deadline-aware model scheduling. Each chatbot request must be answered
+# within CHATBOT_DEADLINE_SECONDS (clients may ask for less via an
+# X-Deadline-Ms header). When the model queue cannot make it in time the
+# answer degrades to the closest canonical answer, the best QA dataset
+# match (if their retrieval scores clear these minimums), or a short
+# greedy decode.
+
+CHATBOT_DEADLINE_SECONDS = 8.0
+
+CHATBOT_MODEL_WORKERS = 1
+
+# Starting estimate of one full generation, refined from observed timings.
+CHATBOT_GENERATION_SECONDS = 3.0
+
+# While requests degrade, an idle model queue re-measures full generation
+# this often (seconds) so a stale estimate can recover.
+CHATBOT_FULL_PROBE_SECONDS = 30.0
+
+CHATBOT_FALLBACK_MIN_SCORE = {
+    'canonical': 0.4,
+    'dataset': 0.5,
+}
@@ -0,0 +1,256 @@
+import hashlib
+import json
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# ==========================
+# 1. MODEL METADATA
+# ==========================
+# Class order follows DengueX-AI/data/yolo/dengue.yaml.
+DEFAULT_LABELS = [
+    "dengue_mosquito",
+    "non_dengue_mosquito",
+    "non_mosquito",
+]
+
+# Matches an Ultralytics classification export: 224px input, pixels
+# scaled to [0, 1], no mean/std shift. A "<model>.json" file next to the
+# ONNX model overrides any of these.
+DEFAULT_META = {
+    "labels": DEFAULT_LABELS,
+    "input_size": 224,
+    "mean": [0.0, 0.0, 0.0],
+    "std": [1.0, 1.0, 1.0],
+    "outputs_are_probabilities": False,
+}
+
+
+def load_meta(model_path: Path) -> dict:
+    """
+    Returns the preprocessing/label metadata for a model.
+    """
+    meta = dict(DEFAULT_META)
+    sidecar = model_path.with_suffix(".json")
+    if sidecar.exists():
+        with open(sidecar, "r", encoding="utf-8") as f:
+            meta.update(json.load(f))
+    return meta
+
+
+def model_version(model_path: Path) -> str:
+    """
+    Short content hash of the model file, used to tag results.
+    """
+    h = hashlib.sha256()
+    with open(model_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()[:12]
+
+
+# ==========================
+# 2. PREPROCESSING
+# ==========================
+def preprocess(image, meta: dict) -> np.ndarray:
+    """
+    PIL image -> float32 CHW array at the model's input size.
+    Resizes the short side then center-crops, like the training transform.
+    """
+    size = meta["input_size"]
+    image = image.convert("RGB")
+
+    w, h = image.size
+    scale = size / min(w, h)
+    image = image.resize((max(size, round(w * scale)), max(size, round(h * scale))))
+
+    w, h = image.size
+    left, top = (w - size) // 2, (h - size) // 2
+    image = image.crop((left, top, left + size, top + size))
+
+    arr = np.asarray(image, dtype=np.float32) / 255.0
+    arr = (arr - np.asarray(meta["mean"], dtype=np.float32)) / np.asarray(meta["std"], dtype=np.float32)
+    return arr.transpose(2, 0, 1)
+
+
+def softmax(logits: np.ndarray) -> np.ndarray:
+    z = logits - logits.max(axis=1, keepdims=True)
+    e = np.exp(z)
+    return e / e.sum(axis=1, keepdims=True)
+
+
+# ==========================
+# 3. ONNX RUNTIME SESSION
+# ==========================
+class MosquitoClassifier:
+    """
+    One ONNX Runtime session per process. The heavy import happens here,
+    so Django can start without onnxruntime until the first image arrives.
+    """
+
+    def __init__(self, model_path: Path, intra_op_threads: int = 0):
+        import onnxruntime as ort
+
+        self.model_path = Path(model_path)
+        self.meta = load_meta(self.model_path)
+        self.labels = list(self.meta["labels"])
+        self.version = model_version(self.model_path)
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if intra_op_threads:
+            options.intra_op_num_threads = intra_op_threads
+        options.inter_op_num_threads = 1
+
+        self.session = ort.InferenceSession(
+            str(self.model_path),
+            sess_options=options,
+            providers=["CPUExecutionProvider"],
+        )
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+
+        # Exports with a fixed batch dimension of 1 cannot take stacked batches.
+        batch_dim = model_input.shape[0]
+        self.supports_batching = not (isinstance(batch_dim, int) and batch_dim == 1)
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        """
+        (N, 3, H, W) float32 -> (N, num_classes) probabilities.
+        """
+        if self.supports_batching:
+            out = self.session.run(None, {self.input_name: batch})[0]
+        else:
+            out = np.concatenate([
+                self.session.run(None, {self.input_name: batch[i:i + 1]})[0]
+                for i in range(len(batch))
+            ])
+
+        if not self.meta["outputs_are_probabilities"]:
+            out = softmax(out)
+        return out
+
+    def scores(self, probs: np.ndarray) -> dict:
+        return {label: float(p) for label, p in zip(self.labels, probs)}
+
+
+# ==========================
+# 4. REQUEST BATCHING
+# ==========================
+class MicroBatcher:
+    """
+    Collects preprocessed images from concurrent requests and runs them
+    through the model together. The first waiting request opens a batch;
+    it closes when full or after max_wait_ms, whichever comes first.
+    """
+
+    def __init__(self, classifier: MosquitoClassifier, max_batch: int = 16, max_wait_ms: float = 10.0):
+        self.classifier = classifier
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="mosquito-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, array: np.ndarray) -> Future:
+        future = Future()
+        self._queue.put((array, future))
+        return future
+
+    def _collect(self):
+        items = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(items) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0:
+                    items.append(self._queue.get_nowait())
+                else:
+                    items.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return items
+
+    def _run(self):
+        while True:
+            # A request cancelled while queued (client gone) is dropped here;
+            # once running its future can no longer be cancelled.
+            items = [(array, future) for array, future in self._collect()
+                     if future.set_running_or_notify_cancel()]
+            if not items:
+                continue
+            try:
+                batch = np.stack([array for array, _ in items])
+                probs = self.classifier.predict(batch)
+            except Exception as exc:
+                for _, future in items:
+                    _settle(future.set_exception, exc)
+                continue
+
+            for (_, future), row in zip(items, probs):
+                _settle(future.set_result, row)
+
+
+def _settle(setter, value):
+    # Nothing may kill the batcher thread: every later request would hang.
+    try:
+        setter(value)
+    except InvalidStateError:
+        logger.warning("Dropped a result for an already settled request")
+
+
+# ==========================
+# 5. PER-PROCESS SINGLETON
+# ==========================
+_lock = threading.Lock()
+_batcher = None
+
+
+def get_batcher() -> MicroBatcher:
+    """
+    Loads the model on first use and reuses it for the life of the worker.
+    """
+    global _batcher
+    if _batcher is None:
+        with _lock:
+            if _batcher is None:
+                classifier = MosquitoClassifier(
+                    settings.MOSQUITO_MODEL_PATH,
+                    intra_op_threads=settings.MOSQUITO_INTRA_OP_THREADS,
+                )
+                _batcher = MicroBatcher(
+                    classifier,
+                    max_batch=settings.MOSQUITO_MAX_BATCH,
+                    max_wait_ms=settings.MOSQUITO_BATCH_WAIT_MS,
+                )
+    return _batcher
+
+
+def describe(classifier: MosquitoClassifier, probs: np.ndarray) -> dict:
+    """
+    Returns {"label", "confidence", "scores", "model_version"} for one row of probabilities.
+    """
+    best = int(np.argmax(probs))
+    return {
+        "label": classifier.labels[best],
+        "confidence": float(probs[best]),
+        "scores": classifier.scores(probs),
+        "model_version": classifier.version,
+    }
+
+
+def classify(image, timeout: float = 30.0) -> dict:
+    """
+    Synchronous helper for callers that already hold a decoded PIL image.
+    """
+    batcher = get_batcher()
+    probs = batcher.submit(preprocess(image, batcher.classifier.meta)).result(timeout=timeout)
+    return describe(batcher.classifier, probs)
@@ -0,0 +1,194 @@
+import csv
+import os
+import queue
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from mosquito.classifier import MosquitoClassifier
+from mosquito.uploads import InvalidImage, decode_for_classifier
+
+VALID_EXTS = (".jpg", ".jpeg", ".png")
+
+# Same label vocabulary as data/annotations/classification_labels_3class.csv
+SHORT_LABELS = {
+    "dengue_mosquito": "dengue",
+    "non_dengue_mosquito": "non_dengue",
+    "non_mosquito": "non_mosquito",
+}
+
+_DONE = object()
+
+
+def image_key(base, path):
+    """
+    CSV and resume key: the path relative to the common parent of all
+    roots, so same-named files under different roots never collide. With
+    a single root this is the path relative to that root.
+    """
+    return os.path.relpath(path, base)
+
+
+def scan_images(roots, base, skip, out_queue, errors):
+    """
+    Walks each root with os.scandir and feeds (key, path) pairs into a
+    bounded queue, so scanning never runs far ahead of decoding. Always
+    ends with _DONE; a scan failure is left in ``errors``.
+    """
+    try:
+        for root in roots:
+            stack = [root]
+            while stack:
+                current = stack.pop()
+                with os.scandir(current) as it:
+                    entries = sorted(it, key=lambda e: e.name)
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.name.lower().endswith(VALID_EXTS):
+                        key = image_key(base, entry.path)
+                        if key not in skip:
+                            skip.add(key)
+                            out_queue.put((key, entry.path))
+    except Exception as exc:
+        errors.append(exc)
+    finally:
+        out_queue.put(_DONE)
+
+
+def decode_file(path, meta, max_pixels):
+    """
+    Worker-process entry point: file path -> classifier input array.
+    """
+    try:
+        with open(path, "rb") as f:
+            return decode_for_classifier(f, meta, max_pixels), None
+    except (InvalidImage, OSError) as exc:
+        return None, str(exc)
+
+
+def read_scored(csv_path):
+    if not os.path.exists(csv_path):
+        return set()
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        return {row["filename"] for row in csv.DictReader(f)}
+
+
+class Command(BaseCommand):
+    help = "Score image folders with the mosquito classifier and write filename,label,scores CSV."
+
+    def add_arguments(self, parser):
+        parser.add_argument("directories", nargs="+", help="Image folders to scan recursively")
+        parser.add_argument("--output", required=True, help="CSV file (appended to when resuming)")
+        parser.add_argument("--model", default=str(settings.MOSQUITO_MODEL_PATH))
+        parser.add_argument("--batch-size", type=int, default=32)
+        parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) - 1),
+                            help="Decode processes")
+        parser.add_argument("--prefetch", type=int, default=256,
+                            help="Maximum images queued or decoding ahead of inference")
+        parser.add_argument("--threads", type=int, default=settings.MOSQUITO_INTRA_OP_THREADS,
+                            help="ONNX Runtime intra-op threads")
+        parser.add_argument("--restart", action="store_true", help="Ignore rows already in --output")
+
+    def handle(self, *args, **options):
+        roots = [os.path.abspath(d) for d in options["directories"]]
+        for root in roots:
+            if not os.path.isdir(root):
+                raise CommandError(f"Not a directory: {root}")
+
+        out_path = options["output"]
+        if options["restart"] and os.path.exists(out_path):
+            os.remove(out_path)
+        scored = read_scored(out_path)
+        if scored:
+            self.stdout.write(f"[INFO] Resuming: {len(scored)} images already scored")
+
+        classifier = MosquitoClassifier(options["model"], intra_op_threads=options["threads"])
+        meta = classifier.meta
+        batch_size = options["batch_size"]
+        prefetch = max(options["prefetch"], batch_size)
+
+        base = os.path.commonpath(roots)
+        paths = queue.Queue(maxsize=prefetch)
+        scan_errors = []
+        scanner = threading.Thread(
+            target=scan_images, args=(roots, base, set(scored), paths, scan_errors), daemon=True
+        )
+        scanner.start()
+
+        write_header = not os.path.exists(out_path) or os.path.getsize(out_path) == 0
+        counts = {"scored": 0, "failed": 0}
+        start = time.perf_counter()
+        next_report = batch_size * 50
+
+        with open(out_path, "a", newline="", encoding="utf-8") as out, \
+             ProcessPoolExecutor(max_workers=options["workers"]) as pool:
+            writer = csv.writer(out)
+            if write_header:
+                writer.writerow(["filename", "label"] + classifier.labels)
+
+            pending = {}
+            batch = []
+            scanning = True
+
+            def flush():
+                probs = classifier.predict(np.stack([array for _, array in batch]))
+                for (name, _), row in zip(batch, probs):
+                    label = classifier.labels[int(np.argmax(row))]
+                    writer.writerow([name, SHORT_LABELS.get(label, label)] + [f"{p:.6f}" for p in row])
+                out.flush()
+                counts["scored"] += len(batch)
+                batch.clear()
+
+            while scanning or pending:
+                # Keep the decode pool fed up to the prefetch depth.
+                while scanning and len(pending) < prefetch:
+                    try:
+                        item = paths.get(timeout=0.05 if pending else None)
+                    except queue.Empty:
+                        break
+                    if item is _DONE:
+                        scanning = False
+                        break
+                    name, path = item
+                    future = pool.submit(decode_file, path, meta, settings.MOSQUITO_MAX_IMAGE_PIXELS)
+                    pending[future] = name
+
+                if not pending:
+                    continue
+
+                finished, _ = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = pending.pop(future)
+                    array, error = future.result()
+                    if error is not None:
+                        counts["failed"] += 1
+                        self.stderr.write(f"[SKIP] {name}: {error}")
+                        continue
+                    batch.append((name, array))
+                    if len(batch) >= batch_size:
+                        flush()
+
+                if counts["scored"] >= next_report:
+                    rate = counts["scored"] / (time.perf_counter() - start)
+                    self.stdout.write(f"[INFO] Scored {counts['scored']} images ({rate:.1f} img/s)")
+                    next_report += batch_size * 50
+
+            if batch:
+                flush()
+
+        if scan_errors:
+            raise CommandError(f"Scanning stopped early ({counts['scored']} images saved): {scan_errors[0]}")
+
+        elapsed = time.perf_counter() - start
+        self.stdout.write("====================================")
+        self.stdout.write("IMAGE SCORING COMPLETE")
+        self.stdout.write(f"Images scored : {counts['scored']}")
+        self.stdout.write(f"Failed        : {counts['failed']}")
+        self.stdout.write(f"Throughput    : {counts['scored'] / max(elapsed, 1e-9):.1f} img/s")
+        self.stdout.write(f"Saved to      : {out_path}")
+        self.stdout.write("====================================")
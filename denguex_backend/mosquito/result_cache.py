@@ -0,0 +1,140 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from django.conf import settings
+from PIL import Image
+
+# ==========================
+# 1. PERCEPTUAL HASH
+# ==========================
+PHASH_BANDS = 4  # 64-bit hash split into four 16-bit bands
+
+
+def perceptual_hash(array: np.ndarray) -> int:
+    """
+    64-bit difference hash of a preprocessed CHW image. Re-compressed or
+    re-scaled copies of the same photo usually land within a few bits.
+    """
+    gray = array.mean(axis=0)
+    gray = (gray - gray.min()) / max(float(np.ptp(gray)), 1e-6) * 255.0
+    small = np.asarray(
+        Image.fromarray(gray.astype(np.uint8)).resize((9, 8), Image.BILINEAR),
+        dtype=np.int16,
+    )
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return int(np.packbits(bits).view(">u8")[0])
+
+
+def _bands(phash: int):
+    return [(i, (phash >> (16 * i)) & 0xFFFF) for i in range(PHASH_BANDS)]
+
+
+# ==========================
+# 2. BOUNDED RESULT CACHE
+# ==========================
+class ResultCache:
+    """
+    LRU cache of classification results for one model version.
+
+    Exact lookups use the SHA-256 of the uploaded bytes. Perceptual lookups
+    use a band index: two hashes within 3 bits of each other must share at
+    least one of the four 16-bit bands, so only those candidates are compared.
+    The index misses matches for larger distances, so those fall back to
+    comparing every cached hash.
+    """
+
+    def __init__(self, max_entries: int = 4096, max_distance: int = 3):
+        self.max_entries = max_entries
+        self.max_distance = max_distance
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()   # digest -> (phash, result)
+        self._bands = {}                # (band, value) -> set(digest)
+        self.model_version = None
+        self.hits = 0
+        self.perceptual_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _check_version(self, model_version: str):
+        # Results from an older model must never be served.
+        if model_version != self.model_version:
+            self._entries.clear()
+            self._bands.clear()
+            self.model_version = model_version
+
+    def get(self, model_version: str, digest: str):
+        with self._lock:
+            self._check_version(model_version)
+            entry = self._entries.get(digest)
+            if entry is None:
+                return None
+            self._entries.move_to_end(digest)
+            self.hits += 1
+            return entry[1]
+
+    def get_similar(self, model_version: str, phash: int):
+        with self._lock:
+            self._check_version(model_version)
+            if self.max_distance < PHASH_BANDS:
+                candidates = set()
+                for band in _bands(phash):
+                    candidates |= self._bands.get(band, set())
+            else:
+                candidates = [d for d, (other, _) in self._entries.items() if other is not None]
+
+            for digest in candidates:
+                other, result = self._entries[digest]
+                if bin(other ^ phash).count("1") <= self.max_distance:
+                    self._entries.move_to_end(digest)
+                    self.perceptual_hits += 1
+                    return result
+            return None
+
+    def record_miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def put(self, model_version: str, digest: str, phash, result: dict):
+        with self._lock:
+            self._check_version(model_version)
+            if digest in self._entries:
+                self._entries.move_to_end(digest)
+                return
+
+            self._entries[digest] = (phash, result)
+            if phash is not None:
+                for band in _bands(phash):
+                    self._bands.setdefault(band, set()).add(digest)
+
+            while len(self._entries) > self.max_entries:
+                old_digest, (old_phash, _) = self._entries.popitem(last=False)
+                if old_phash is not None:
+                    for band in _bands(old_phash):
+                        members = self._bands.get(band)
+                        if members is not None:
+                            members.discard(old_digest)
+                            if not members:
+                                del self._bands[band]
+                self.evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.perceptual_hits + self.misses
+            return {
+                "model_version": self.model_version,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "perceptual_hits": self.perceptual_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits + self.perceptual_hits) / lookups if lookups else 0.0,
+            }
+
+
+# One cache per worker process.
+result_cache = ResultCache(
+    max_entries=settings.MOSQUITO_RESULT_CACHE_SIZE,
+    max_distance=settings.MOSQUITO_PHASH_MAX_DISTANCE,
+)
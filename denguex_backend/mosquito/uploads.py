@@ -0,0 +1,117 @@
+import hashlib
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler, StopUpload
+from PIL import Image
+
+from .classifier import preprocess
+
+# ==========================
+# 1. BOUNDED UPLOAD HANDLER
+# ==========================
+class BoundedUploadHandler(FileUploadHandler):
+    """
+    Streams each uploaded file into a SpooledTemporaryFile: small photos
+    stay in memory, larger ones roll over to disk. The upload is cut off
+    as soon as it passes max_bytes instead of after the whole body is read.
+    The SHA-256 of the content is computed on the way through and exposed
+    as ``upload.sha256``.
+    """
+
+    def __init__(self, request=None, max_bytes=None, spool_bytes=None):
+        super().__init__(request)
+        self.max_bytes = max_bytes or settings.MOSQUITO_MAX_UPLOAD_BYTES
+        self.spool_bytes = spool_bytes or settings.MOSQUITO_UPLOAD_SPOOL_BYTES
+        self.exceeded = False
+        self.received = 0
+        self.file = None
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.received = 0
+        self.digest = hashlib.sha256()
+        self.file = tempfile.SpooledTemporaryFile(max_size=self.spool_bytes)
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > self.max_bytes:
+            self.exceeded = True
+            self.file.close()
+            raise StopUpload(connection_reset=True)
+        self.digest.update(raw_data)
+        self.file.write(raw_data)
+
+    def file_complete(self, file_size):
+        self.file.seek(0)
+        upload = UploadedFile(
+            file=self.file,
+            name=self.file_name,
+            content_type=self.content_type,
+            size=file_size,
+            charset=self.charset,
+            content_type_extra=self.content_type_extra,
+        )
+        upload.sha256 = self.digest.hexdigest()
+        return upload
+
+    def upload_interrupted(self):
+        if self.file is not None:
+            self.file.close()
+
+
+def install_upload_handler(request) -> BoundedUploadHandler:
+    """
+    Must run before request.POST / request.FILES are first touched.
+    """
+    handler = BoundedUploadHandler(request)
+    request.upload_handlers = [handler]
+    return handler
+
+
+# ==========================
+# 2. REDUCED-RESOLUTION DECODE
+# ==========================
+class InvalidImage(Exception):
+    pass
+
+
+def decode_for_classifier(fileobj, meta: dict, max_pixels: int = None):
+    """
+    Decodes an uploaded image straight to the classifier input array.
+    For JPEGs, draft() asks libjpeg for a 1/2, 1/4 or 1/8 scale decode that
+    is still at least the input size, so a 12 MP photo never exists in
+    memory at full resolution.
+    """
+    try:
+        image = Image.open(fileobj)
+    except Exception as exc:
+        raise InvalidImage(str(exc)) from exc
+
+    w, h = image.size
+    if w * h > (max_pixels or settings.MOSQUITO_MAX_IMAGE_PIXELS):
+        raise InvalidImage("Image dimensions are too large.")
+
+    size = meta["input_size"]
+    if image.format == "JPEG":
+        image.draft("RGB", (size, size))
+
+    try:
+        image.load()
+    except Exception as exc:
+        raise InvalidImage(str(exc)) from exc
+
+    return preprocess(image, meta)
+
+
+# ==========================
+# 3. DECODE WORKER POOL
+# ==========================
+# PIL releases the GIL while decoding and resizing, so a small thread pool
+# keeps this work off the event loop without copying uploads to processes.
+decode_pool = ThreadPoolExecutor(
+    max_workers=settings.MOSQUITO_DECODE_WORKERS,
+    thread_name_prefix="mosquito-decode",
+)
@@ -0,0 +1,8 @@
+from django.urls import path
+
+from . import views
+
+urlpatterns = [
+    path('classify/', views.classify_image, name='mosquito-classify'),
+    path('cache-stats/', views.cache_stats, name='mosquito-cache-stats'),
+]
@@ -0,0 +1,107 @@
+import asyncio
+import logging
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+
+from .classifier import describe, get_batcher
+from .result_cache import perceptual_hash, result_cache
+from .uploads import InvalidImage, decode_for_classifier, decode_pool, install_upload_handler
+
+logger = logging.getLogger(__name__)
+
+
+def _decode_and_hash(upload, meta):
+    array = decode_for_classifier(upload, meta)
+    phash = perceptual_hash(array) if settings.MOSQUITO_PERCEPTUAL_CACHE else None
+    return array, phash
+
+
+def _parse_upload(request):
+    """
+    Multipart parsing is synchronous file I/O; it runs off the event loop.
+    """
+    handler = install_upload_handler(request)
+    return request.FILES.get("image"), handler.exceeded
+
+
+def _cached_response(result, kind):
+    response = JsonResponse(result)
+    response["X-Cache"] = kind
+    return response
+
+
+@csrf_exempt
+@require_POST
+async def classify_image(request):
+    """
+    POST multipart "image" -> predicted class and per-class scores.
+    """
+    too_large = JsonResponse(
+        {"error": f"Image must be smaller than {settings.MOSQUITO_MAX_UPLOAD_BYTES // (1024 * 1024)} MB."},
+        status=413,
+    )
+
+    # The body has already been received (see MOSQUITO_MAX_UPLOAD_BYTES in
+    # settings); an oversized declared length still skips multipart parsing.
+    try:
+        content_length = int(request.META.get("CONTENT_LENGTH") or 0)
+    except ValueError:
+        content_length = 0
+    if content_length > settings.MOSQUITO_MAX_UPLOAD_BYTES + 64 * 1024:
+        return too_large
+
+    upload, exceeded = await sync_to_async(_parse_upload, thread_sensitive=False)(request)
+    if exceeded:
+        return too_large
+    if upload is None:
+        return JsonResponse({"error": "No image uploaded."}, status=400)
+
+    loop = asyncio.get_running_loop()
+    try:
+        batcher = await loop.run_in_executor(decode_pool, get_batcher)
+    except Exception:
+        # Missing model file, onnxruntime not installed or a broken export.
+        # Retried on the next request, so deploying the model needs no restart.
+        logger.exception("Mosquito classifier could not be loaded from %s", settings.MOSQUITO_MODEL_PATH)
+        upload.close()
+        return JsonResponse({"error": "Classifier unavailable. Please try again later."}, status=503)
+    version = batcher.classifier.version
+
+    # Byte-identical re-uploads skip decoding and inference entirely.
+    cached = result_cache.get(version, upload.sha256)
+    if cached is not None:
+        upload.close()
+        return _cached_response(cached, "HIT")
+
+    try:
+        with upload:
+            array, phash = await loop.run_in_executor(
+                decode_pool, _decode_and_hash, upload, batcher.classifier.meta
+            )
+    except InvalidImage:
+        return JsonResponse({"error": "Uploaded file is not a valid image."}, status=400)
+
+    if phash is not None:
+        cached = result_cache.get_similar(version, phash)
+        if cached is not None:
+            result_cache.put(version, upload.sha256, phash, cached)
+            return _cached_response(cached, "HIT-PERCEPTUAL")
+
+    result_cache.record_miss()
+    # Shielded: a client disconnect cancels this view, not the batch.
+    probs = await asyncio.shield(asyncio.wrap_future(batcher.submit(array)))
+    result = describe(batcher.classifier, probs)
+    result_cache.put(version, upload.sha256, phash, result)
+    return _cached_response(result, "MISS")
+
+
+@require_GET
+def cache_stats(request):
+    """
+    Hit/miss counters for this worker's classification result cache.
+    """
+    return JsonResponse(result_cache.stats())